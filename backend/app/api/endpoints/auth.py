@@ -1,43 +1,38 @@
 from fastapi import APIRouter, HTTPException, Depends, status
-from datetime import datetime
+from fastapi.security import HTTPAuthorizationCredentials
 from ...schemas.user import UserCreate, UserLogin, UserResponse, Token, UserProfileUpdate
-from ...core.security import create_access_token, get_password_hash, verify_password, get_current_user
+from ...core.security import create_access_token, get_password_hash_async, verify_password_async, get_current_user, revoke_token, security
+from ...services.user_repository import user_repository, EmailAlreadyRegistered
 
 router = APIRouter(prefix="/auth", tags=["Authentication"])
 
 
-mock_users_db = {}
-
-
 @router.post("/signup", response_model=Token, status_code=status.HTTP_201_CREATED)
 async def signup(user: UserCreate):
     """
     Register a new user account.
     
-    TODO: Replace with real database (PostgreSQL/MongoDB)
     TODO: Add email verification
     TODO: Implement rate limiting
     """
     
-    if user.email in mock_users_db:
+    if await user_repository.get_by_email_async(user.email) is not None:
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
             detail="Email already registered"
         )
     
-    user_id = f"user_{len(mock_users_db) + 1}"
-    hashed_password = get_password_hash(user.password)
+    hashed_password = await get_password_hash_async(user.password)
     
-    mock_users_db[user.email] = {
-        "id": user_id,
-        "email": user.email,
-        "full_name": user.full_name,
-        "hashed_password": hashed_password,
-        "created_at": datetime.now(),
-        "subscription_tier": "free"
-    }
+    try:
+        user_data = await user_repository.create_async(user.email, hashed_password, user.full_name)
+    except EmailAlreadyRegistered:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Email already registered"
+        )
     
-    access_token = create_access_token(data={"sub": user_id, "email": user.email})
+    access_token = create_access_token(data={"sub": user_data["id"], "email": user.email})
     
     return Token(access_token=access_token)
 
@@ -52,7 +47,7 @@ async def login(credentials: UserLogin):
     TODO: Add refresh token support
     """
     
-    user_data = mock_users_db.get(credentials.email)
+    user_data = await user_repository.get_by_email_async(credentials.email)
     
     if not user_data:
         raise HTTPException(
@@ -60,7 +55,7 @@ async def login(credentials: UserLogin):
             detail="Incorrect email or password"
         )
     
-    if not verify_password(credentials.password, user_data["hashed_password"]):
+    if not await verify_password_async(credentials.password, user_data["hashed_password"]):
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Incorrect email or password"
@@ -73,28 +68,38 @@ async def login(credentials: UserLogin):
     return Token(access_token=access_token)
 
 
+@router.post("/logout", status_code=status.HTTP_204_NO_CONTENT)
+async def logout(credentials: HTTPAuthorizationCredentials = Depends(security)):
+    """
+    Revoke the presented access token.
+    
+    The token is evicted from the verified-token cache and rejected until it expires.
+    """
+    
+    revoke_token(credentials.credentials)
+
+
 @router.get("/profile", response_model=UserResponse)
 async def get_profile(current_user: dict = Depends(get_current_user)):
     """
     Get current user profile (protected endpoint).
     
-    TODO: Fetch from real database
     TODO: Include additional user preferences
     """
     
-    for email, user_data in mock_users_db.items():
-        if user_data["id"] == current_user["user_id"]:
-            return UserResponse(
-                id=user_data["id"],
-                email=user_data["email"],
-                full_name=user_data.get("full_name"),
-                created_at=user_data["created_at"],
-                subscription_tier=user_data.get("subscription_tier", "free")
-            )
-    
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="User not found"
+    user_data = await user_repository.get_by_id_async(current_user["user_id"])
+    if user_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return UserResponse(
+        id=user_data["id"],
+        email=user_data["email"],
+        full_name=user_data.get("full_name"),
+        created_at=user_data["created_at"],
+        subscription_tier=user_data.get("subscription_tier", "free")
     )
 
 
@@ -107,27 +112,22 @@ async def update_profile(
     Update user profile information.
     
     TODO: Add validation for profile fields
-    TODO: Store in real database
     """
     
-    for email, user_data in mock_users_db.items():
-        if user_data["id"] == current_user["user_id"]:
-            if profile_update.full_name is not None:
-                user_data["full_name"] = profile_update.full_name
-            if profile_update.phone is not None:
-                user_data["phone"] = profile_update.phone
-            if profile_update.country is not None:
-                user_data["country"] = profile_update.country
-            
-            return UserResponse(
-                id=user_data["id"],
-                email=user_data["email"],
-                full_name=user_data.get("full_name"),
-                created_at=user_data["created_at"],
-                subscription_tier=user_data.get("subscription_tier", "free")
-            )
-    
-    raise HTTPException(
-        status_code=status.HTTP_404_NOT_FOUND,
-        detail="User not found"
+    user_data = await user_repository.update_async(
+        current_user["user_id"],
+        **profile_update.model_dump(exclude_none=True)
+    )
+    if user_data is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="User not found"
+        )
+    
+    return UserResponse(
+        id=user_data["id"],
+        email=user_data["email"],
+        full_name=user_data.get("full_name"),
+        created_at=user_data["created_at"],
+        subscription_tier=user_data.get("subscription_tier", "free")
     )
@@ -1,32 +1,64 @@
-from fastapi import APIRouter, HTTPException
-from typing import List, Dict, Any
-from ...services.market_service import get_mock_news, get_mock_market_data
+import asyncio
+import json
+from fastapi import APIRouter, Header, HTTPException, Query, WebSocket, WebSocketDisconnect, status
+from typing import List, Dict, Any, Optional
+from ...core.config import settings
+from ...core.security import verify_token
+from ...core.responses import EncodedJSONResponse, cache_headers, etag_matches, make_etag, not_modified
+from ...services.candle_archive import candle_archive
+from ...services.candle_store import TIMEFRAME_SECONDS
+from ...services.market_service import (
+    get_market_data_payload,
+    get_news_payload,
+    market_data_version,
+    news_version,
+    BASE_PRICES
+)
+from ...services.market_stream import market_stream, StreamClient
 
 router = APIRouter(prefix="/market", tags=["Market Data"])
 
 
 @router.get("/news", response_model=List[Dict[str, Any]])
-async def get_news(limit: int = 10):
+async def get_news(limit: int = 10, if_none_match: Optional[str] = Header(None)):
     """
     Get latest forex news and market updates.
     
+    Supports conditional requests: a matching ``If-None-Match`` gets a 304.
+    
     TODO: Integrate with real news API (NewsAPI, Bloomberg)
     TODO: Add sentiment analysis for market impact
     TODO: Filter by currency pairs and relevance
     """
     
-    news = get_mock_news()
-    return news[:limit]
+    headers = cache_headers(make_etag("news", limit, news_version()), settings.NEWS_MAX_AGE)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    
+    return EncodedJSONResponse(get_news_payload(limit), headers=headers)
 
 
 @router.get("/data/{pair}", response_model=Dict[str, Any])
-async def get_market_data(pair: str, timeframe: str = "1h"):
+async def get_market_data(
+    pair: str,
+    timeframe: str = "1h",
+    limit: int = Query(100, ge=1, le=settings.MAX_CANDLES_PER_REQUEST),
+    include_forming: bool = True,
+    if_none_match: Optional[str] = Header(None)
+):
     """
     Get market data including OHLCV and technical indicators for a trading pair.
     
+    For live updates subscribe to the ``/market/stream`` WebSocket instead of
+    polling this endpoint. The body is served pre-encoded from the payload
+    cache without re-validation.
+    
+    Responses carry an ETag derived from the candle series version and a
+    ``Cache-Control`` max-age that runs until the content next changes: the
+    next base bar while the forming bar is included, otherwise the close of
+    the current ``timeframe`` bar. A matching ``If-None-Match`` gets a 304.
+    
     TODO: Fetch real market data from forex provider
-    TODO: Calculate accurate technical indicators
-    TODO: Add real-time WebSocket support
     """
     
     valid_pairs = ["EUR/USD", "GBP/USD", "USD/JPY", "USD/CHF", "AUD/USD", 
@@ -38,4 +70,148 @@ async def get_market_data(pair: str, timeframe: str = "1h"):
             detail=f"Trading pair {pair} not found. Valid pairs: {', '.join(valid_pairs)}"
         )
     
-    return get_mock_market_data(pair, timeframe)
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported timeframe {timeframe}. Valid timeframes: {', '.join(TIMEFRAME_SECONDS)}"
+        )
+    
+    version, max_age = market_data_version(pair, timeframe, include_forming)
+    headers = cache_headers(make_etag(pair, timeframe, limit, include_forming, version), max_age)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    
+    return EncodedJSONResponse(get_market_data_payload(pair, timeframe, limit, include_forming), headers=headers)
+
+
+@router.get("/history", response_model=Dict[str, Any])
+async def get_archived_candles(
+    pair: str,
+    timeframe: str = "1m",
+    start: Optional[int] = Query(None, description="Epoch seconds, inclusive"),
+    end: Optional[int] = Query(None, description="Epoch seconds, exclusive"),
+    limit: int = Query(1000, ge=1, le=settings.MAX_CANDLES_PER_REQUEST)
+):
+    """
+    Archived candles for a pair between ``start`` and ``end``, oldest first.
+    
+    Served from the memory-mapped candle archive: the range is found by
+    binary search over its time index and sliced without copying. At most
+    ``limit`` candles are returned; ``next_start`` is the ``start`` for the
+    following page, or null when the range is exhausted.
+    """
+    
+    if pair not in BASE_PRICES:
+        raise HTTPException(
+            status_code=404,
+            detail=f"Trading pair {pair} not found. Valid pairs: {', '.join(BASE_PRICES)}"
+        )
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported timeframe {timeframe}. Valid timeframes: {', '.join(TIMEFRAME_SECONDS)}"
+        )
+    
+    candles = candle_archive.series(pair, timeframe).range(start, end)
+    count = len(candles["timestamp"])
+    return {
+        "pair": pair,
+        "timeframe": timeframe,
+        "candles": {field: column[:limit].tolist() for field, column in candles.items()},
+        "next_start": int(candles["timestamp"][limit]) if count > limit else None
+    }
+
+
+async def _send_loop(websocket: WebSocket, client: StreamClient):
+    try:
+        while True:
+            for payload in await client.drain():
+                await websocket.send_text(payload)
+    except Exception:
+        # The socket closed under us (the server raises different errors for
+        # this); the receive loop sees the disconnect and cleans up.
+        return
+
+
+def _apply_subscription(client: StreamClient, message: Any) -> Optional[str]:
+    """Validate a subscription message and apply it; returns an error and leaves the client untouched if invalid."""
+    if not isinstance(message, dict):
+        return "Message must be a JSON object"
+    
+    action = message.get("action")
+    if action not in ("subscribe", "unsubscribe"):
+        return "action must be 'subscribe' or 'unsubscribe'"
+    
+    pairs = message.get("pairs") or []
+    if not isinstance(pairs, list) or not all(isinstance(p, str) for p in pairs):
+        return "pairs must be a list of strings"
+    invalid = [p for p in pairs if p not in BASE_PRICES]
+    if invalid:
+        return f"Unknown trading pairs: {', '.join(invalid)}"
+    
+    timeframes = message.get("timeframes")
+    if timeframes is not None:
+        if not isinstance(timeframes, list) or not all(isinstance(t, str) for t in timeframes):
+            return "timeframes must be a list of strings"
+        unknown = [t for t in timeframes if t not in TIMEFRAME_SECONDS]
+        if unknown:
+            return f"Unsupported timeframes: {', '.join(unknown)}"
+    
+    if action == "subscribe":
+        client.pairs.update(pairs)
+        if timeframes is not None:
+            client.timeframes = set(timeframes)
+    else:
+        client.pairs.difference_update(pairs)
+    return None
+
+
+@router.websocket("/stream")
+async def market_stream_socket(websocket: WebSocket, pairs: Optional[str] = None, token: Optional[str] = None):
+    """
+    Stream live ticks and candle-close events for subscribed pairs.
+    
+    Subscribe with ``?pairs=EUR/USD,GBP/USD`` or by sending
+    ``{"action": "subscribe", "pairs": [...], "timeframes": [...]}``;
+    ``{"action": "unsubscribe", "pairs": [...]}`` removes pairs. Messages are
+    ``{"type": "tick", ...}`` and ``{"type": "candle", "timeframe": ..., "candle": {...}}``.
+    Slow clients only receive the latest tick per pair and drop the oldest
+    candle events beyond ``STREAM_CLIENT_BUFFER``.
+    
+    Connecting with ``?token=<access token>`` makes this the user's channel:
+    background analysis jobs push ``{"type": "job", "job": {...}}`` on completion.
+    """
+    
+    user_id = None
+    if token:
+        try:
+            user_id = verify_token(token).get("sub")
+        except HTTPException:
+            await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+            return
+    
+    await websocket.accept()
+    client = market_stream.connect(user_id)
+    sender = asyncio.create_task(_send_loop(websocket, client))
+    
+    try:
+        if pairs:
+            error = _apply_subscription(client, {"action": "subscribe", "pairs": pairs.split(",")})
+            if error:
+                await websocket.send_json({"type": "error", "detail": error})
+        
+        while True:
+            text = await websocket.receive_text()
+            try:
+                message = json.loads(text)
+            except ValueError:
+                await websocket.send_json({"type": "error", "detail": "Message is not valid JSON"})
+                continue
+            error = _apply_subscription(client, message)
+            if error:
+                await websocket.send_json({"type": "error", "detail": error})
+    except WebSocketDisconnect:
+        pass
+    finally:
+        market_stream.disconnect(client)
+        sender.cancel()
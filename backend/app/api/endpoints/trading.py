@@ -1,61 +1,260 @@
-from fastapi import APIRouter, Depends, HTTPException
-from typing import List
+import asyncio
+import json
+import math
+from concurrent.futures import ThreadPoolExecutor
+from fastapi import APIRouter, Depends, Header, HTTPException, Query, Request
+from fastapi.responses import StreamingResponse
+from pydantic import BaseModel, TypeAdapter, ValidationError
+from typing import Any, AsyncIterator, List, Optional, Tuple
 from datetime import datetime, timedelta
+from ...schemas.billing import PlanType
 from ...schemas.trading import (
+    AnalysisJob,
     AnalysisRequest,
     AnalysisResult,
+    BacktestRequest,
+    BacktestResult,
     ManualAnalysisRequest,
     Signal,
     TradingPair
 )
-from ...services.ai_service import generate_mock_analysis, analyze_manual_input
-from ...services.market_service import get_mock_trading_pairs, get_mock_live_signals
+from ...services.backtest import default_params, run_backtest
+from ...services.ai_service import (
+    analyze_manual_input,
+    generate_mock_analysis,
+    replay_analysis,
+    stream_analysis,
+    stream_manual_input
+)
+from ...services.chart_images import (
+    InvalidChartImage,
+    ProcessedImage,
+    check_chart_images,
+    prepare_chart_images,
+    prepare_image_file
+)
+from ...services.analysis_cache import analysis_cache, analysis_cache_key
+from ...services.history_store import history_store
+from ...services.job_queue import job_queue, to_analysis_job
+from ...services.rate_limiter import rate_limiter, user_plan
+from ...services.signal_engine import ACTIVE, CLOSED, signal_engine
+from ...services.market_service import get_trading_pairs_payload, trading_pairs_version, BASE_PRICES
+from ...services.candle_store import TIMEFRAME_SECONDS
+from ...services.resampler import get_candle_store
+from ...core.config import settings
+from ...core.metrics import metrics
+from ...core.responses import EncodedJSONResponse, cache_headers, etag_matches, make_etag, not_modified
 from ...core.security import get_current_user
+from ...core.uploads import read_multipart
 
 router = APIRouter(prefix="/trading", tags=["Trading"])
 
+_history_adapter = TypeAdapter(List[AnalysisResult])
+
+# Backtests hold years of candles in memory while they run; a small dedicated
+# pool bounds how many run at once and keeps them off the default executor.
+_backtest_executor = ThreadPoolExecutor(
+    max_workers=settings.BACKTEST_WORKERS,
+    thread_name_prefix="backtest"
+)
+
+
+def _validate_market(pair: str, timeframe: str) -> None:
+    if pair not in BASE_PRICES:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Trading pair {pair} not found. Valid pairs: {', '.join(BASE_PRICES)}"
+        )
+    if timeframe not in TIMEFRAME_SECONDS:
+        raise HTTPException(
+            status_code=400,
+            detail=f"Unsupported timeframe {timeframe}. Valid timeframes: {', '.join(TIMEFRAME_SECONDS)}"
+        )
+    if not len(get_candle_store(pair, timeframe, BASE_PRICES[pair])):
+        raise HTTPException(
+            status_code=409,
+            detail=f"No closed {timeframe} candles for {pair} yet"
+        )
+
 
-mock_analysis_history = {}
+async def _charge(user_id: str, action: str) -> PlanType:
+    """Count one ``action`` against the user's plan limits; 429 with ``Retry-After`` when exceeded."""
+    plan = await user_plan(user_id)
+    decision = await rate_limiter.acquire_async(user_id, plan, action)
+    if not decision.allowed:
+        raise HTTPException(
+            status_code=429,
+            detail=f"Too many requests: {decision.reason}",
+            headers={"Retry-After": str(math.ceil(decision.retry_after))}
+        )
+    return plan
+
+
+def _enqueue(user_id: str, kind: str, request: BaseModel, plan: PlanType) -> EncodedJSONResponse:
+    job = job_queue.submit(user_id, kind, request.model_dump(), plan)
+    return EncodedJSONResponse(
+        to_analysis_job(job).model_dump_json(),
+        status_code=202,
+        headers={"Location": f"{router.prefix}/jobs/{job['id']}"}
+    )
+
+
+def _user_copy(shared: AnalysisResult) -> AnalysisResult:
+    """A user's own copy of a shared (cached) result, so history changes never reach the cache."""
+    return shared.model_copy(update={
+        "id": f"analysis_{datetime.now().timestamp()}",
+        "created_at": datetime.now()
+    })
+
+
+async def _run_analysis(user_id: str, request: AnalysisRequest) -> AnalysisResult:
+    key, expires_at = analysis_cache_key(request)
+    shared = await analysis_cache.get_or_compute(key, expires_at, lambda: generate_mock_analysis(
+        pair=request.pair,
+        timeframe=request.timeframe,
+        strategy=request.strategy,
+        ai_models=request.ai_models
+    ))
+    
+    analysis = _user_copy(shared)
+    await history_store.add_async(user_id, analysis)
+    return analysis
 
 
-@router.post("/analyze", response_model=AnalysisResult)
+@router.post("/analyze", response_model=AnalysisResult, responses={202: {"model": AnalysisJob}})
 async def analyze_trade(
     request: AnalysisRequest,
+    run_async: bool = Query(False, alias="async"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Run automated AI analysis for a trading pair.
     
-    TODO: Integrate with real AI models (GPT-4, Claude, Gemini)
-    TODO: Add rate limiting based on subscription tier
-    TODO: Store analysis results in database
+    Results are shared across users through the analysis cache for the
+    current candle of the requested timeframe; identical concurrent requests
+    trigger a single upstream analysis. Each user's history gets its own copy.
+    Requests are charged to the user's plan limits before any model runs
+    (429 with ``Retry-After`` when exceeded).
+    
+    With ``?async=true`` the analysis is queued as a background job instead
+    and a 202 with the job is returned; poll ``/trading/jobs/{id}`` or listen
+    on the ``/market/stream`` user channel for the result.
     """
     
-    analysis = generate_mock_analysis(
+    _validate_market(request.pair, request.timeframe)
+    plan = await _charge(current_user["user_id"], "analysis")
+    
+    if run_async:
+        return _enqueue(current_user["user_id"], "analyze", request, plan)
+    return await _run_analysis(current_user["user_id"], request)
+
+
+def _sse_event(event: str, payload: Any) -> str:
+    with metrics.span("serialize.sse"):
+        if isinstance(payload, BaseModel):
+            data = payload.model_dump_json()
+        else:
+            data = json.dumps(payload)
+    return f"event: {event}\ndata: {data}\n\n"
+
+
+async def _stream_to_sse(
+    events: AsyncIterator[Tuple[str, Any]],
+    user_id: str,
+    cache_key: Any = None,
+    expires_at: float = 0.0
+) -> AsyncIterator[str]:
+    async for event, payload in events:
+        if event == "result":
+            if cache_key is not None:
+                analysis_cache.put(cache_key, payload, expires_at)
+                payload = _user_copy(payload)
+            await history_store.add_async(user_id, payload)
+        yield _sse_event(event, payload)
+
+
+@router.post("/analyze/stream")
+async def analyze_trade_stream(
+    request: AnalysisRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Run automated AI analysis and stream it as Server-Sent Events.
+    
+    Emits ``indicators`` first, then one ``model`` event per AI model as it
+    finishes, then ``consensus``, ``risk`` and the complete ``result``. The
+    final result is stored in the shared analysis cache and a copy in the
+    user's history.
+    
+    When the analysis cache already holds the result for this candle, or a
+    non-streaming request is computing it, that result is replayed as the
+    same events instead of calling the models again.
+    """
+    
+    _validate_market(request.pair, request.timeframe)
+    await _charge(current_user["user_id"], "analysis")
+    
+    key, expires_at = analysis_cache_key(request)
+    cached = await analysis_cache.lookup(key)
+    if cached is not None:
+        events = replay_analysis(cached)
+    else:
+        events = stream_analysis(
+            pair=request.pair,
+            timeframe=request.timeframe,
+            strategy=request.strategy,
+            ai_models=request.ai_models
+        )
+    return StreamingResponse(
+        _stream_to_sse(events, current_user["user_id"], key, expires_at),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+async def _prepare_images(request: ManualAnalysisRequest) -> List[ProcessedImage]:
+    try:
+        return await prepare_chart_images(request.images)
+    except InvalidChartImage as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+
+
+async def _run_manual_analysis(
+    user_id: str,
+    request: ManualAnalysisRequest,
+    images: Optional[List[ProcessedImage]] = None
+) -> AnalysisResult:
+    if images is None:
+        images = await prepare_chart_images(request.images)
+    analysis = await analyze_manual_input(
         pair=request.pair,
         timeframe=request.timeframe,
-        strategy=request.strategy,
+        text_analysis=request.text_analysis,
+        images=images,
         ai_models=request.ai_models
     )
-    
-    user_id = current_user["user_id"]
-    if user_id not in mock_analysis_history:
-        mock_analysis_history[user_id] = []
-    
-    mock_analysis_history[user_id].append(analysis)
-    
+    await history_store.add_async(user_id, analysis)
     return analysis
 
 
-@router.post("/manual-analyze", response_model=AnalysisResult)
+@router.post("/manual-analyze", response_model=AnalysisResult, responses={202: {"model": AnalysisJob}})
 async def manual_analyze(
     request: ManualAnalysisRequest,
+    run_async: bool = Query(False, alias="async"),
     current_user: dict = Depends(get_current_user)
 ):
     """
     Analyze manual input with text and chart images using AI.
     
-    TODO: Implement GPT-4 Vision for chart image analysis
+    ``?async=true`` queues it as a background job, as for ``/trading/analyze``.
+    
+    Images are decoded, downsized and re-encoded once (400 if undecodable),
+    deduplicated by content hash, and the same buffers go to every model.
+    Queued jobs only have the image headers checked here and process the
+    images when they run.
+    The request is charged against the plan's quota before any image is
+    decoded, so over-quota callers are turned away without that work.
+    
     TODO: Process text input for pattern recognition
     TODO: Combine multiple model outputs for consensus
     """
@@ -66,62 +265,254 @@ async def manual_analyze(
             detail="At least one AI model must be selected"
         )
     
-    analysis = analyze_manual_input(
+    _validate_market(request.pair, request.timeframe)
+    plan = await _charge(current_user["user_id"], "analysis")
+    
+    if run_async:
+        # The job processes the images itself; only reject bad ones up front.
+        try:
+            check_chart_images(request.images)
+        except InvalidChartImage as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+        return _enqueue(current_user["user_id"], "manual-analyze", request, plan)
+    images = await _prepare_images(request)
+    return await _run_manual_analysis(current_user["user_id"], request, images)
+
+
+@router.post("/manual-analyze/upload", response_model=AnalysisResult)
+async def manual_analyze_upload(
+    request: Request,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Multipart variant of ``/trading/manual-analyze``.
+    
+    Takes ``pair``, ``timeframe``, ``text_analysis`` and ``ai_models``
+    (repeated or comma-separated) as form fields and chart images as
+    ``images`` file parts, which stream to spooled temp files instead of
+    arriving base64-encoded in JSON. Size caps are per file and per request
+    (413 when exceeded). Background jobs are not offered here, since a
+    queued job would have to persist the images.
+    """
+    
+    upload = await read_multipart(request)
+    try:
+        ai_models = [
+            model.strip()
+            for value in upload.getlist("ai_models")
+            for model in value.split(",")
+            if model.strip()
+        ]
+        try:
+            manual_request = ManualAnalysisRequest(
+                pair=upload.get("pair"),
+                timeframe=upload.get("timeframe"),
+                text_analysis=upload.get("text_analysis"),
+                ai_models=ai_models
+            )
+        except ValidationError as exc:
+            raise HTTPException(status_code=422, detail=exc.errors(include_url=False))
+        
+        if not manual_request.ai_models:
+            raise HTTPException(
+                status_code=400,
+                detail="At least one AI model must be selected"
+            )
+        
+        _validate_market(manual_request.pair, manual_request.timeframe)
+        await _charge(current_user["user_id"], "analysis")
+        
+        images: List[ProcessedImage] = []
+        seen = set()
+        try:
+            for part in upload.files:
+                if part.field != "images":
+                    continue
+                image = await prepare_image_file(part.file, part.digest)
+                if image.digest not in seen:
+                    seen.add(image.digest)
+                    images.append(image)
+        except InvalidChartImage as exc:
+            raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        upload.close()
+    
+    return await _run_manual_analysis(current_user["user_id"], manual_request, images)
+
+
+@router.post("/manual-analyze/stream")
+async def manual_analyze_stream(
+    request: ManualAnalysisRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Streaming (Server-Sent Events) variant of ``/trading/manual-analyze``.
+    
+    Emits the same events as ``/trading/analyze/stream``.
+    """
+    
+    if not request.ai_models:
+        raise HTTPException(
+            status_code=400,
+            detail="At least one AI model must be selected"
+        )
+    
+    _validate_market(request.pair, request.timeframe)
+    await _charge(current_user["user_id"], "analysis")
+    images = await _prepare_images(request)
+    
+    events = stream_manual_input(
         pair=request.pair,
         timeframe=request.timeframe,
         text_analysis=request.text_analysis,
-        images=request.images,
+        images=images,
         ai_models=request.ai_models
     )
+    return StreamingResponse(
+        _stream_to_sse(events, current_user["user_id"]),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+
+@router.get("/jobs/{job_id}", response_model=AnalysisJob)
+async def get_job(job_id: str, current_user: dict = Depends(get_current_user)):
+    """Status of a background analysis job and, once completed, its result."""
     
-    user_id = current_user["user_id"]
-    if user_id not in mock_analysis_history:
-        mock_analysis_history[user_id] = []
-    
-    mock_analysis_history[user_id].append(analysis)
+    job = job_queue.get(job_id)
+    if job is None or job["user_id"] != current_user["user_id"]:
+        raise HTTPException(status_code=404, detail="Job not found")
     
-    return analysis
+    return to_analysis_job(job)
 
 
 @router.get("/signals", response_model=List[Signal])
-async def get_signals(current_user: dict = Depends(get_current_user)):
+async def get_signals(
+    pair: Optional[str] = Query(None),
+    status: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=500),
+    current_user: dict = Depends(get_current_user)
+):
     """
-    Get live trading signals.
+    Get live trading signals, newest first.
+    
+    Signals are produced by the signal engine as candles close, so this is a
+    read of precomputed state, filtered by ``pair`` and ``status``
+    (``active`` or ``closed``).
     
-    TODO: Generate signals from real-time market analysis
     TODO: Filter by user preferences and subscription tier
-    TODO: Add signal quality scoring
+    TODO: Add signal performance tracking
     """
     
-    return get_mock_live_signals()
+    if pair is not None and pair not in BASE_PRICES:
+        raise HTTPException(status_code=400, detail=f"Unsupported pair: {pair}")
+    if status is not None and status not in (ACTIVE, CLOSED):
+        raise HTTPException(status_code=400, detail=f"Unsupported status: {status}")
+    
+    await _charge(current_user["user_id"], "signals")
+    return signal_engine.store.query(pair, status, limit)
+
+
+@router.post("/backtest", response_model=BacktestResult)
+async def backtest_strategy(
+    request: BacktestRequest,
+    current_user: dict = Depends(get_current_user)
+):
+    """
+    Replay a strategy over ``years`` of candles and report how it would have done.
+    
+    Entries follow the signal engine's rules for the strategy; each trade
+    exits at its ATR-based stop or target. Parameters left unset use the
+    strategy's defaults. Returns win rate, max drawdown, Sharpe ratio, the
+    equity curve and the most recent trades.
+    
+    TODO: Model spread, commission and slippage
+    """
+    
+    _validate_market(request.pair, request.timeframe)
+    if not 0 < request.years <= settings.BACKTEST_MAX_YEARS:
+        raise HTTPException(status_code=400, detail=f"years must be in (0, {settings.BACKTEST_MAX_YEARS}]")
+    if request.initial_balance <= 0 or not 0 < request.risk_per_trade <= 1:
+        raise HTTPException(status_code=400, detail="initial_balance must be positive and risk_per_trade in (0, 1]")
+    
+    overrides = {
+        field: value
+        for field in ("fast_ema", "slow_ema", "stop_atr", "reward")
+        if (value := getattr(request, field)) is not None
+    }
+    params = default_params(request.strategy)._replace(**overrides)
+    if not 1 < params.fast_ema < params.slow_ema or params.stop_atr <= 0 or params.reward <= 0:
+        raise HTTPException(
+            status_code=400,
+            detail="Need 1 < fast_ema < slow_ema and positive stop_atr and reward"
+        )
+    
+    await _charge(current_user["user_id"], "analysis")
+    return await asyncio.get_running_loop().run_in_executor(
+        _backtest_executor, run_backtest, request.pair, request.timeframe, request.strategy,
+        request.years, request.initial_balance, request.risk_per_trade, params
+    )
 
 
 @router.get("/pairs", response_model=List[TradingPair])
-async def get_trading_pairs():
+async def get_trading_pairs(if_none_match: Optional[str] = Header(None)):
     """
     Get list of available trading pairs with current prices.
     
+    Prices change once per base bar; the ETag follows that and a matching
+    ``If-None-Match`` gets a 304.
+    
     TODO: Fetch real-time prices from forex data provider
     TODO: Add support for crypto and commodities
     """
     
-    return get_mock_trading_pairs()
+    version, max_age = trading_pairs_version()
+    headers = cache_headers(make_etag("pairs", version), max_age)
+    if etag_matches(if_none_match, headers["ETag"]):
+        return not_modified(headers)
+    
+    return EncodedJSONResponse(get_trading_pairs_payload(), headers=headers)
 
 
 @router.get("/history", response_model=List[AnalysisResult])
 async def get_analysis_history(
-    limit: int = 50,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    pair: Optional[str] = None,
+    strategy: Optional[str] = None,
+    start: Optional[datetime] = None,
+    end: Optional[datetime] = None,
     current_user: dict = Depends(get_current_user)
 ):
     """
-    Get user's analysis history.
+    Get user's analysis history, newest first.
+    
+    Optional filters by pair, strategy and ``start``/``end`` date range. When
+    more results are available the ``X-Next-Cursor`` response header holds the
+    cursor to pass for the next page. Stored results are already validated, so
+    the page is serialized directly instead of going through ``response_model``.
     
-    TODO: Fetch from database with pagination
-    TODO: Add filtering by pair, date, and strategy
     TODO: Include performance metrics
     """
     
-    user_id = current_user["user_id"]
-    history = mock_analysis_history.get(user_id, [])
+    try:
+        results, next_cursor = await history_store.query_async(
+            current_user["user_id"],
+            limit=limit,
+            cursor=cursor,
+            pair=pair,
+            strategy=strategy,
+            start=start,
+            end=end
+        )
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    headers = {"X-Next-Cursor": next_cursor} if next_cursor is not None else None
     
-    return sorted(history, key=lambda x: x.created_at, reverse=True)[:limit]
+    with metrics.span("serialize.history"):
+        body = _history_adapter.dump_json(results)
+    return EncodedJSONResponse(body, headers=headers)
+
+
+job_queue.register("analyze", lambda user_id, payload: _run_analysis(user_id, AnalysisRequest(**payload)))
+job_queue.register("manual-analyze", lambda user_id, payload: _run_manual_analysis(user_id, ManualAnalysisRequest(**payload)))
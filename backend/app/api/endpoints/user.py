@@ -3,6 +3,7 @@ from typing import Dict, Any
 from datetime import datetime, timedelta
 from ...schemas.billing import Subscription, BillingInfo, PlanType, PaymentStatus
 from ...core.security import get_current_user
+from ...services.rate_limiter import PLAN_LIMITS, rate_limiter, user_plan
 
 router = APIRouter(prefix="/user", tags=["User"])
 
@@ -94,19 +95,22 @@ async def get_billing_info(current_user: dict = Depends(get_current_user)):
     """
     Get billing information including subscription and payment methods.
     
+    Usage counts come from the rate limiter's counters for the current month.
+    
     TODO: Integrate with payment provider
     TODO: Add invoice history
-    TODO: Include usage metrics
     """
     
     user_id = current_user["user_id"]
     
+    plan = await user_plan(user_id)
+    
     subscription = mock_subscriptions.get(user_id)
     if not subscription:
         subscription = Subscription(
             id=f"sub_{user_id}",
             user_id=user_id,
-            plan_type=PlanType.FREE,
+            plan_type=plan,
             status=PaymentStatus.ACTIVE,
             current_period_start=datetime.now(),
             current_period_end=datetime.now() + timedelta(days=30),
@@ -117,8 +121,9 @@ async def get_billing_info(current_user: dict = Depends(get_current_user)):
         subscription=subscription,
         payment_method=None,
         usage={
-            "analyses_this_month": 25,
-            "limit": 100,
-            "signals_accessed": 150
+            "analyses_this_month": await rate_limiter.usage_async(user_id, "analysis"),
+            "limit": PLAN_LIMITS[plan]["analysis"].monthly,
+            "rate_limit_per_minute": PLAN_LIMITS[plan]["analysis"].per_minute,
+            "signals_accessed": await rate_limiter.usage_async(user_id, "signals")
         }
     )
@@ -0,0 +1,182 @@
+import gzip
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
+
+from .config import settings
+from .metrics import metrics
+
+try:
+    import brotli
+except ImportError:  # brotli is optional; gzip is always available
+    brotli = None
+
+
+SUPPORTED_ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick the supported encoding with the highest q-value, preferring br on ties."""
+    best, best_q = None, 0.0
+    for item in accept_encoding.split(","):
+        name, _, params = item.strip().partition(";")
+        name = name.strip().lower()
+        q = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                q = float(params[2:])
+            except ValueError:
+                continue
+        candidates = SUPPORTED_ENCODINGS if name == "*" else (name,)
+        for encoding in candidates:
+            if encoding in SUPPORTED_ENCODINGS and (q > best_q or (
+                q == best_q and best is not None
+                and SUPPORTED_ENCODINGS.index(encoding) < SUPPORTED_ENCODINGS.index(best)
+            )):
+                best, best_q = encoding, q
+    return best
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    with metrics.span(f"compress.{encoding}"):
+        if encoding == "br":
+            return brotli.compress(body, quality=settings.COMPRESSION_BROTLI_QUALITY)
+        return gzip.compress(body, compresslevel=settings.COMPRESSION_GZIP_LEVEL, mtime=0)
+
+
+def _with_vary(headers: List[Tuple[bytes, bytes]]) -> List[Tuple[bytes, bytes]]:
+    """``headers`` with ``Accept-Encoding`` added to (or as) the ``Vary`` header."""
+    out, vary = [], None
+    for name, value in headers:
+        if name.lower() == b"vary":
+            vary = value
+        else:
+            out.append((name, value))
+    if vary is None:
+        vary = b"Accept-Encoding"
+    elif b"accept-encoding" not in vary.lower() and vary.strip() != b"*":
+        vary += b", Accept-Encoding"
+    out.append((b"vary", vary))
+    return out
+
+
+class CompressedBodyCache:
+    """LRU of compressed bodies keyed by (ETag, encoding), so each version is compressed once."""
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Tuple[bytes, str], bytes]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, etag: bytes, encoding: str, body: bytes) -> bytes:
+        key = (etag, encoding)
+        compressed = self._entries.get(key)
+        if compressed is not None:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return compressed
+
+        self.misses += 1
+        compressed = compress(body, encoding)
+        self._entries[key] = compressed
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+        return compressed
+
+
+class CompressionMiddleware:
+    """
+    Negotiated gzip/br compression for complete responses above ``minimum_size``.
+
+    Streaming responses (SSE, anything sent in more than one body message) and
+    responses that are already encoded pass through untouched. Responses that
+    would be compressed carry ``Vary: Accept-Encoding`` even when this client
+    gets them uncompressed, so shared caches keep the variants apart. Responses with
+    an ETag are compressed once per (ETag, encoding) through
+    ``CompressedBodyCache``; their ETag is sent weak, since the bytes differ
+    from the identity representation.
+    """
+
+    def __init__(self, app, minimum_size: int, cache: CompressedBodyCache):
+        self.app = app
+        self.minimum_size = minimum_size
+        self.cache = cache
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = None
+        for name, value in scope["headers"]:
+            if name == b"accept-encoding":
+                encoding = negotiate_encoding(value.decode("latin-1"))
+                break
+
+        start_message: Optional[dict] = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+
+            if message["type"] == "http.response.start":
+                headers = {name.lower(): value for name, value in message.get("headers", [])}
+                if b"content-encoding" in headers or headers.get(b"content-type", b"").startswith(b"text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            if encoding is None:
+                # Compressible, but not for this client: caches must still key on Accept-Encoding.
+                await send({**start_message, "headers": _with_vary(start_message.get("headers", []))})
+                await send(message)
+                return
+
+            await self._send_encoded(send, start_message, body, encoding)
+
+        await self.app(scope, receive, send_compressed)
+
+    async def _send_encoded(self, send, start_message: dict, body: bytes, encoding: str) -> None:
+        headers: Dict[bytes, bytes] = {}
+        extra = []
+        for name, value in start_message.get("headers", []):
+            lowered = name.lower()
+            if lowered in (b"content-length", b"etag"):
+                headers[lowered] = value
+            else:
+                extra.append((name, value))
+        extra = _with_vary(extra)
+
+        etag = headers.get(b"etag")
+        if etag is not None:
+            compressed = self.cache.get(etag, encoding, body)
+            if not etag.startswith(b"W/"):
+                etag = b"W/" + etag
+            extra.append((b"etag", etag))
+        else:
+            compressed = compress(body, encoding)
+
+        extra.append((b"content-encoding", encoding.encode("latin-1")))
+        extra.append((b"content-length", str(len(compressed)).encode("latin-1")))
+
+        await send({**start_message, "headers": extra})
+        await send({"type": "http.response.body", "body": compressed})
+
+
+compressed_bodies = CompressedBodyCache(settings.COMPRESSED_CACHE_SIZE)
@@ -10,6 +10,11 @@ class Settings(BaseSettings):
     JWT_SECRET_KEY: str = "your-secret-key-change-in-production-09f26e094faa6ca2556c818166b7a9563b93f7099f6f0f4caa6cf63b88e8d3e7"
     JWT_ALGORITHM: str = "HS256"
     ACCESS_TOKEN_EXPIRE_MINUTES: int = 60 * 24 * 7
+    TOKEN_CACHE_SIZE: int = 10000
+    
+    BCRYPT_ROUNDS: int = 12
+    PASSWORD_HASH_WORKERS: int = 4
+    PASSWORD_HASH_CONCURRENCY: int = 8
     
     CORS_ORIGINS: List[str] = [
         "http://localhost:5000",
@@ -20,6 +25,79 @@ class Settings(BaseSettings):
     
     API_BASE_URL: str = "http://localhost:8000"
     
+    BASE_HISTORY_DAYS: int = 30
+    MAX_CANDLES_PER_REQUEST: int = 5000
+    ARCHIVE_DIR: str = "data/candles"
+    ARCHIVE_INDEX_STRIDE: int = 4096
+    
+    OPENAI_API_KEY: str = ""
+    ANTHROPIC_API_KEY: str = ""
+    GOOGLE_API_KEY: str = ""
+    AI_MODEL_TIMEOUT: float = 20.0
+    AI_MOCK_LATENCY: float = 0.0
+    AI_PROVIDER_CONCURRENCY: int = 8
+    
+    CHART_IMAGE_MAX_DIMENSION: int = 1568
+    CHART_IMAGE_FORMAT: str = "JPEG"
+    CHART_IMAGE_QUALITY: int = 85
+    CHART_IMAGE_MAX_BYTES: int = 10 * 1024 * 1024
+    CHART_IMAGE_MAX_PIXELS: int = 40_000_000
+    CHART_IMAGE_CACHE_BYTES: int = 64 * 1024 * 1024
+    ANALYSIS_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    
+    UPLOAD_MAX_FILE_BYTES: int = 10 * 1024 * 1024
+    UPLOAD_MAX_REQUEST_BYTES: int = 25 * 1024 * 1024
+    UPLOAD_MAX_FILES: int = 5
+    UPLOAD_MAX_FIELD_BYTES: int = 64 * 1024
+    UPLOAD_SPOOL_BYTES: int = 1024 * 1024
+    
+    SQLITE_POOL_SIZE: int = 5
+    
+    USER_BACKEND: str = "memory"
+    USER_DB_PATH: str = "yoforex_users.db"
+    
+    HISTORY_BACKEND: str = "memory"
+    HISTORY_DB_PATH: str = "yoforex_history.db"
+    HISTORY_MAX_PER_USER: int = 500
+    
+    RATE_LIMIT_BACKEND: str = "memory"
+    RATE_LIMIT_DB_PATH: str = "yoforex_ratelimit.db"
+    
+    JOB_BACKEND: str = "memory"
+    JOB_DB_PATH: str = "yoforex_jobs.db"
+    JOB_WORKERS: int = 4
+    JOB_MAX_STORED: int = 10000
+    
+    SIGNAL_ENGINE_INTERVAL: float = 1.0
+    SIGNAL_MAX_CLOSED: int = 1000
+    
+    TICK_SOURCE: str = "simulator"
+    TICK_REPLAY_PATH: str = "data/ticks.csv"
+    TICK_REPLAY_SPEED: float = 1.0
+    TICK_SIMULATOR_RATE: float = 100.0
+    TICK_BATCH_SIZE: int = 1024
+    TICK_LATENESS_SECONDS: float = 2.0
+    TICK_ARCHIVE_BARS: bool = False
+    
+    BACKTEST_MAX_YEARS: float = 5.0
+    BACKTEST_EQUITY_POINTS: int = 500
+    BACKTEST_MAX_TRADES: int = 500
+    BACKTEST_WORKERS: int = 2
+    SWEEP_WORKERS: int = 0
+    SWEEP_CHUNK_SIZE: int = 16
+    
+    STREAM_TICK_INTERVAL: float = 1.0
+    STREAM_CLIENT_BUFFER: int = 100
+    ENCODED_PAYLOAD_CACHE_MAX_BYTES: int = 32 * 1024 * 1024
+    NEWS_MAX_AGE: int = 60
+    
+    COMPRESSION_MIN_SIZE: int = 1024
+    COMPRESSION_GZIP_LEVEL: int = 6
+    COMPRESSION_BROTLI_QUALITY: int = 5
+    COMPRESSED_CACHE_SIZE: int = 256
+    
+    METRICS_ENABLED: bool = True
+    
     class Config:
         env_file = ".env"
         case_sensitive = True
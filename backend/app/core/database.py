@@ -0,0 +1,33 @@
+import queue
+import sqlite3
+from contextlib import contextmanager
+from typing import Iterator
+
+
+class SQLiteConnectionPool:
+    """
+    Fixed-size pool of SQLite connections to one database file.
+
+    Connections are opened once in WAL mode and handed out to one caller at a
+    time; ``connection()`` blocks when all of them are in use.
+    """
+
+    def __init__(self, path: str, size: int = 5):
+        self.path = path
+        self._pool: "queue.LifoQueue[sqlite3.Connection]" = queue.LifoQueue(maxsize=size)
+        for _ in range(size):
+            conn = sqlite3.connect(path, check_same_thread=False)
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._pool.put(conn)
+
+    @contextmanager
+    def connection(self) -> Iterator[sqlite3.Connection]:
+        """Borrow a connection; the block runs in a transaction that commits on success."""
+        conn = self._pool.get()
+        try:
+            with conn:
+                yield conn
+        finally:
+            self._pool.put(conn)
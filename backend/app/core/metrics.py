@@ -0,0 +1,172 @@
+import time
+from bisect import bisect_left
+from contextlib import nullcontext
+from typing import Dict, List, Tuple
+
+from .config import settings
+
+
+DEFAULT_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_NULL_SPAN = nullcontext()
+
+
+class Histogram:
+    """Fixed-bucket latency histogram; per-bucket counts are made cumulative on render."""
+
+    __slots__ = ("buckets", "counts", "sum", "count")
+
+    def __init__(self, buckets: Tuple[float, ...]):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+
+class _Span:
+    __slots__ = ("_metrics", "_name", "_start")
+
+    def __init__(self, metrics: "Metrics", name: str):
+        self._metrics = metrics
+        self._name = name
+
+    def __enter__(self) -> "_Span":
+        self._start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self._metrics.observe_span(self._name, time.perf_counter() - self._start)
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _labels(**labels: str) -> str:
+    return ",".join(f'{name}="{_escape(str(value))}"' for name, value in labels.items())
+
+
+class Metrics:
+    """
+    In-process request and span metrics rendered in Prometheus text format.
+
+    Request latency is keyed by method and route template (not the raw path),
+    so path parameters don't create new series. When disabled, ``span()``
+    returns a shared no-op context manager and nothing is recorded.
+    """
+
+    def __init__(self, enabled: bool = True, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self.in_flight = 0
+        self._requests: Dict[Tuple[str, str], Histogram] = {}
+        self._statuses: Dict[Tuple[str, str, int], int] = {}
+        self._spans: Dict[str, Histogram] = {}
+
+    def span(self, name: str):
+        """Time the enclosed block as ``name``: ``with metrics.span("indicators"): ...``."""
+        if not self.enabled:
+            return _NULL_SPAN
+        return _Span(self, name)
+
+    def observe_span(self, name: str, seconds: float) -> None:
+        if not self.enabled:
+            return
+        histogram = self._spans.get(name)
+        if histogram is None:
+            histogram = self._spans[name] = Histogram(self.buckets)
+        histogram.observe(seconds)
+
+    def observe_request(self, method: str, route: str, status_code: int, seconds: float) -> None:
+        key = (method, route)
+        histogram = self._requests.get(key)
+        if histogram is None:
+            histogram = self._requests[key] = Histogram(self.buckets)
+        histogram.observe(seconds)
+        status_key = (method, route, status_code)
+        self._statuses[status_key] = self._statuses.get(status_key, 0) + 1
+
+    def reset(self) -> None:
+        self._requests.clear()
+        self._statuses.clear()
+        self._spans.clear()
+
+    def _render_histogram(self, lines: List[str], name: str, series: Dict, label_names: Tuple[str, ...]) -> None:
+        lines.append(f"# TYPE {name} histogram")
+        for key, histogram in sorted(series.items()):
+            values = key if isinstance(key, tuple) else (key,)
+            base = _labels(**dict(zip(label_names, values)))
+            cumulative = 0
+            for bound, count in zip(histogram.buckets, histogram.counts):
+                cumulative += count
+                lines.append(f'{name}_bucket{{{base},le="{bound}"}} {cumulative}')
+            lines.append(f'{name}_bucket{{{base},le="+Inf"}} {histogram.count}')
+            lines.append(f"{name}_sum{{{base}}} {histogram.sum}")
+            lines.append(f"{name}_count{{{base}}} {histogram.count}")
+
+    def render(self) -> str:
+        lines = [
+            "# HELP yoforex_http_requests_in_flight HTTP requests currently being served.",
+            "# TYPE yoforex_http_requests_in_flight gauge",
+            f"yoforex_http_requests_in_flight {self.in_flight}",
+            "# HELP yoforex_http_request_duration_seconds HTTP request latency by route.",
+        ]
+        self._render_histogram(lines, "yoforex_http_request_duration_seconds", self._requests, ("method", "route"))
+
+        lines.append("# HELP yoforex_http_responses_total HTTP responses by route and status code.")
+        lines.append("# TYPE yoforex_http_responses_total counter")
+        for (method, route, status_code), count in sorted(self._statuses.items()):
+            lines.append(f"yoforex_http_responses_total{{{_labels(method=method, route=route, status=status_code)}}} {count}")
+
+        lines.append("# HELP yoforex_span_duration_seconds Duration of named internal spans.")
+        self._render_histogram(lines, "yoforex_span_duration_seconds", self._spans, ("span",))
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """
+    ASGI middleware recording latency, status and in-flight count per route.
+
+    Runs as plain ASGI rather than ``BaseHTTPMiddleware`` so streaming responses
+    are not buffered; the route template is read from the scope after routing.
+    """
+
+    def __init__(self, app, metrics: Metrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        metrics = self.metrics
+        metrics.in_flight += 1
+        start = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_with_status)
+        finally:
+            metrics.in_flight -= 1
+            route = scope.get("route")
+            metrics.observe_request(
+                scope["method"],
+                getattr(route, "path", "unmatched"),
+                status_code,
+                time.perf_counter() - start
+            )
+
+
+metrics = Metrics(enabled=settings.METRICS_ENABLED)
@@ -0,0 +1,96 @@
+import hashlib
+from collections import OrderedDict
+from typing import Callable, Hashable, Optional, Tuple
+
+import orjson
+from fastapi import status
+from fastapi.responses import Response
+
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY
+
+
+def dumps(content) -> bytes:
+    """Encode ``content`` the same way ``ORJSONResponse`` does."""
+    return orjson.dumps(content, option=ORJSON_OPTIONS)
+
+
+def make_etag(*parts: Hashable) -> str:
+    """Strong ETag derived from the content version ``parts`` (not from the body)."""
+    return '"' + hashlib.blake2b(repr(parts).encode("utf-8"), digest_size=8).hexdigest() + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """``If-None-Match`` comparison per RFC 9110: weak comparison, ``*`` matches anything."""
+    if not if_none_match:
+        return False
+    candidates = [tag.strip() for tag in if_none_match.split(",")]
+    return "*" in candidates or any(tag.removeprefix("W/") == etag for tag in candidates)
+
+
+def cache_headers(etag: str, max_age: int) -> dict:
+    return {"ETag": etag, "Cache-Control": f"public, max-age={max(0, max_age)}"}
+
+
+def not_modified(headers: dict) -> Response:
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+
+class EncodedJSONResponse(Response):
+    """
+    JSON response whose body is already encoded bytes.
+
+    Returning one from an endpoint skips ``response_model`` validation and
+    ``jsonable_encoder`` entirely; use it only for data that was validated
+    when it was built.
+    """
+
+    media_type = "application/json"
+
+
+class EncodedPayloadCache:
+    """
+    LRU of pre-encoded JSON bodies, each tagged with the content version it was built from.
+
+    A lookup with a different version re-encodes and replaces the entry, so
+    callers pass whatever changes when the content does (e.g. the last candle
+    timestamp) and never have to invalidate explicitly. Total body size is
+    capped at ``max_bytes``; least recently used bodies are evicted first and
+    a body larger than the cap is returned without being cached.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[Hashable, bytes]]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, version: Hashable, encode: Callable[[], bytes]) -> bytes:
+        entry = self._entries.get(key)
+        if entry is not None and entry[0] == version:
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+        self.misses += 1
+        body = encode()
+        if entry is not None:
+            del self._entries[key]
+            self.size -= len(entry[1])
+        if len(body) > self.max_bytes:
+            return body
+        self._entries[key] = (version, body)
+        self.size += len(body)
+        while self.size > self.max_bytes:
+            _, (_, evicted) = self._entries.popitem(last=False)
+            self.size -= len(evicted)
+        return body
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
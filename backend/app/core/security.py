@@ -1,24 +1,55 @@
+import asyncio
+import hashlib
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
-from typing import Optional
+from typing import Dict, Optional, Tuple
 from jose import JWTError, jwt
 import bcrypt
 from fastapi import Depends, HTTPException, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from .config import settings
+from .metrics import metrics
 
 security = HTTPBearer()
 
+# bcrypt releases the GIL while hashing, so a small thread pool keeps the
+# event loop free; the semaphore caps how many hashes are queued at once.
+_password_executor = ThreadPoolExecutor(
+    max_workers=settings.PASSWORD_HASH_WORKERS,
+    thread_name_prefix="password-hash"
+)
+_password_slots = asyncio.Semaphore(settings.PASSWORD_HASH_CONCURRENCY)
+
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     return bcrypt.checkpw(plain_password.encode('utf-8'), hashed_password.encode('utf-8'))
 
 
 def get_password_hash(password: str) -> str:
-    salt = bcrypt.gensalt()
+    salt = bcrypt.gensalt(rounds=settings.BCRYPT_ROUNDS)
     hashed = bcrypt.hashpw(password.encode('utf-8'), salt)
     return hashed.decode('utf-8')
 
 
+async def _run_password_task(span: str, func, *args):
+    async with _password_slots:
+        loop = asyncio.get_running_loop()
+        with metrics.span(span):
+            return await loop.run_in_executor(_password_executor, func, *args)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """``verify_password`` on the password worker pool, off the event loop."""
+    return await _run_password_task("password.verify", verify_password, plain_password, hashed_password)
+
+
+async def get_password_hash_async(password: str) -> str:
+    """``get_password_hash`` on the password worker pool, off the event loop."""
+    return await _run_password_task("password.hash", get_password_hash, password)
+
+
 def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -> str:
     to_encode = data.copy()
     if expires_delta:
@@ -31,16 +62,114 @@ def create_access_token(data: dict, expires_delta: Optional[timedelta] = None) -
     return encoded_jwt
 
 
+class TokenCache:
+    """
+    Bounded LRU of verified tokens mapped to their claims.
+
+    Keys are SHA-256 digests of the raw token, so tokens themselves are not
+    kept in memory. Entries expire at the token's ``exp`` claim. Revoked
+    tokens are remembered until their own expiry so they cannot be re-verified.
+    """
+
+    def __init__(self, max_size: int):
+        self.max_size = max_size
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, Tuple[dict, float]]" = OrderedDict()
+        self._revoked: Dict[bytes, float] = {}
+
+    @staticmethod
+    def digest(token: str) -> bytes:
+        return hashlib.sha256(token.encode('utf-8')).digest()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, token: str) -> Optional[dict]:
+        key = self.digest(token)
+        entry = self._entries.get(key)
+        if entry is None or entry[1] <= time.time():
+            if entry is not None:
+                del self._entries[key]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return entry[0]
+
+    def put(self, token: str, claims: dict) -> None:
+        exp = claims.get("exp")
+        if exp is None or self.max_size <= 0:
+            return
+        self._entries[self.digest(token)] = (claims, float(exp))
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def is_revoked(self, token: str) -> bool:
+        if not self._revoked:
+            return False
+        key = self.digest(token)
+        exp = self._revoked.get(key)
+        if exp is not None and exp <= time.time():
+            del self._revoked[key]
+            return False
+        return exp is not None
+
+    def revoke(self, token: str, exp: float) -> None:
+        key = self.digest(token)
+        self._entries.pop(key, None)
+        now = time.time()
+        self._revoked = {k: e for k, e in self._revoked.items() if e > now}
+        self._revoked[key] = exp
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+token_cache = TokenCache(settings.TOKEN_CACHE_SIZE)
+
+
+def _credentials_exception() -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_401_UNAUTHORIZED,
+        detail="Could not validate credentials",
+        headers={"WWW-Authenticate": "Bearer"},
+    )
+
+
 def verify_token(token: str) -> dict:
+    """
+    Decode and verify ``token``, reusing cached claims for tokens seen before.
+
+    Only successfully verified tokens are cached, and a cached entry is never
+    returned past the token's ``exp``.
+    """
+
+    claims = token_cache.get(token)
+    if claims is not None:
+        return claims
+
+    if token_cache.is_revoked(token):
+        raise _credentials_exception()
+
+    try:
+        payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
+    except JWTError:
+        raise _credentials_exception()
+
+    token_cache.put(token, payload)
+    return payload
+
+
+def revoke_token(token: str) -> None:
+    """Evict ``token`` from the verified-token cache and reject it until it expires."""
     try:
         payload = jwt.decode(token, settings.JWT_SECRET_KEY, algorithms=[settings.JWT_ALGORITHM])
-        return payload
     except JWTError:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        return
+    token_cache.revoke(token, float(payload.get("exp", time.time())))
 
 
 async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)) -> dict:
@@ -48,9 +177,5 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     payload = verify_token(token)
     user_id: Optional[str] = payload.get("sub")
     if user_id is None:
-        raise HTTPException(
-            status_code=status.HTTP_401_UNAUTHORIZED,
-            detail="Could not validate credentials",
-            headers={"WWW-Authenticate": "Bearer"},
-        )
+        raise _credentials_exception()
     return {"user_id": user_id, "email": payload.get("email")}
@@ -0,0 +1,183 @@
+import hashlib
+from tempfile import SpooledTemporaryFile
+from typing import Dict, List, Optional
+
+from fastapi import HTTPException, Request
+from multipart.multipart import MultipartParser, parse_options_header
+from starlette.concurrency import run_in_threadpool
+
+from .config import settings
+
+
+class UploadedPart:
+    """
+    One file part of a multipart body, spooled to memory and then to disk.
+
+    The part's SHA-256 and size are computed while it streams in, so callers
+    can look it up in a content-addressed cache without reading it back.
+    """
+
+    def __init__(self, field: str, filename: str, content_type: str, spool_bytes: int):
+        self.field = field
+        self.filename = filename
+        self.content_type = content_type
+        self.file = SpooledTemporaryFile(max_size=spool_bytes)
+        self.size = 0
+        self._sha256 = hashlib.sha256()
+
+    @property
+    def digest(self) -> bytes:
+        return self._sha256.digest()
+
+    async def write(self, data: bytes) -> None:
+        self.size += len(data)
+        self._sha256.update(data)
+        if self.file._rolled:
+            await run_in_threadpool(self.file.write, data)
+        else:
+            self.file.write(data)
+
+    def close(self) -> None:
+        self.file.close()
+
+
+class MultipartUpload:
+    """Text fields and spooled file parts of a parsed multipart body."""
+
+    def __init__(self):
+        self.fields: Dict[str, List[str]] = {}
+        self.files: List[UploadedPart] = []
+
+    def get(self, name: str) -> Optional[str]:
+        values = self.fields.get(name)
+        return values[0] if values else None
+
+    def getlist(self, name: str) -> List[str]:
+        return self.fields.get(name, [])
+
+    def close(self) -> None:
+        for part in self.files:
+            part.close()
+
+
+def _too_large(detail: str) -> HTTPException:
+    return HTTPException(status_code=413, detail=detail)
+
+
+async def read_multipart(
+    request: Request,
+    max_file_bytes: int = settings.UPLOAD_MAX_FILE_BYTES,
+    max_request_bytes: int = settings.UPLOAD_MAX_REQUEST_BYTES,
+    max_files: int = settings.UPLOAD_MAX_FILES,
+    spool_bytes: int = settings.UPLOAD_SPOOL_BYTES
+) -> MultipartUpload:
+    """
+    Parse a ``multipart/form-data`` body chunk by chunk as it is received.
+
+    File parts are written straight to ``SpooledTemporaryFile``s (in memory
+    up to ``spool_bytes``, then on disk), so memory per request stays bounded
+    by the spool size and one network chunk, whatever the upload size. The
+    body is rejected with 413 as soon as a file passes ``max_file_bytes``,
+    the body passes ``max_request_bytes`` or a text field passes
+    ``UPLOAD_MAX_FIELD_BYTES``; a ``Content-Length`` over the limit is
+    rejected before anything is read. Files are closed on any error; on
+    success the caller owns them and must ``close()`` the upload.
+    """
+
+    content_type, params = parse_options_header(request.headers.get("content-type", ""))
+    boundary = params.get(b"boundary")
+    if content_type != b"multipart/form-data" or not boundary:
+        raise HTTPException(status_code=415, detail="Expected a multipart/form-data body")
+
+    content_length = request.headers.get("content-length")
+    if content_length and content_length.isdigit() and int(content_length) > max_request_bytes:
+        raise _too_large(f"Request body exceeds {max_request_bytes} bytes")
+
+    # The parser is synchronous; callbacks only queue events, which are
+    # applied (with awaits for disk writes) after each chunk.
+    events: List[tuple] = []
+    header_field = bytearray()
+    header_value = bytearray()
+
+    def on_header_field(data: bytes, start: int, end: int) -> None:
+        header_field.extend(data[start:end])
+
+    def on_header_value(data: bytes, start: int, end: int) -> None:
+        header_value.extend(data[start:end])
+
+    def on_header_end() -> None:
+        events.append(("header", (bytes(header_field).lower(), bytes(header_value))))
+        header_field.clear()
+        header_value.clear()
+
+    parser = MultipartParser(boundary, {
+        "on_part_begin": lambda: events.append(("begin", None)),
+        "on_part_data": lambda data, start, end: events.append(("data", data[start:end])),
+        "on_part_end": lambda: events.append(("end", None)),
+        "on_header_field": on_header_field,
+        "on_header_value": on_header_value,
+        "on_header_end": on_header_end,
+    })
+
+    upload = MultipartUpload()
+    headers: Dict[bytes, bytes] = {}
+    part: Optional[UploadedPart] = None
+    field: Optional[str] = None
+    value = bytearray()
+    received = 0
+
+    try:
+        async for chunk in request.stream():
+            received += len(chunk)
+            if received > max_request_bytes:
+                raise _too_large(f"Request body exceeds {max_request_bytes} bytes")
+            parser.write(chunk)
+
+            for kind, data in events:
+                if kind == "begin":
+                    headers, part, field = {}, None, None
+                    value.clear()
+                elif kind == "header":
+                    headers[data[0]] = data[1]
+                elif kind == "data":
+                    if part is None and field is None:
+                        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+                        name = disposition.get(b"name", b"").decode("utf-8", "replace")
+                        if b"filename" in disposition:
+                            if len(upload.files) >= max_files:
+                                raise _too_large(f"At most {max_files} files may be uploaded")
+                            part = UploadedPart(
+                                name,
+                                disposition[b"filename"].decode("utf-8", "replace"),
+                                headers.get(b"content-type", b"application/octet-stream").decode("latin-1"),
+                                spool_bytes
+                            )
+                            upload.files.append(part)
+                        else:
+                            field = name
+                    if part is not None:
+                        if part.size + len(data) > max_file_bytes:
+                            raise _too_large(f"File {part.filename!r} exceeds {max_file_bytes} bytes")
+                        await part.write(data)
+                    else:
+                        value.extend(data)
+                        if len(value) > settings.UPLOAD_MAX_FIELD_BYTES:
+                            raise _too_large(f"Field {field!r} exceeds {settings.UPLOAD_MAX_FIELD_BYTES} bytes")
+                elif kind == "end":
+                    if part is not None:
+                        part.file.seek(0)
+                    elif field is not None:
+                        upload.fields.setdefault(field, []).append(value.decode("utf-8", "replace"))
+                    else:
+                        # Empty part: an empty text field or an empty file input.
+                        _, disposition = parse_options_header(headers.get(b"content-disposition", b""))
+                        if b"filename" not in disposition and b"name" in disposition:
+                            upload.fields.setdefault(disposition[b"name"].decode("utf-8", "replace"), []).append("")
+                    headers, part, field = {}, None, None
+            events.clear()
+
+        parser.finalize()
+    except BaseException:
+        upload.close()
+        raise
+    return upload
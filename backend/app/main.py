@@ -1,13 +1,20 @@
 from fastapi import FastAPI, Request, status
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import JSONResponse, ORJSONResponse, PlainTextResponse
 from .core.config import settings
+from .core.compression import CompressionMiddleware, compressed_bodies
+from .core.metrics import MetricsMiddleware, metrics
 from .api.endpoints import auth, trading, market, user
+from .services.job_queue import job_queue
+from .services.market_stream import market_stream
+from .services.signal_engine import signal_engine
+from .services.tick_pipeline import tick_pipeline
 
 app = FastAPI(
     title=settings.PROJECT_NAME,
     version=settings.VERSION,
-    description="YoForex AI - Advanced Forex Trading Analysis Platform"
+    description="YoForex AI - Advanced Forex Trading Analysis Platform",
+    default_response_class=ORJSONResponse
 )
 
 app.add_middleware(
@@ -23,6 +30,15 @@ app.add_middleware(
     expose_headers=["*"],
 )
 
+app.add_middleware(
+    CompressionMiddleware,
+    minimum_size=settings.COMPRESSION_MIN_SIZE,
+    cache=compressed_bodies
+)
+
+if settings.METRICS_ENABLED:
+    app.add_middleware(MetricsMiddleware, metrics=metrics)
+
 
 @app.exception_handler(Exception)
 async def global_exception_handler(request: Request, exc: Exception):
@@ -32,6 +48,22 @@ async def global_exception_handler(request: Request, exc: Exception):
     )
 
 
+@app.on_event("startup")
+async def start_background_tasks():
+    job_queue.start()
+    signal_engine.start()
+    if settings.TICK_SOURCE:
+        tick_pipeline.start()
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    await market_stream.stop()
+    await job_queue.stop()
+    await signal_engine.stop()
+    await tick_pipeline.stop()
+
+
 @app.get("/", tags=["Root"])
 async def root():
     """Root endpoint with API information."""
@@ -44,6 +76,7 @@ async def root():
             "auth": "/auth",
             "trading": "/trading",
             "market": "/market",
+            "market_stream": "/market/stream",
             "user": "/user"
         }
     }
@@ -58,6 +91,15 @@ async def health_check():
     }
 
 
+async def metrics_endpoint():
+    """Request latency, status counts and internal span timings in Prometheus text format."""
+    return PlainTextResponse(metrics.render(), media_type="text/plain; version=0.0.4")
+
+
+if settings.METRICS_ENABLED:
+    app.add_api_route("/metrics", metrics_endpoint, tags=["Health"], response_class=PlainTextResponse)
+
+
 app.include_router(auth.router)
 app.include_router(trading.router)
 app.include_router(market.router)
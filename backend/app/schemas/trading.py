@@ -99,6 +99,8 @@ class MultiModelResponse(BaseModel):
     avg_confidence: float
     models: List[AIModelResult]
     final_recommendation: str
+    timed_out: List[str] = []
+    failed: List[str] = []
 
 
 class AnalysisResult(BaseModel):
@@ -124,6 +126,23 @@ class AnalysisResult(BaseModel):
         from_attributes = True
 
 
+class JobStatus(str, Enum):
+    QUEUED = "queued"
+    RUNNING = "running"
+    COMPLETED = "completed"
+    FAILED = "failed"
+
+
+class AnalysisJob(BaseModel):
+    id: str
+    kind: str
+    status: JobStatus
+    result: Optional[AnalysisResult] = None
+    error: Optional[str] = None
+    created_at: datetime
+    updated_at: datetime
+
+
 class Signal(BaseModel):
     id: str
     pair: str
@@ -134,6 +153,9 @@ class Signal(BaseModel):
     confidence: float
     status: str
     created_at: datetime
+    timeframe: Optional[str] = None
+    strategy: Optional[str] = None
+    closed_at: Optional[datetime] = None
 
 
 class Position(BaseModel):
@@ -159,3 +181,40 @@ class Trade(BaseModel):
     status: str
     opened_at: datetime
     closed_at: Optional[datetime] = None
+
+
+class BacktestRequest(BaseModel):
+    pair: str
+    timeframe: str
+    strategy: StrategyEnum
+    years: float = 1.0
+    initial_balance: float = 10000.0
+    risk_per_trade: float = 0.01
+    fast_ema: Optional[int] = None
+    slow_ema: Optional[int] = None
+    stop_atr: Optional[float] = None
+    reward: Optional[float] = None
+
+
+class EquityPoint(BaseModel):
+    timestamp: datetime
+    equity: float
+
+
+class BacktestResult(BaseModel):
+    pair: str
+    timeframe: str
+    strategy: str
+    start: datetime
+    end: datetime
+    candles: int
+    parameters: Dict[str, float]
+    initial_balance: float
+    final_balance: float
+    total_return: float
+    total_trades: int
+    win_rate: float
+    max_drawdown: float
+    sharpe_ratio: float
+    equity_curve: List[EquityPoint]
+    trades: List[Trade]
@@ -0,0 +1,180 @@
+import asyncio
+import json
+import random
+from abc import ABC, abstractmethod
+from typing import Any, Dict, Optional, Tuple
+
+from ..core.config import settings
+from ..schemas.trading import AIModelResult, ConfidenceBreakdown
+
+
+RECOMMENDATIONS = ("BUY", "SELL", "HOLD")
+
+
+class AIProvider(ABC):
+    """
+    One AI model backend.
+
+    ``analyze`` receives the analysis context (pair, timeframe, strategy,
+    indicator snapshot, the technical recommendation and, for manual
+    analysis, ``text_analysis`` and preprocessed chart ``images``) and returns the
+    model's ``AIModelResult``. ``timeout`` overrides ``settings.AI_MODEL_TIMEOUT``
+    for this provider, and ``slots`` bounds how many calls to it run at once.
+    """
+
+    def __init__(self, model: str, timeout: Optional[float] = None):
+        self.model = model
+        self.timeout = timeout
+        self.slots = asyncio.Semaphore(settings.AI_PROVIDER_CONCURRENCY)
+
+    @abstractmethod
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        """The model's answer for ``context``."""
+
+
+class MockProvider(AIProvider):
+    """
+    Local stand-in for a model API with optional artificial latency.
+
+    ``latency`` is a ``(min, max)`` range in seconds slept before answering, so
+    concurrency and timeout handling can be exercised without network access.
+    """
+
+    def __init__(self, model: str, latency: Tuple[float, float] = (0.0, 0.0), timeout: Optional[float] = None):
+        super().__init__(model, timeout)
+        self.latency = latency
+
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        delay = random.uniform(*self.latency)
+        if delay > 0:
+            await asyncio.sleep(delay)
+
+        base = context["recommendation"]
+        rec = base if random.random() > 0.3 else random.choice(RECOMMENDATIONS)
+
+        return AIModelResult(
+            model=self.model,
+            recommendation=rec,
+            confidence=round(random.uniform(0.70, 0.95), 2),
+            reasoning=f"{self.model} analysis suggests {rec} based on technical indicators and market conditions for {context['pair']}.",
+            confidence_breakdown=ConfidenceBreakdown(
+                technical_analysis=round(random.uniform(0.7, 0.95), 2),
+                fundamental_analysis=round(random.uniform(0.6, 0.85), 2),
+                market_sentiment=round(random.uniform(0.65, 0.90), 2),
+                risk_assessment=round(random.uniform(0.7, 0.90), 2)
+            )
+        )
+
+
+def build_prompt(context: Dict[str, Any]) -> str:
+    notes = context.get("text_analysis")
+    images = context.get("images")
+    return (
+        f"You are a forex analyst. Analyse {context['pair']} on the {context['timeframe']} timeframe "
+        f"using a {context['strategy']} strategy.\n"
+        f"Latest indicators: {json.dumps(context['indicators'])}\n"
+        f"Last close: {context['entry_price']}\n"
+        + (f"Trader's notes: {notes}\n" if notes else "")
+        + (f"{len(images)} chart screenshot(s) from the trader are attached.\n" if images else "")
+        + 'Reply with JSON only: {"recommendation": "BUY|SELL|HOLD", "confidence": 0.0-1.0, "reasoning": "..."}'
+    )
+
+
+def parse_model_reply(model: str, text: str) -> AIModelResult:
+    """Turn a model's JSON reply into an ``AIModelResult``."""
+    start, end = text.find("{"), text.rfind("}")
+    data = json.loads(text[start:end + 1])
+    rec = str(data.get("recommendation", "HOLD")).upper()
+    return AIModelResult(
+        model=model,
+        recommendation=rec if rec in RECOMMENDATIONS else "HOLD",
+        confidence=round(min(max(float(data.get("confidence", 0.5)), 0.0), 1.0), 2),
+        reasoning=str(data.get("reasoning", ""))
+    )
+
+
+class OpenAIProvider(AIProvider):
+    def __init__(self, model: str, timeout: Optional[float] = None):
+        super().__init__(model, timeout)
+        from openai import AsyncOpenAI
+        self._client = AsyncOpenAI(api_key=settings.OPENAI_API_KEY)
+
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        content = [{"type": "text", "text": build_prompt(context)}]
+        content.extend(
+            {"type": "image_url", "image_url": {"url": image.data_url}}
+            for image in context.get("images", [])
+        )
+        response = await self._client.chat.completions.create(
+            model=self.model,
+            messages=[{"role": "user", "content": content}],
+            temperature=0.2
+        )
+        return parse_model_reply(self.model, response.choices[0].message.content)
+
+
+class AnthropicProvider(AIProvider):
+    def __init__(self, model: str, timeout: Optional[float] = None):
+        super().__init__(model, timeout)
+        from anthropic import AsyncAnthropic
+        self._client = AsyncAnthropic(api_key=settings.ANTHROPIC_API_KEY)
+
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        content = [
+            {"type": "image", "source": {"type": "base64", "media_type": image.media_type, "data": image.base64}}
+            for image in context.get("images", [])
+        ]
+        content.append({"type": "text", "text": build_prompt(context)})
+        response = await self._client.messages.create(
+            model=self.model,
+            max_tokens=512,
+            messages=[{"role": "user", "content": content}]
+        )
+        return parse_model_reply(self.model, response.content[0].text)
+
+
+class GeminiProvider(AIProvider):
+    def __init__(self, model: str, timeout: Optional[float] = None):
+        super().__init__(model, timeout)
+        import google.generativeai as genai
+        genai.configure(api_key=settings.GOOGLE_API_KEY)
+        self._model = genai.GenerativeModel(model)
+
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        parts = [build_prompt(context)]
+        parts.extend({"mime_type": image.media_type, "data": image.data} for image in context.get("images", []))
+        response = await self._model.generate_content_async(parts)
+        return parse_model_reply(self.model, response.text)
+
+
+_providers: Dict[str, AIProvider] = {}
+
+
+def register_provider(provider: AIProvider) -> None:
+    """Install ``provider`` for its model name, replacing any existing one."""
+    _providers[provider.model] = provider
+
+
+def get_provider(model: str) -> AIProvider:
+    """
+    Return the provider for ``model``.
+
+    Real API clients are used when the matching API key is configured;
+    everything else falls back to ``MockProvider``.
+    """
+
+    provider = _providers.get(model)
+    if provider is not None:
+        return provider
+
+    if model.startswith("gpt") and settings.OPENAI_API_KEY:
+        provider = OpenAIProvider(model)
+    elif model.startswith("claude") and settings.ANTHROPIC_API_KEY:
+        provider = AnthropicProvider(model)
+    elif model.startswith("gemini") and settings.GOOGLE_API_KEY:
+        provider = GeminiProvider(model)
+    else:
+        provider = MockProvider(model, latency=(settings.AI_MOCK_LATENCY, settings.AI_MOCK_LATENCY))
+
+    _providers[model] = provider
+    return provider
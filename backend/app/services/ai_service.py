@@ -1,6 +1,10 @@
+import asyncio
+import logging
 import random
 from datetime import datetime
-from typing import List, Optional, Dict, Any
+from typing import AsyncIterator, List, Optional, Dict, Any, Tuple
+from ..core.config import settings
+from ..core.metrics import metrics
 from ..schemas.trading import (
     AnalysisResult, 
     RiskMatrix, 
@@ -9,36 +13,120 @@ from ..schemas.trading import (
     AIModelResult,
     MultiModelResponse
 )
+from .ai_providers import AIProvider, get_provider
+from .chart_images import ProcessedImage
+from .resampler import get_candle_store
+from .indicators import get_indicator_state
+from .market_service import BASE_PRICES
 
 
-def generate_mock_analysis(
+logger = logging.getLogger(__name__)
+
+KEY_LEVEL_LOOKBACK = 50
+STOP_LOSS_ATR = 1.5
+TAKE_PROFIT_ATR = 3.0
+
+
+def _indicator_votes(indicators: Dict[str, Any]) -> int:
+    """Net bullish (+) / bearish (-) vote count across the indicator snapshot."""
+    
+    score = 0
+    ema = indicators["ema"]
+    if ema["20"] is not None and ema["50"] is not None:
+        score += 1 if ema["20"] > ema["50"] else -1
+    histogram = indicators["macd"]["histogram"]
+    if histogram is not None:
+        score += 1 if histogram > 0 else -1
+    rsi = indicators["rsi"]
+    if rsi is not None:
+        if rsi >= 70:
+            score -= 1
+        elif rsi <= 30:
+            score += 1
+        elif rsi > 55:
+            score += 1
+        elif rsi < 45:
+            score -= 1
+    return score
+
+
+def _indicators_event(pair: str, timeframe: str, last_close: float, indicators: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "pair": pair,
+        "timeframe": timeframe,
+        "last_close": last_close,
+        "indicators": indicators
+    }
+
+
+async def replay_analysis(result: AnalysisResult) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    The ``stream_analysis`` events for an already computed ``result``.
+    
+    Used to stream a cached analysis without calling any model. The
+    ``indicators`` snapshot is read from the candle store again, which is
+    still on the candle the result was computed for.
+    """
+    
+    store = get_candle_store(result.pair, result.timeframe, BASE_PRICES[result.pair])
+    indicators = get_indicator_state(store).snapshot()
+    yield "indicators", _indicators_event(result.pair, result.timeframe, round(float(store.close[-1]), 5), indicators)
+    if result.multi_model is not None:
+        for model in result.multi_model.models:
+            yield "model", model
+        yield "consensus", result.multi_model
+    yield "risk", result.risk_matrix
+    yield "result", result
+
+
+async def stream_analysis(
     pair: str,
     timeframe: str,
     strategy: str,
-    ai_models: Optional[List[str]] = None
-) -> AnalysisResult:
+    ai_models: Optional[List[str]] = None,
+    text_analysis: Optional[str] = None,
+    images: Optional[List[ProcessedImage]] = None
+) -> AsyncIterator[Tuple[str, Any]]:
     """
-    Mock AI analysis function that returns structured analysis results.
+    Run an analysis and yield ``(event, payload)`` pairs as each part is ready.
+    
+    Events, in order: ``indicators`` (snapshot dict), one ``model`` per
+    ``AIModelResult`` in completion order and ``consensus``
+    (``MultiModelResponse``) when ``ai_models`` are given, ``risk``
+    (``RiskMatrix`` or None) and finally ``result`` with the complete
+    ``AnalysisResult``.
+    
+    Recommendation, entry, stop loss and take profit are derived from the
+    indicator snapshot of the pair's candle store (EMA trend, MACD, RSI, ATR).
+    ``text_analysis`` and preprocessed chart ``images`` are passed to every
+    model in the same context, so all of them share one image buffer.
     
-    TODO: Replace with real AI integration using OpenAI, Anthropic, and Google Gemini APIs
-    TODO: Implement actual technical analysis with real market data
     TODO: Add sentiment analysis from news and social media
-    TODO: Integrate real-time risk calculations
     """
     
-    recommendations = ["BUY", "SELL", "HOLD"]
-    recommendation = random.choice(recommendations)
-    confidence = round(random.uniform(0.65, 0.95), 2)
+    store = get_candle_store(pair, timeframe, BASE_PRICES[pair])
+    indicators = get_indicator_state(store).snapshot()
+    entry_price = round(float(store.close[-1]), 5)
+    yield "indicators", _indicators_event(pair, timeframe, entry_price, indicators)
     
-    base_price = random.uniform(1.0500, 1.2000)
-    entry_price = round(base_price, 5)
+    score = _indicator_votes(indicators)
+    
+    if score >= 2:
+        recommendation = "BUY"
+    elif score <= -2:
+        recommendation = "SELL"
+    else:
+        recommendation = "HOLD"
+    confidence = round(min(0.6 + 0.1 * abs(score), 0.95), 2)
+    
+    atr = indicators["atr"] or entry_price * 0.001
     
     if recommendation == "BUY":
-        stop_loss = round(entry_price - random.uniform(0.0020, 0.0050), 5)
-        take_profit = round(entry_price + random.uniform(0.0050, 0.0150), 5)
+        stop_loss = round(entry_price - STOP_LOSS_ATR * atr, 5)
+        take_profit = round(entry_price + TAKE_PROFIT_ATR * atr, 5)
     elif recommendation == "SELL":
-        stop_loss = round(entry_price + random.uniform(0.0020, 0.0050), 5)
-        take_profit = round(entry_price - random.uniform(0.0050, 0.0150), 5)
+        stop_loss = round(entry_price + STOP_LOSS_ATR * atr, 5)
+        take_profit = round(entry_price - TAKE_PROFIT_ATR * atr, 5)
     else:
         stop_loss = None
         take_profit = None
@@ -74,27 +162,57 @@ def generate_mock_analysis(
     ]
     
     confidence_breakdown = ConfidenceBreakdown(
-        technical_analysis=round(random.uniform(0.7, 0.95), 2),
+        technical_analysis=confidence,
         fundamental_analysis=round(random.uniform(0.6, 0.85), 2),
         market_sentiment=round(random.uniform(0.65, 0.90), 2),
         risk_assessment=round(random.uniform(0.7, 0.90), 2)
     )
     
+    bands = indicators["bollinger_bands"]
+    recent_low = round(float(store.low[-KEY_LEVEL_LOOKBACK:].min()), 5)
+    recent_high = round(float(store.high[-KEY_LEVEL_LOOKBACK:].max()), 5)
+    
     multi_model = None
-    if ai_models and len(ai_models) > 1:
-        multi_model = generate_multi_model_response(ai_models, pair, recommendation)
+    if ai_models:
+        context = {
+            "pair": pair,
+            "timeframe": timeframe,
+            "strategy": strategy,
+            "indicators": indicators,
+            "entry_price": entry_price,
+            "recommendation": recommendation,
+            "text_analysis": text_analysis,
+            "images": images or []
+        }
+        answered: Dict[str, AIModelResult] = {}
+        timed_out: List[str] = []
+        failed: List[str] = []
+        for outcome in asyncio.as_completed([_run_model(model, context) for model in ai_models]):
+            model, result, status = await outcome
+            if status == "ok":
+                answered[model] = result
+                yield "model", result
+            elif status == "timed_out":
+                timed_out.append(model)
+            else:
+                failed.append(model)
+        ordered = [answered[model] for model in ai_models if model in answered]
+        multi_model = build_consensus(ai_models, ordered, timed_out, failed)
+        yield "consensus", multi_model
+    
+    yield "risk", risk_matrix
     
     analysis_summary = f"""
     Based on {strategy} strategy analysis for {pair} on {timeframe} timeframe:
     
     • Market is showing {recommendation} signals with {confidence*100:.0f}% confidence
     • Entry recommended at {entry_price}
-    • Technical indicators suggest {'bullish' if recommendation == 'BUY' else 'bearish' if recommendation == 'SELL' else 'neutral'} momentum
+    • Technical indicators suggest {'bullish' if recommendation == 'BUY' else 'bearish' if recommendation == 'SELL' else 'neutral'} momentum (RSI {indicators['rsi']}, MACD histogram {indicators['macd']['histogram']})
     • Risk/Reward ratio of {risk_reward:.2f}:1 offers {'favorable' if risk_reward > 2 else 'moderate'} setup
     • Key support and resistance levels identified
     """
     
-    return AnalysisResult(
+    yield "result", AnalysisResult(
         id=f"analysis_{datetime.now().timestamp()}",
         pair=pair,
         timeframe=timeframe,
@@ -106,8 +224,8 @@ def generate_mock_analysis(
         take_profit=take_profit,
         risk_reward_ratio=round(risk_reward, 2) if risk_reward else None,
         key_levels={
-            "support": [round(entry_price - 0.01, 5), round(entry_price - 0.02, 5)],
-            "resistance": [round(entry_price + 0.01, 5), round(entry_price + 0.02, 5)]
+            "support": [bands["lower"], recent_low],
+            "resistance": [bands["upper"], recent_high]
         },
         analysis_summary=analysis_summary.strip(),
         risk_matrix=risk_matrix,
@@ -118,81 +236,135 @@ def generate_mock_analysis(
     )
 
 
-def generate_multi_model_response(
-    ai_models: List[str],
+async def generate_mock_analysis(
     pair: str,
-    base_recommendation: str
-) -> MultiModelResponse:
+    timeframe: str,
+    strategy: str,
+    ai_models: Optional[List[str]] = None
+) -> AnalysisResult:
+    """
+    Mock AI analysis function that returns structured analysis results.
+    
+    Runs ``stream_analysis`` to completion and returns its final result.
+    
+    TODO: Replace with real AI integration using OpenAI, Anthropic, and Google Gemini APIs
+    """
+    
+    async for event, payload in stream_analysis(pair, timeframe, strategy, ai_models):
+        if event == "result":
+            return payload
+
+
+async def _call_provider(model: str, provider: AIProvider, context: Dict[str, Any]) -> AIModelResult:
+    async with provider.slots:
+        with metrics.span(f"ai_model.{model}"):
+            return await provider.analyze(context)
+
+
+async def _run_model(model: str, context: Dict[str, Any]) -> Tuple[str, Optional[AIModelResult], str]:
     """
-    Generate mock responses from multiple AI models.
+    Run one provider under its own timeout; returns (model, result, status).
     
-    TODO: Implement real API calls to GPT-4, Claude, and Gemini
-    TODO: Add consensus algorithm for conflicting recommendations
-    TODO: Include model-specific reasoning and analysis
+    Calls wait for one of the provider's ``slots`` first, so concurrent
+    requests and background jobs never exceed its concurrency limit; the
+    timeout covers that wait as well as the call, so a saturated provider
+    times out instead of stalling the whole analysis.
     """
     
-    model_results = []
-    confidences = []
-    
-    for model in ai_models:
-        if random.random() > 0.3:
-            rec = base_recommendation
-        else:
-            rec = random.choice(["BUY", "SELL", "HOLD"])
-        
-        conf = round(random.uniform(0.70, 0.95), 2)
-        confidences.append(conf)
-        
-        model_results.append(AIModelResult(
-            model=model,
-            recommendation=rec,
-            confidence=conf,
-            reasoning=f"{model} analysis suggests {rec} based on technical indicators and market conditions for {pair}.",
-            confidence_breakdown=ConfidenceBreakdown(
-                technical_analysis=round(random.uniform(0.7, 0.95), 2),
-                fundamental_analysis=round(random.uniform(0.6, 0.85), 2),
-                market_sentiment=round(random.uniform(0.65, 0.90), 2),
-                risk_assessment=round(random.uniform(0.7, 0.90), 2)
-            )
-        ))
-    
-    avg_confidence = round(sum(confidences) / len(confidences), 2)
+    try:
+        provider = get_provider(model)
+        timeout = provider.timeout or settings.AI_MODEL_TIMEOUT
+        return model, await asyncio.wait_for(_call_provider(model, provider, context), timeout), "ok"
+    except asyncio.TimeoutError:
+        logger.warning("AI model %s timed out", model)
+        return model, None, "timed_out"
+    except Exception:
+        logger.exception("AI model %s failed", model)
+        return model, None, "failed"
+
+
+def build_consensus(
+    ai_models: List[str],
+    model_results: List[AIModelResult],
+    timed_out: Optional[List[str]] = None,
+    failed: Optional[List[str]] = None
+) -> MultiModelResponse:
+    """Consensus over the models that answered; missing models are listed, not counted."""
+    
+    timed_out = timed_out or []
+    failed = failed or []
+    
+    if not model_results:
+        return MultiModelResponse(
+            consensus="UNAVAILABLE",
+            avg_confidence=0.0,
+            models=[],
+            final_recommendation=f"No model responded ({len(timed_out)} timed out, {len(failed)} failed)",
+            timed_out=timed_out,
+            failed=failed
+        )
+    
+    avg_confidence = round(sum(m.confidence for m in model_results) / len(model_results), 2)
     
     buy_count = sum(1 for m in model_results if m.recommendation == "BUY")
     sell_count = sum(1 for m in model_results if m.recommendation == "SELL")
     hold_count = sum(1 for m in model_results if m.recommendation == "HOLD")
+    responded = len(model_results)
     
     if buy_count > sell_count and buy_count > hold_count:
         consensus = "BUY"
-        final_rec = f"Strong consensus to BUY ({buy_count}/{len(ai_models)} models)"
+        final_rec = f"Strong consensus to BUY ({buy_count}/{responded} models)"
     elif sell_count > buy_count and sell_count > hold_count:
         consensus = "SELL"
-        final_rec = f"Strong consensus to SELL ({sell_count}/{len(ai_models)} models)"
+        final_rec = f"Strong consensus to SELL ({sell_count}/{responded} models)"
     else:
         consensus = "MIXED"
         final_rec = f"Mixed signals - {buy_count} BUY, {sell_count} SELL, {hold_count} HOLD"
     
+    if responded < len(ai_models):
+        final_rec += f" ({len(ai_models) - responded} of {len(ai_models)} models did not respond)"
+    
     return MultiModelResponse(
         consensus=consensus,
         avg_confidence=avg_confidence,
         models=model_results,
-        final_recommendation=final_rec
+        final_recommendation=final_rec,
+        timed_out=timed_out,
+        failed=failed
     )
 
 
-def analyze_manual_input(
+def stream_manual_input(
+    pair: str,
+    timeframe: str,
+    text_analysis: Optional[str],
+    images: Optional[List[ProcessedImage]],
+    ai_models: List[str]
+) -> AsyncIterator[Tuple[str, Any]]:
+    """
+    Streaming variant of ``analyze_manual_input``; yields the same events as ``stream_analysis``.
+    
+    ``images`` must already be preprocessed (see ``chart_images.prepare_chart_images``).
+    
+    TODO: Process text input for sentiment and technical patterns
+    """
+    
+    return stream_analysis(pair, timeframe, "Manual Analysis", ai_models, text_analysis, images)
+
+
+async def analyze_manual_input(
     pair: str,
     timeframe: str,
     text_analysis: Optional[str],
-    images: Optional[List[str]],
+    images: Optional[List[ProcessedImage]],
     ai_models: List[str]
 ) -> AnalysisResult:
     """
     Analyze manual input with text and images using AI models.
     
-    TODO: Implement image analysis using GPT-4 Vision
-    TODO: Process text input for sentiment and technical patterns
     TODO: Combine image and text analysis for comprehensive results
     """
     
-    return generate_mock_analysis(pair, timeframe, "Manual Analysis", ai_models)
+    async for event, payload in stream_manual_input(pair, timeframe, text_analysis, images, ai_models):
+        if event == "result":
+            return payload
@@ -0,0 +1,145 @@
+import asyncio
+import time
+from collections import OrderedDict
+from typing import Awaitable, Callable, Dict, Hashable, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..schemas.trading import AnalysisRequest, AnalysisResult
+from .candle_store import TIMEFRAME_SECONDS
+from .resampler import bucket_start
+
+
+def analysis_cache_key(request: AnalysisRequest, now: Optional[float] = None) -> Tuple[Tuple, float]:
+    """
+    Normalised cache key for ``request`` and the time its entry should expire.
+
+    The key includes the open time of the current candle of the requested
+    timeframe, so a new candle close always produces a fresh analysis, and the
+    TTL runs to the end of that candle. Buckets align with the candles
+    themselves (e.g. weekly candles open on Monday).
+    """
+
+    now = time.time() if now is None else now
+    bucket = int(bucket_start(np.array([int(now)]), request.timeframe)[0])
+    key = (
+        request.pair.upper(),
+        request.timeframe,
+        request.strategy.strip().casefold(),
+        request.use_ai,
+        tuple(sorted(set(request.ai_models or []))),
+        bucket,
+    )
+    return key, float(bucket + TIMEFRAME_SECONDS[request.timeframe])
+
+
+class AnalysisCache:
+    """
+    Shared LRU cache of analysis results with per-entry expiry and a size cap.
+
+    Concurrent misses for the same key are coalesced: the first caller runs the
+    computation and the rest await the same future (single-flight), so only one
+    upstream call is made per key and candle.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[Hashable, Tuple[AnalysisResult, float, int]]" = OrderedDict()
+        self._inflight: Dict[Hashable, asyncio.Future] = {}
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: Hashable, now: Optional[float] = None) -> Optional[AnalysisResult]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        result, expires_at, size = entry
+        if expires_at <= (time.time() if now is None else now):
+            del self._entries[key]
+            self.size -= size
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def put(self, key: Hashable, result: AnalysisResult, expires_at: float) -> None:
+        size = len(result.model_dump_json())
+        if size > self.max_bytes:
+            return
+        old = self._entries.pop(key, None)
+        if old is not None:
+            self.size -= old[2]
+        self._entries[key] = (result, expires_at, size)
+        self.size += size
+        while self.size > self.max_bytes:
+            _, (_, _, evicted) = self._entries.popitem(last=False)
+            self.size -= evicted
+
+    def clear(self) -> None:
+        self._entries.clear()
+        self.size = 0
+
+    async def _compute(
+        self,
+        key: Hashable,
+        expires_at: float,
+        compute: Callable[[], Awaitable[AnalysisResult]]
+    ) -> AnalysisResult:
+        try:
+            result = await compute()
+            self.put(key, result, expires_at)
+            return result
+        finally:
+            del self._inflight[key]
+
+    async def lookup(self, key: Hashable) -> Optional[AnalysisResult]:
+        """
+        The cached result for ``key``, or that of a computation already in
+        flight for it; None if there is neither, or the computation failed.
+        """
+
+        cached = self.get(key)
+        if cached is None:
+            task = self._inflight.get(key)
+            if task is None:
+                return None
+            try:
+                cached = await asyncio.shield(task)
+            except Exception:
+                return None
+        self.hits += 1
+        return cached
+
+    async def get_or_compute(
+        self,
+        key: Hashable,
+        expires_at: float,
+        compute: Callable[[], Awaitable[AnalysisResult]]
+    ) -> AnalysisResult:
+        """
+        Return the cached result for ``key`` or run ``compute`` once for all callers.
+
+        The computation runs in its own task, so a caller that disconnects does
+        not cancel it for the others waiting on the same key.
+        """
+
+        cached = self.get(key)
+        if cached is not None:
+            self.hits += 1
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            self.misses += 1
+            task = asyncio.ensure_future(self._compute(key, expires_at, compute))
+            self._inflight[key] = task
+        else:
+            self.hits += 1
+        return await asyncio.shield(task)
+
+
+analysis_cache = AnalysisCache(settings.ANALYSIS_CACHE_MAX_BYTES)
@@ -0,0 +1,358 @@
+import math
+import time
+import zlib
+from datetime import datetime
+from typing import Any, Callable, Dict, Hashable, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..schemas.trading import BacktestResult, EquityPoint, StrategyEnum, Trade
+from .candle_archive import candle_archive
+from .candle_store import CANDLE_FIELDS, TIMEFRAME_SECONDS, simulate_candles
+from .indicators import BOLLINGER_STDDEV, atr, bollinger_bands, ema, macd, rsi
+from .market_service import BASE_PRICES
+from .resampler import BASE_TIMEFRAME, resample
+from .signal_engine import STRATEGIES, RuleInputs
+
+
+# Daily returns are sampled every calendar day, weekends included.
+CALENDAR_DAYS_PER_YEAR = 365
+DAY_SECONDS = 24 * 60 * 60
+
+
+class BacktestParams(NamedTuple):
+    fast_ema: int = 20
+    slow_ema: int = 50
+    stop_atr: float = 2.0
+    reward: float = 2.0
+
+
+class TradeLog(NamedTuple):
+    """Simulated trades as parallel arrays, one entry per trade in time order."""
+    entry_index: np.ndarray
+    exit_index: np.ndarray
+    direction: np.ndarray
+    entry_price: np.ndarray
+    exit_price: np.ndarray
+    quantity: np.ndarray
+    pnl: np.ndarray
+    equity: np.ndarray
+    closed: np.ndarray
+
+
+class BacktestStats(NamedTuple):
+    final_balance: float
+    total_return: float
+    total_trades: int
+    win_rate: float
+    max_drawdown: float
+    sharpe_ratio: float
+
+
+def default_params(strategy: StrategyEnum) -> BacktestParams:
+    """The signal engine's stop and target multiples for ``strategy``, with its EMA lengths."""
+    spec = STRATEGIES[strategy]
+    return BacktestParams(stop_atr=spec.stop_atr, reward=spec.reward)
+
+
+def load_candles(pair: str, timeframe: str, years: float) -> Tuple[np.ndarray, ...]:
+    """
+    ``years`` of ``timeframe`` candles for ``pair`` ending at the last closed bar.
+
+    Archived candles are used when the archive has any in that range, read
+    from the ``timeframe`` series or resampled from archived 1m bars.
+    Otherwise the series is simulated from a seed derived from the pair and
+    timeframe, so repeated backtests of the same market see the same prices.
+    """
+
+    interval = TIMEFRAME_SECONDS[timeframe]
+    count = max(1, int(years * 365 * DAY_SECONDS // interval))
+    end = int(time.time()) // interval * interval - interval
+    start = end - (count - 1) * interval
+
+    archived = candle_archive.series(pair, timeframe).range(start, end + interval)
+    if len(archived["timestamp"]):
+        return tuple(archived[field] for field in CANDLE_FIELDS)
+    if timeframe != BASE_TIMEFRAME:
+        base = candle_archive.series(pair, BASE_TIMEFRAME).range(start, end + interval)
+        if len(base["timestamp"]):
+            return resample(*(base[field] for field in CANDLE_FIELDS), timeframe)
+
+    rng = np.random.default_rng(zlib.crc32(f"{pair}:{timeframe}".encode()))
+    return simulate_candles(BASE_PRICES[pair], start, interval, count, rng)
+
+
+def _cached(cache: Optional[Dict[Hashable, Any]], key: Hashable, compute: Callable[[], Any]) -> Any:
+    if cache is None:
+        return compute()
+    if key not in cache:
+        cache[key] = compute()
+    return cache[key]
+
+
+def entry_signals(
+    strategy: StrategyEnum,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    params: BacktestParams,
+    cache: Optional[Dict[Hashable, Any]] = None
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Per-bar entry direction (1 buy, -1 sell, 0 none) and ATR for ``strategy``.
+
+    Evaluates the signal engine's own rules over whole arrays at once, with
+    ``params`` choosing the EMA lengths; bars where any input is still NaN
+    never fire.
+    Indicator arrays go through ``cache`` when given, so runs over the same
+    candles with different parameters only compute what changed.
+    """
+
+    spec = STRATEGIES[strategy]
+    upper = lower = None
+    if spec.bands:
+        upper, _, lower = _cached(cache, "bollinger", lambda: bollinger_bands(close, num_std=BOLLINGER_STDDEV))
+    line, _, hist = _cached(cache, "macd", lambda: macd(close))
+    avg_range = _cached(cache, "atr", lambda: atr(high, low, close))
+    inputs = RuleInputs(
+        close=close,
+        fast=_cached(cache, ("ema", params.fast_ema), lambda: ema(close, params.fast_ema)),
+        slow=_cached(cache, ("ema", params.slow_ema), lambda: ema(close, params.slow_ema)),
+        macd_line=line,
+        macd_histogram=hist,
+        rsi=_cached(cache, "rsi", lambda: rsi(close)),
+        atr=avg_range,
+        upper=upper,
+        lower=lower
+    )
+
+    with np.errstate(invalid="ignore"):
+        buy, sell = spec.rule(inputs)
+        valid = np.isfinite(avg_range) & (avg_range > 0)
+
+    direction = np.zeros(len(close), dtype=np.int8)
+    direction[buy & valid] = 1
+    direction[sell & valid] = -1
+    return direction, avg_range
+
+
+def _first_exit(high: np.ndarray, low: np.ndarray, start: int, side: int, stop: float, target: float) -> Tuple[int, float]:
+    """
+    Index and price of the first bar from ``start`` that reaches the stop or target.
+
+    Scans forward in geometrically growing windows so short trades touch few
+    bars and long ones need few array operations. A bar that spans both
+    levels is taken as a stop. Returns ``(-1, nan)`` if neither is reached.
+    """
+
+    n = len(high)
+    window = 64
+    while start < n:
+        end = min(n, start + window)
+        if side > 0:
+            stopped = low[start:end] <= stop
+            hit = stopped | (high[start:end] >= target)
+        else:
+            stopped = high[start:end] >= stop
+            hit = stopped | (low[start:end] <= target)
+        k = int(hit.argmax())
+        if hit[k]:
+            return start + k, stop if stopped[k] else target
+        start = end
+        window *= 4
+    return -1, math.nan
+
+
+def simulate_trades(
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    direction: np.ndarray,
+    avg_range: np.ndarray,
+    params: BacktestParams,
+    initial_balance: float,
+    risk_per_trade: float
+) -> TradeLog:
+    """
+    Replay entries one position at a time, exiting at the stop or target.
+
+    A position opens at the close of a bar with a non-zero ``direction``
+    while flat, with a stop ``stop_atr`` ATRs away and a target ``reward``
+    times further, sized to risk ``risk_per_trade`` of current equity. The
+    loop runs once per trade, not per bar: the next entry is found with
+    ``searchsorted`` over the precomputed entry bars and the exit with
+    ``_first_exit``. A position still open at the end is marked to the last
+    close and flagged as not closed.
+    """
+
+    entries = np.flatnonzero(direction)
+    n = len(close)
+    rows = []
+    equity = initial_balance
+    position = 0
+
+    while True:
+        k = int(np.searchsorted(entries, position))
+        if k >= len(entries) or equity <= 0:
+            break
+        i = int(entries[k])
+        side = int(direction[i])
+        entry = float(close[i])
+        distance = params.stop_atr * float(avg_range[i])
+        stop = entry - side * distance
+        target = entry + side * distance * params.reward
+        quantity = equity * risk_per_trade / distance
+
+        j, exit_price = _first_exit(high, low, i + 1, side, stop, target)
+        closed = j >= 0
+        if not closed:
+            j, exit_price = n - 1, float(close[-1])
+        pnl = side * (exit_price - entry) * quantity
+        equity += pnl
+        rows.append((i, j, side, entry, exit_price, quantity, pnl, equity, closed))
+        position = j + 1
+
+    columns = list(zip(*rows)) if rows else [()] * len(TradeLog._fields)
+    dtypes = (np.int64, np.int64, np.int8, np.float64, np.float64, np.float64, np.float64, np.float64, bool)
+    return TradeLog(*(np.array(column, dtype=dtype) for column, dtype in zip(columns, dtypes)))
+
+
+def summarize(trades: TradeLog, timestamps: np.ndarray, initial_balance: float) -> BacktestStats:
+    """
+    Headline metrics of a trade log.
+
+    Drawdown is the largest peak-to-trough fall of the equity curve after
+    each trade. Sharpe is annualized from daily returns of that curve
+    sampled at the end of every calendar day in the tested range.
+    """
+
+    total = len(trades.pnl)
+    final = float(trades.equity[-1]) if total else initial_balance
+    curve = np.concatenate(([initial_balance], trades.equity))
+    peaks = np.maximum.accumulate(curve)
+    max_drawdown = float(np.max((peaks - curve) / peaks)) if total else 0.0
+
+    sharpe = 0.0
+    if total and len(timestamps):
+        exit_times = timestamps[trades.exit_index]
+        day_ends = np.arange(timestamps[0] // DAY_SECONDS + 1, timestamps[-1] // DAY_SECONDS + 2) * DAY_SECONDS
+        idx = np.searchsorted(exit_times, day_ends, side="left") - 1
+        daily = np.where(idx >= 0, trades.equity[np.maximum(idx, 0)], initial_balance)
+        daily = np.concatenate(([initial_balance], daily))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            returns = np.diff(daily) / daily[:-1]
+        returns = returns[np.isfinite(returns)]
+        std = float(returns.std()) if len(returns) > 1 else 0.0
+        if std > 0:
+            sharpe = float(returns.mean() / std * math.sqrt(CALENDAR_DAYS_PER_YEAR))
+
+    return BacktestStats(
+        final_balance=final,
+        total_return=final / initial_balance - 1.0,
+        total_trades=total,
+        win_rate=float(np.mean(trades.pnl > 0)) if total else 0.0,
+        max_drawdown=max_drawdown,
+        sharpe_ratio=sharpe
+    )
+
+
+def backtest_arrays(
+    timestamps: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    strategy: StrategyEnum,
+    params: BacktestParams,
+    initial_balance: float = 10000.0,
+    risk_per_trade: float = 0.01,
+    cache: Optional[Dict[Hashable, Any]] = None,
+    window: slice = slice(None)
+) -> Tuple[TradeLog, BacktestStats]:
+    """
+    Signals, simulated trades and metrics for one strategy over raw candle arrays.
+
+    Signals are computed over the whole arrays, so indicators are already
+    warmed up when ``window`` starts; only the bars in ``window`` are traded
+    and scored, and trade indices are relative to it.
+    """
+
+    direction, avg_range = entry_signals(strategy, high, low, close, params, cache)
+    high, low, close, timestamps = high[window], low[window], close[window], timestamps[window]
+    trades = simulate_trades(high, low, close, direction[window], avg_range[window], params, initial_balance, risk_per_trade)
+    return trades, summarize(trades, timestamps, initial_balance)
+
+
+def _sample(count: int, limit: int) -> np.ndarray:
+    """At most ``limit`` evenly spaced indices into ``count`` items, always keeping the last."""
+    if count <= limit:
+        return np.arange(count)
+    return np.unique(np.linspace(0, count - 1, limit).round().astype(np.int64))
+
+
+def run_backtest(
+    pair: str,
+    timeframe: str,
+    strategy: StrategyEnum,
+    years: float,
+    initial_balance: float = 10000.0,
+    risk_per_trade: float = 0.01,
+    params: Optional[BacktestParams] = None
+) -> BacktestResult:
+    """
+    Backtest ``strategy`` on ``pair``/``timeframe`` over ``years`` of candles.
+
+    The equity curve is downsampled to ``BACKTEST_EQUITY_POINTS`` and only
+    the most recent ``BACKTEST_MAX_TRADES`` trades are returned; the metrics
+    cover every trade.
+    """
+
+    params = params or default_params(strategy)
+    with metrics.span("backtest.run"):
+        timestamps, _, high, low, close, _ = load_candles(pair, timeframe, years)
+        trades, stats = backtest_arrays(timestamps, high, low, close, strategy, params, initial_balance, risk_per_trade)
+
+    interval = TIMEFRAME_SECONDS[timeframe]
+    bar_close = lambda index: datetime.fromtimestamp(int(timestamps[index]) + interval)
+    points = _sample(stats.total_trades, settings.BACKTEST_EQUITY_POINTS)
+    equity_curve = [EquityPoint(timestamp=datetime.fromtimestamp(int(timestamps[0])), equity=initial_balance)]
+    equity_curve.extend(
+        EquityPoint(timestamp=bar_close(int(trades.exit_index[k])), equity=round(float(trades.equity[k]), 2))
+        for k in points
+    )
+
+    rows = []
+    for k in range(max(0, stats.total_trades - settings.BACKTEST_MAX_TRADES), stats.total_trades):
+        closed = bool(trades.closed[k])
+        rows.append(Trade(
+            id=f"trade_{k + 1}",
+            pair=pair,
+            direction="BUY" if trades.direction[k] > 0 else "SELL",
+            entry_price=round(float(trades.entry_price[k]), 5),
+            exit_price=round(float(trades.exit_price[k]), 5) if closed else None,
+            quantity=round(float(trades.quantity[k]), 2),
+            pnl=round(float(trades.pnl[k]), 2),
+            status="closed" if closed else "open",
+            opened_at=bar_close(int(trades.entry_index[k])),
+            closed_at=bar_close(int(trades.exit_index[k])) if closed else None
+        ))
+
+    return BacktestResult(
+        pair=pair,
+        timeframe=timeframe,
+        strategy=strategy.value,
+        start=datetime.fromtimestamp(int(timestamps[0])),
+        end=bar_close(-1),
+        candles=len(timestamps),
+        parameters=params._asdict(),
+        initial_balance=initial_balance,
+        final_balance=round(stats.final_balance, 2),
+        total_return=round(stats.total_return, 4),
+        total_trades=stats.total_trades,
+        win_rate=round(stats.win_rate, 4),
+        max_drawdown=round(stats.max_drawdown, 4),
+        sharpe_ratio=round(stats.sharpe_ratio, 3),
+        equity_curve=equity_curve,
+        trades=rows
+    )
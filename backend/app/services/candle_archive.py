@@ -0,0 +1,255 @@
+import os
+import threading
+from contextlib import contextmanager
+from typing import Dict, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: appends are only serialized within one process
+    fcntl = None
+
+import numpy as np
+
+from ..core.config import settings
+from .candle_store import CANDLE_FIELDS, TIMEFRAME_SECONDS
+
+
+COLUMN_DTYPES: Dict[str, np.dtype] = {
+    "timestamp": np.dtype(np.int64),
+    "open": np.dtype(np.float64),
+    "high": np.dtype(np.float64),
+    "low": np.dtype(np.float64),
+    "close": np.dtype(np.float64),
+    "volume": np.dtype(np.int64),
+}
+
+INDEX_FILE = "index.i8"
+LOCK_FILE = "append.lock"
+
+
+class ArchiveSeries:
+    """
+    Append-only on-disk candles for one pair/timeframe, one raw column file per field.
+
+    Each ``<field>.bin`` holds fixed-width little-endian values (int64 epoch
+    seconds for ``timestamp``, float64 prices, int64 volume) and is read
+    through ``np.memmap``, so only the pages a query touches are loaded.
+    ``index.i8`` stores the timestamp of every ``index_stride``-th candle;
+    a range query binary-searches that small index, then one stride of the
+    timestamp column, and returns zero-copy slices of the mapped columns.
+
+    Timestamps are strictly increasing: ``append`` drops anything at or
+    before the last stored candle, so re-ingesting an overlapping range is a
+    no-op. Columns are written before the timestamp column, and the series
+    length is the shortest column, so a torn append is ignored on reopen and
+    truncated away by the next one.
+
+    Other processes (e.g. the import CLI) may append to the same files.
+    Appends take an ``fcntl.flock`` on ``append.lock`` and re-stat the columns
+    first, and reads pick up rows appended elsewhere when the timestamp
+    column has grown.
+    """
+
+    def __init__(self, path: str, pair: str, timeframe: str, index_stride: int):
+        self.path = path
+        self.pair = pair
+        self.timeframe = timeframe
+        self.index_stride = index_stride
+        self._lock = threading.Lock()
+        self._maps: Optional[Dict[str, np.ndarray]] = None
+        self._index: Optional[np.ndarray] = None
+        self._length = self._stored_length()
+
+    def _file(self, field: str) -> str:
+        return os.path.join(self.path, f"{field}.bin")
+
+    def _stored_length(self) -> int:
+        lengths = []
+        for field, dtype in COLUMN_DTYPES.items():
+            try:
+                lengths.append(os.path.getsize(self._file(field)) // dtype.itemsize)
+            except FileNotFoundError:
+                return 0
+        return min(lengths)
+
+    def _refresh(self) -> None:
+        """Pick up candles appended by another process since the last look."""
+        try:
+            size = os.path.getsize(self._file("timestamp"))
+        except FileNotFoundError:
+            return
+        if size // COLUMN_DTYPES["timestamp"].itemsize != self._length:
+            length = self._stored_length()
+            if length != self._length:
+                self._length = length
+                self._maps = None
+
+    @contextmanager
+    def _append_lock(self) -> Iterator[None]:
+        with self._lock:
+            if fcntl is None:
+                yield
+                return
+            with open(os.path.join(self.path, LOCK_FILE), "a") as f:
+                fcntl.flock(f, fcntl.LOCK_EX)
+                try:
+                    yield
+                finally:
+                    fcntl.flock(f, fcntl.LOCK_UN)
+
+    def __len__(self) -> int:
+        self._refresh()
+        return self._length
+
+    def _columns(self) -> Dict[str, np.ndarray]:
+        maps = self._maps
+        if maps is None:
+            n = self._length
+            maps = {
+                field: np.memmap(self._file(field), dtype=dtype, mode="r", shape=(n,))
+                if n else np.empty(0, dtype=dtype)
+                for field, dtype in COLUMN_DTYPES.items()
+            }
+            self._maps = maps
+        return maps
+
+    def _time_index(self) -> np.ndarray:
+        index = self._index
+        expected = -(-self._length // self.index_stride)
+        if index is None or len(index) != expected:
+            path = os.path.join(self.path, INDEX_FILE)
+            stored = np.fromfile(path, dtype=np.int64) if os.path.exists(path) else np.empty(0, dtype=np.int64)
+            if len(stored) >= expected:
+                index = stored[:expected]
+            else:
+                # Missing or behind the columns (e.g. after a torn append or while
+                # another process is appending): rebuild it in memory; the next
+                # append rewrites the file under the append lock.
+                index = np.array(self._columns()["timestamp"][::self.index_stride])
+            self._index = index
+        return index
+
+    @property
+    def first_timestamp(self) -> Optional[int]:
+        self._refresh()
+        return int(self._columns()["timestamp"][0]) if self._length else None
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        self._refresh()
+        return int(self._columns()["timestamp"][-1]) if self._length else None
+
+    def _position(self, timestamp: int) -> int:
+        """Index of the first candle at or after ``timestamp``."""
+        index = self._time_index()
+        block = max(0, int(np.searchsorted(index, timestamp, side="right")) - 1)
+        start = block * self.index_stride
+        end = min(self._length, start + self.index_stride)
+        return start + int(np.searchsorted(self._columns()["timestamp"][start:end], timestamp, side="left"))
+
+    def range(self, start: Optional[int] = None, end: Optional[int] = None) -> Dict[str, np.ndarray]:
+        """Candles with ``start <= timestamp < end``, as read-only views keyed by field."""
+        self._refresh()
+        lo = 0 if start is None or not self._length else self._position(start)
+        hi = self._length if end is None or not self._length else self._position(end)
+        return {field: column[lo:max(lo, hi)] for field, column in self._columns().items()}
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        self._refresh()
+        return {field: column[max(0, self._length - n):] for field, column in self._columns().items()}
+
+    def append(
+        self,
+        timestamps: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ) -> int:
+        """
+        Append candles in one write per column; returns how many were new.
+
+        Input is sorted and de-duplicated by timestamp (the first of equal
+        timestamps wins) and anything not after the last stored candle is
+        dropped.
+        """
+
+        timestamps = np.asarray(timestamps, dtype=np.int64)
+        if len(timestamps) == 0:
+            return 0
+        columns = (open_, high, low, close, volume)
+        if np.any(timestamps[1:] <= timestamps[:-1]):
+            timestamps, keep = np.unique(timestamps, return_index=True)
+            columns = tuple(np.asarray(column)[keep] for column in columns)
+
+        os.makedirs(self.path, exist_ok=True)
+        with self._append_lock():
+            # Re-stat under the lock: another process may have appended since.
+            n = self._stored_length()
+            if n != self._length:
+                self._length = n
+                self._maps = None
+            last = int(self._columns()["timestamp"][-1]) if n else None
+            if last is not None:
+                first_new = int(np.searchsorted(timestamps, last, side="right"))
+                timestamps = timestamps[first_new:]
+                columns = tuple(np.asarray(column)[first_new:] for column in columns)
+            if len(timestamps) == 0:
+                return 0
+
+            values = dict(zip(CANDLE_FIELDS[1:], columns), timestamp=timestamps)
+            for field in CANDLE_FIELDS[1:] + CANDLE_FIELDS[:1]:
+                dtype = COLUMN_DTYPES[field]
+                with open(self._file(field), "ab") as f:
+                    # Longer than the shortest column: a torn append left a partial tail.
+                    if f.tell() != n * dtype.itemsize:
+                        f.truncate(n * dtype.itemsize)
+                        f.seek(0, os.SEEK_END)
+                    f.write(np.ascontiguousarray(values[field], dtype=dtype).tobytes())
+
+            index = self._time_index()
+            self._length = n + len(timestamps)
+            first = -(-n // self.index_stride) * self.index_stride
+            new_entries = timestamps[first - n::self.index_stride]
+            with open(os.path.join(self.path, INDEX_FILE), "ab") as f:
+                if f.tell() != len(index) * 8:
+                    # Missing, stale or rebuilt in memory: rewrite it whole.
+                    f.truncate(0)
+                    f.write(index.tobytes())
+                f.write(new_entries.tobytes())
+            self._index = np.concatenate((index, new_entries))
+            self._maps = None
+            return len(timestamps)
+
+
+class CandleArchive:
+    """
+    Directory of ``ArchiveSeries``, laid out as ``<root>/<PAIR>/<timeframe>/``.
+
+    Series are opened lazily on first use and opening one only stats its
+    files, so startup cost does not depend on how much history is stored.
+    """
+
+    def __init__(self, root: str, index_stride: int):
+        self.root = root
+        self.index_stride = index_stride
+        self._series: Dict[Tuple[str, str], ArchiveSeries] = {}
+        self._lock = threading.Lock()
+
+    def series(self, pair: str, timeframe: str) -> ArchiveSeries:
+        if timeframe not in TIMEFRAME_SECONDS:
+            raise ValueError(f"Unsupported timeframe {timeframe}")
+        key = (pair, timeframe)
+        series = self._series.get(key)
+        if series is None:
+            with self._lock:
+                series = self._series.get(key)
+                if series is None:
+                    path = os.path.join(self.root, pair.replace("/", ""), timeframe)
+                    series = ArchiveSeries(path, pair, timeframe, self.index_stride)
+                    self._series[key] = series
+        return series
+
+
+candle_archive = CandleArchive(settings.ARCHIVE_DIR, settings.ARCHIVE_INDEX_STRIDE)
@@ -0,0 +1,364 @@
+import io
+import time
+from typing import Callable, Dict, Iterator, List, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..schemas.trading import TradingPairEnum
+from .candle_archive import CandleArchive
+from .resampler import bucket_start, resample
+
+try:
+    import pyarrow.parquet as pq
+except ImportError:  # only Parquet input needs pyarrow; CSV imports work without it
+    pq = None
+
+
+# Header names accepted for each logical column, lower-cased.
+COLUMN_ALIASES: Dict[str, Tuple[str, ...]] = {
+    "timestamp": ("timestamp", "datetime", "date_time", "time", "ts", "gmt time", "local time"),
+    "date": ("date", "day"),
+    "open": ("open", "o"),
+    "high": ("high", "h"),
+    "low": ("low", "l"),
+    "close": ("close", "c"),
+    "volume": ("volume", "vol", "tick_volume", "tickvol", "v"),
+    "bid": ("bid",),
+    "ask": ("ask",),
+    "pair": ("pair", "symbol", "instrument", "ticker"),
+}
+
+PRICE_COLUMNS = ("open", "high", "low", "close")
+
+_PAIRS = {pair.value.replace("/", ""): pair.value for pair in TradingPairEnum}
+
+
+class CandleImportError(ValueError):
+    pass
+
+
+def canonical_pair(symbol: str) -> Optional[str]:
+    """``TradingPairEnum`` value for ``EURUSD``, ``eur/usd``, ``EUR_USD`` and the like; None if unknown."""
+    key = symbol.strip().upper()
+    for separator in ("/", "_", "-", " "):
+        key = key.replace(separator, "")
+    return _PAIRS.get(key)
+
+
+def resolve_columns(names: Sequence[str]) -> Dict[str, int]:
+    """
+    Map logical columns to positions in a header row.
+
+    A lone ``time`` next to a ``date`` column is the time of day, so the two
+    are combined into the timestamp.
+    """
+
+    positions: Dict[str, int] = {}
+    for position, name in enumerate(names):
+        name = name.strip().strip('"').lower()
+        for column, aliases in COLUMN_ALIASES.items():
+            if name in aliases and column not in positions:
+                positions[column] = position
+                break
+    if "date" in positions:
+        if "timestamp" in positions:
+            positions["time"] = positions.pop("timestamp")
+        positions["timestamp"] = positions.pop("date")
+
+    if "timestamp" not in positions:
+        raise CandleImportError("Input has no timestamp column")
+    if not all(column in positions for column in PRICE_COLUMNS) and not ("bid" in positions and "ask" in positions):
+        raise CandleImportError("Input needs open/high/low/close or bid/ask columns")
+    return positions
+
+
+def normalize_timestamps(
+    values: np.ndarray,
+    tz_offset: int = 0,
+    time_of_day: Optional[np.ndarray] = None,
+    fractional: bool = False
+) -> np.ndarray:
+    """
+    Epoch seconds (UTC) from numeric epochs or date/time strings.
+
+    Numeric epochs in seconds, milliseconds, microseconds or nanoseconds are
+    told apart by magnitude. Strings are ISO-8601-like with ``-``, ``.`` or
+    ``/`` date separators and an optional ``T``/space and trailing ``Z``;
+    ``time_of_day`` is appended when date and time come in separate columns.
+    ``tz_offset`` is the input's UTC offset in minutes. With ``fractional``
+    the result is float64 seconds keeping sub-second precision (to the
+    millisecond for strings), as tick data needs.
+    """
+
+    if len(values) == 0:
+        return np.empty(0, dtype=np.float64 if fractional else np.int64)
+
+    if values.dtype.kind in "iuf":
+        magnitude = float(np.nanmax(np.abs(values)))
+        scale = 10 ** 9 if magnitude > 1e17 else 10 ** 6 if magnitude > 1e14 else 10 ** 3 if magnitude > 1e11 else 1
+        if fractional:
+            seconds = values.astype(np.float64) / scale
+        elif values.dtype.kind == "f":
+            seconds = np.floor(values / scale).astype(np.int64)
+        else:
+            seconds = values.astype(np.int64) // scale
+    else:
+        text = values
+        sample = str(text[0])
+        if len(sample) >= 8 and sample[4:5] in "./" and sample[7:8] == sample[4:5]:
+            text = np.char.replace(text, sample[4], "-", count=2)
+        if time_of_day is not None:
+            text = np.char.add(np.char.add(text, " "), time_of_day)
+        if sample.endswith("Z"):
+            text = np.char.rstrip(text, "Z")
+        try:
+            millis = text.astype("datetime64[ms]").astype(np.int64)
+            seconds = millis / 1000.0 if fractional else millis // 1000
+        except ValueError as exc:
+            raise CandleImportError(f"Unparseable timestamp: {exc}")
+    return seconds - tz_offset * 60
+
+
+def read_csv(
+    path: str,
+    chunk_bytes: int,
+    columns: Optional[Sequence[str]] = None,
+    delimiter: str = ","
+) -> Iterator[Tuple[Dict[str, np.ndarray], int]]:
+    """
+    Typed columns of a CSV file, ``chunk_bytes`` of input at a time.
+
+    Yields ``(columns, invalid)`` per chunk. Each chunk is cut at a line
+    boundary and parsed by ``np.loadtxt`` into a structured array in one C
+    pass. A chunk with malformed lines is re-parsed line by line and the bad
+    lines are counted in ``invalid``. Memory is bounded by the chunk size,
+    whatever the file size.
+    """
+
+    with open(path, "rb") as f:
+        first = f.readline().decode("utf-8-sig")
+        names = columns if columns is not None else first.rstrip("\r\n").split(delimiter)
+        positions = resolve_columns(names)
+        remainder = b"" if columns is None else first.encode("utf-8")
+
+        dtype: Optional[np.dtype] = None
+        while True:
+            block = f.read(chunk_bytes)
+            data = remainder + block
+            if not block:
+                remainder = b""
+            else:
+                cut = data.rfind(b"\n") + 1
+                data, remainder = data[:cut], data[cut:]
+            if data.strip():
+                text = data.decode("utf-8")
+                if dtype is None:
+                    dtype = _csv_dtype(positions, text, delimiter)
+                yield _parse_csv(text, positions, dtype, delimiter)
+            if not block:
+                return
+
+
+def _csv_dtype(positions: Dict[str, int], text: str, delimiter: str) -> np.dtype:
+    sample = next(line for line in text.splitlines() if line.strip()).split(delimiter)
+    fields = []
+    for column, position in sorted(positions.items(), key=lambda item: item[1]):
+        if column in ("time", "pair"):
+            fields.append((column, "U32"))
+        elif column == "timestamp":
+            try:
+                float(sample[position])
+                fields.append((column, "f8"))
+            except ValueError:
+                fields.append((column, "U32"))
+        else:
+            fields.append((column, "f8"))
+    return np.dtype(fields)
+
+
+def _parse_csv(text: str, positions: Dict[str, int], dtype: np.dtype, delimiter: str) -> Tuple[Dict[str, np.ndarray], int]:
+    usecols = sorted(positions.values())
+    try:
+        rows = np.loadtxt(io.StringIO(text), dtype=dtype, delimiter=delimiter, usecols=usecols, quotechar='"', ndmin=1)
+        invalid = 0
+    except ValueError:
+        parsed: List[np.ndarray] = []
+        invalid = 0
+        for line in text.splitlines():
+            if not line.strip():
+                continue
+            try:
+                parsed.append(np.loadtxt([line], dtype=dtype, delimiter=delimiter, usecols=usecols, quotechar='"', ndmin=1))
+            except ValueError:
+                invalid += 1
+        rows = np.concatenate(parsed) if parsed else np.empty(0, dtype=dtype)
+    return {name: rows[name] for name in dtype.names}, invalid
+
+
+def read_parquet(path: str, chunk_rows: int, columns: Optional[Sequence[str]] = None) -> Iterator[Tuple[Dict[str, np.ndarray], int]]:
+    """Typed columns of a Parquet file, one record batch of ``chunk_rows`` at a time."""
+    if pq is None:
+        raise CandleImportError("Parquet input requires pyarrow (pip install pyarrow)")
+    parquet = pq.ParquetFile(path)
+    names = list(columns) if columns is not None else parquet.schema_arrow.names
+    positions = resolve_columns(names)
+    selected = [names[position] for position in positions.values()]
+    for batch in parquet.iter_batches(batch_size=chunk_rows, columns=selected):
+        chunk = {}
+        for column, position in positions.items():
+            values = batch.column(batch.schema.get_field_index(names[position]))
+            array = values.to_numpy(zero_copy_only=False)
+            if array.dtype.kind == "M":
+                # Epoch milliseconds; normalize_timestamps scales them by magnitude.
+                array = array.astype("datetime64[ms]").astype(np.int64)
+            elif array.dtype.kind == "O":
+                array = array.astype(str)
+            chunk[column] = array
+        yield chunk, 0
+
+
+class ImportStats:
+    def __init__(self):
+        self.rows_read = 0
+        self.rows_invalid = 0
+        self.rows_duplicate = 0
+        self.bars_written = 0
+        self.bars_skipped = 0
+        self.bars_before_archive = 0
+        self.started = time.perf_counter()
+
+    @property
+    def elapsed(self) -> float:
+        return time.perf_counter() - self.started
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows_read / self.elapsed if self.elapsed > 0 else 0.0
+
+
+class CandleImporter:
+    """
+    Streams parsed chunks of bars or ticks into the candle archive.
+
+    Rows are grouped by pair (a ``pair`` column or the fixed ``pair``), sorted
+    by timestamp and aggregated into ``timeframe`` bars. Bars are
+    de-duplicated by timestamp. Ticks keep sub-second timestamps, only exact
+    repeats (same timestamp, bid and ask) are dropped, and each counts as
+    volume 1 at its bid/ask mid. The last, possibly incomplete bucket of
+    every pair is held back and merged with the next chunk, so bars that
+    straddle chunk boundaries come out whole. Bars within what the archive
+    already holds are dropped, which makes re-importing overlapping exports
+    safe; bars older than the archive's first bar cannot be written to the
+    append-only archive and are counted in ``bars_before_archive``.
+    """
+
+    def __init__(self, archive: CandleArchive, timeframe: str = "1m", pair: Optional[str] = None, tz_offset: int = 0):
+        self.archive = archive
+        self.timeframe = timeframe
+        self.pair = pair
+        self.tz_offset = tz_offset
+        self.stats = ImportStats()
+        self._carry: Dict[Tuple[str, bool], Tuple[np.ndarray, ...]] = {}
+
+    def feed(self, chunk: Dict[str, np.ndarray], invalid: int = 0) -> None:
+        count = len(next(iter(chunk.values())))
+        self.stats.rows_read += count + invalid
+        self.stats.rows_invalid += invalid
+        if count == 0:
+            return
+
+        ticks = "open" not in chunk
+        timestamps = normalize_timestamps(chunk["timestamp"], self.tz_offset, chunk.get("time"), fractional=ticks)
+        if ticks:
+            columns = (timestamps, chunk["bid"], chunk["ask"])
+            valid = np.isfinite(chunk["bid"]) & np.isfinite(chunk["ask"])
+        else:
+            prices = tuple(chunk[column] for column in PRICE_COLUMNS)
+            volume = chunk["volume"] if "volume" in chunk else np.zeros(count)
+            columns = (timestamps,) + prices + (np.nan_to_num(volume).astype(np.int64),)
+            valid = np.isfinite(prices[0]) & np.isfinite(prices[1]) & np.isfinite(prices[2]) & np.isfinite(prices[3])
+
+        if "pair" in chunk:
+            symbols, codes = np.unique(chunk["pair"], return_inverse=True)
+            for code, symbol in enumerate(symbols):
+                pair = canonical_pair(str(symbol))
+                rows = codes == code
+                if pair is None:
+                    # Unknown pairs are rejected whole; don't count them twice below.
+                    self.stats.rows_invalid += int(rows.sum())
+                    valid &= ~rows
+                    count -= int(rows.sum())
+                    continue
+                self._feed_pair(pair, ticks, rows & valid, columns)
+        elif self.pair is not None:
+            self._feed_pair(self.pair, ticks, valid, columns)
+        else:
+            raise CandleImportError("Input has no pair column; pass the pair explicitly")
+        self.stats.rows_invalid += int(count - valid.sum())
+
+    def _feed_pair(self, pair: str, ticks: bool, rows: np.ndarray, columns: Tuple[np.ndarray, ...]) -> None:
+        columns = tuple(column[rows] for column in columns)
+        carry = self._carry.pop((pair, ticks), None)
+        if carry is not None:
+            columns = tuple(np.concatenate(pair_columns) for pair_columns in zip(carry, columns))
+        if len(columns[0]) == 0:
+            return
+
+        if ticks:
+            # Several ticks can share a timestamp; only exact repeats are duplicates.
+            _, first = np.unique(np.rec.fromarrays(columns), return_index=True)
+            first.sort()
+            keep = first[np.argsort(columns[0][first], kind="stable")]
+        else:
+            _, keep = np.unique(columns[0], return_index=True)
+        self.stats.rows_duplicate += len(columns[0]) - len(keep)
+        columns = tuple(column[keep] for column in columns)
+
+        buckets = bucket_start(columns[0], self.timeframe)
+        held = int(np.searchsorted(buckets, buckets[-1], side="left"))
+        self._carry[(pair, ticks)] = tuple(column[held:] for column in columns)
+        self._write(pair, ticks, tuple(column[:held] for column in columns))
+
+    def _write(self, pair: str, ticks: bool, columns: Tuple[np.ndarray, ...]) -> None:
+        if len(columns[0]) == 0:
+            return
+        if ticks:
+            timestamps, bid, ask = columns
+            mid = (bid + ask) / 2
+            columns = (timestamps, mid, mid, mid, mid, np.ones(len(timestamps), dtype=np.int64))
+        bars = resample(*columns, self.timeframe)
+        series = self.archive.series(pair, self.timeframe)
+        first = series.first_timestamp
+        written = series.append(*bars)
+        before = int(np.count_nonzero(bars[0] < first)) if first is not None else 0
+        self.stats.bars_written += written
+        self.stats.bars_before_archive += before
+        self.stats.bars_skipped += len(bars[0]) - written - before
+
+    def finish(self) -> ImportStats:
+        """Write the held-back last bar of every pair."""
+        for (pair, ticks), columns in self._carry.items():
+            self._write(pair, ticks, columns)
+        self._carry = {}
+        return self.stats
+
+
+def import_file(
+    importer: CandleImporter,
+    path: str,
+    chunk_bytes: int = 4 * 1024 * 1024,
+    columns: Optional[Sequence[str]] = None,
+    delimiter: str = ",",
+    progress: Optional[Callable[[ImportStats], None]] = None
+) -> ImportStats:
+    """Stream one CSV or Parquet file through ``importer``; ``progress`` is called after every chunk."""
+    if path.lower().endswith((".parquet", ".pq")):
+        # Roughly the same memory per chunk as CSV, at ~64 bytes per parsed row.
+        chunks = read_parquet(path, max(1, chunk_bytes // 64), columns)
+    else:
+        chunks = read_csv(path, chunk_bytes, columns, delimiter)
+    for chunk, invalid in chunks:
+        importer.feed(chunk, invalid)
+        if progress is not None:
+            progress(importer.stats)
+    return importer.stats
@@ -0,0 +1,166 @@
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+
+
+TIMEFRAME_SECONDS: Dict[str, int] = {
+    "1m": 60,
+    "5m": 5 * 60,
+    "15m": 15 * 60,
+    "30m": 30 * 60,
+    "1h": 60 * 60,
+    "4h": 4 * 60 * 60,
+    "1d": 24 * 60 * 60,
+    "1w": 7 * 24 * 60 * 60,
+}
+
+CANDLE_FIELDS = ("timestamp", "open", "high", "low", "close", "volume")
+
+
+class CandleStore:
+    """
+    Append-only columnar OHLCV buffer for a single pair/timeframe.
+
+    Timestamps are int64 epoch seconds (candle open time), prices are float64
+    and volume is int64. Columns grow by doubling so appends are amortised O(1),
+    and reads return NumPy views without building per-candle objects.
+    """
+
+    def __init__(self, pair: str, timeframe: str, capacity: int = 1024):
+        self.pair = pair
+        self.timeframe = timeframe
+        self.interval = TIMEFRAME_SECONDS[timeframe]
+        self._size = 0
+        self._allocate(max(capacity, 16))
+
+    def _allocate(self, capacity: int) -> None:
+        old = getattr(self, "_ts", None)
+        ts = np.empty(capacity, dtype=np.int64)
+        ohlc = np.empty((4, capacity), dtype=np.float64)
+        volume = np.empty(capacity, dtype=np.int64)
+        if old is not None and self._size:
+            ts[:self._size] = self._ts[:self._size]
+            ohlc[:, :self._size] = self._ohlc[:, :self._size]
+            volume[:self._size] = self._volume[:self._size]
+        self._ts = ts
+        self._ohlc = ohlc
+        self._volume = volume
+
+    def _reserve(self, extra: int) -> None:
+        needed = self._size + extra
+        capacity = self._ts.shape[0]
+        if needed > capacity:
+            while capacity < needed:
+                capacity *= 2
+            self._allocate(capacity)
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def timestamps(self) -> np.ndarray:
+        return self._ts[:self._size]
+
+    @property
+    def open(self) -> np.ndarray:
+        return self._ohlc[0, :self._size]
+
+    @property
+    def high(self) -> np.ndarray:
+        return self._ohlc[1, :self._size]
+
+    @property
+    def low(self) -> np.ndarray:
+        return self._ohlc[2, :self._size]
+
+    @property
+    def close(self) -> np.ndarray:
+        return self._ohlc[3, :self._size]
+
+    @property
+    def volume(self) -> np.ndarray:
+        return self._volume[:self._size]
+
+    @property
+    def last_timestamp(self) -> Optional[int]:
+        return int(self._ts[self._size - 1]) if self._size else None
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: int) -> None:
+        self._reserve(1)
+        i = self._size
+        self._ts[i] = timestamp
+        self._ohlc[:, i] = (open_, high, low, close)
+        self._volume[i] = volume
+        self._size += 1
+
+    def extend(
+        self,
+        timestamps: np.ndarray,
+        open_: np.ndarray,
+        high: np.ndarray,
+        low: np.ndarray,
+        close: np.ndarray,
+        volume: np.ndarray
+    ) -> None:
+        n = len(timestamps)
+        if n == 0:
+            return
+        self._reserve(n)
+        start, end = self._size, self._size + n
+        self._ts[start:end] = timestamps
+        self._ohlc[0, start:end] = open_
+        self._ohlc[1, start:end] = high
+        self._ohlc[2, start:end] = low
+        self._ohlc[3, start:end] = close
+        self._volume[start:end] = volume
+        self._size = end
+
+    def tail(self, n: int) -> Dict[str, np.ndarray]:
+        """Return views over the last ``n`` candles, keyed by field name."""
+        start = max(self._size - n, 0)
+        return {
+            "timestamp": self._ts[start:self._size],
+            "open": self._ohlc[0, start:self._size],
+            "high": self._ohlc[1, start:self._size],
+            "low": self._ohlc[2, start:self._size],
+            "close": self._ohlc[3, start:self._size],
+            "volume": self._volume[start:self._size],
+        }
+
+    def to_columns(self, n: int, decimals: int = 5) -> Dict[str, List]:
+        """Serialise the last ``n`` candles as column lists for a JSON response."""
+        view = self.tail(n)
+        return {
+            "timestamp": view["timestamp"].tolist(),
+            "open": np.round(view["open"], decimals).tolist(),
+            "high": np.round(view["high"], decimals).tolist(),
+            "low": np.round(view["low"], decimals).tolist(),
+            "close": np.round(view["close"], decimals).tolist(),
+            "volume": view["volume"].tolist(),
+        }
+
+
+def simulate_candles(
+    last_close: float,
+    start: int,
+    interval: int,
+    count: int,
+    rng: np.random.Generator
+) -> Tuple[np.ndarray, ...]:
+    """
+    Generate ``count`` random-walk candles starting at epoch ``start``.
+
+    TODO: Replace with real OHLCV data from forex provider
+    """
+
+    step = last_close * 0.0004 * np.sqrt(interval / 60)
+    close = last_close + np.cumsum(rng.normal(0.0, step, count))
+    open_ = np.empty(count)
+    open_[0] = last_close
+    open_[1:] = close[:-1]
+    wick = np.abs(rng.normal(0.0, step / 2, (2, count)))
+    high = np.maximum(open_, close) + wick[0]
+    low = np.minimum(open_, close) - wick[1]
+    timestamps = start + np.arange(count, dtype=np.int64) * interval
+    volume = rng.integers(100000, 1000000, count, dtype=np.int64)
+    return timestamps, open_, high, low, close, volume
@@ -0,0 +1,213 @@
+import asyncio
+import base64
+import binascii
+import hashlib
+import io
+from collections import OrderedDict
+from functools import cached_property
+from typing import BinaryIO, List, Optional, Union
+
+from PIL import Image, ImageOps, UnidentifiedImageError
+
+from ..core.config import settings
+from ..core.metrics import metrics
+
+
+MEDIA_TYPES = {"JPEG": "image/jpeg", "PNG": "image/png", "WEBP": "image/webp"}
+
+
+class InvalidChartImage(ValueError):
+    pass
+
+
+class ProcessedImage:
+    """
+    A chart image after preprocessing, shared by every model in a request.
+
+    ``data`` is the re-encoded image and ``digest`` its SHA-256; ``base64`` is
+    computed once on first use, so providers that need base64 all reuse the
+    same string instead of encoding the buffer per model.
+    """
+
+    def __init__(self, data: bytes, media_type: str, width: int, height: int):
+        self.data = data
+        self.digest = hashlib.sha256(data).hexdigest()
+        self.media_type = media_type
+        self.width = width
+        self.height = height
+
+    @cached_property
+    def base64(self) -> str:
+        return base64.b64encode(self.data).decode("ascii")
+
+    @property
+    def data_url(self) -> str:
+        return f"data:{self.media_type};base64,{self.base64}"
+
+
+def decode_image_payload(payload: str) -> bytes:
+    """Raw bytes of a base64 image, with or without a ``data:image/...;base64,`` prefix."""
+    if payload.startswith("data:"):
+        payload = payload.partition(",")[2]
+    try:
+        return base64.b64decode(payload, validate=True)
+    except (binascii.Error, ValueError):
+        raise InvalidChartImage("Image is not valid base64")
+
+
+def check_image(raw: bytes) -> None:
+    """
+    Cheap up-front check that ``raw`` is an acceptable image.
+
+    Only the header is parsed (format, size and pixel limits); the pixels are
+    not decoded, so this costs a fraction of ``process_image``.
+    """
+
+    if len(raw) > settings.CHART_IMAGE_MAX_BYTES:
+        raise InvalidChartImage(f"Image exceeds {settings.CHART_IMAGE_MAX_BYTES} bytes")
+    try:
+        with Image.open(io.BytesIO(raw)) as image:
+            if image.width * image.height > settings.CHART_IMAGE_MAX_PIXELS:
+                raise InvalidChartImage("Image dimensions are too large")
+    except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+        raise InvalidChartImage("Image could not be decoded")
+
+
+def process_image(source: Union[bytes, BinaryIO]) -> ProcessedImage:
+    """
+    Decode ``source`` once, downsize it to ``CHART_IMAGE_MAX_DIMENSION`` and re-encode it.
+
+    ``source`` is the raw upload or a seekable binary file holding it (such
+    as a spooled multipart part), which is decoded without being read into
+    memory whole.
+
+    JPEG sources are decoded at reduced scale via ``draft`` when they are much
+    larger than the target, so multi-megapixel screenshots never get fully
+    decoded just to be shrunk. PNG sources (typically flat-colour chart
+    screenshots) are also re-encoded as PNG and the smaller result wins; an
+    upload that needs no resizing and is already smaller is kept as is.
+    """
+
+    if isinstance(source, bytes):
+        source = io.BytesIO(source)
+    source_size = source.seek(0, io.SEEK_END)
+    source.seek(0)
+    if source_size > settings.CHART_IMAGE_MAX_BYTES:
+        raise InvalidChartImage(f"Image exceeds {settings.CHART_IMAGE_MAX_BYTES} bytes")
+
+    target = settings.CHART_IMAGE_MAX_DIMENSION
+    with metrics.span("chart_image.process"):
+        try:
+            image = Image.open(source)
+            source_format = image.format
+            if image.width * image.height > settings.CHART_IMAGE_MAX_PIXELS:
+                raise InvalidChartImage("Image dimensions are too large")
+            image.draft("RGB", (target, target))
+            image = ImageOps.exif_transpose(image)
+            image = image.convert("RGB")
+        except (UnidentifiedImageError, OSError, Image.DecompressionBombError):
+            raise InvalidChartImage("Image could not be decoded")
+
+        size = image.size
+        image.thumbnail((target, target), Image.Resampling.LANCZOS)
+        formats = [settings.CHART_IMAGE_FORMAT]
+        if source_format == "PNG" and "PNG" not in formats:
+            formats.append("PNG")
+        encoded = []
+        for image_format in formats:
+            out = io.BytesIO()
+            if image_format == "PNG":
+                image.save(out, format=image_format)
+            else:
+                image.save(out, format=image_format, quality=settings.CHART_IMAGE_QUALITY, optimize=True)
+            encoded.append((len(out.getvalue()), image_format, out.getvalue()))
+        _, image_format, data = min(encoded)
+
+    if image.size == size and source_format in MEDIA_TYPES and source_size <= len(data):
+        source.seek(0)
+        return ProcessedImage(source.read(), MEDIA_TYPES[source_format], image.width, image.height)
+    return ProcessedImage(data, MEDIA_TYPES[image_format], image.width, image.height)
+
+
+class ProcessedImageCache:
+    """
+    Bounded LRU from the SHA-256 of an upload's raw bytes to its processed image.
+
+    Re-uploading the same screenshot (or sending it twice in one request)
+    skips decoding and re-encoding entirely. The cap is on processed bytes.
+    """
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._entries: "OrderedDict[bytes, ProcessedImage]" = OrderedDict()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: bytes) -> Optional[ProcessedImage]:
+        image = self._entries.get(key)
+        if image is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return image
+
+    def put(self, key: bytes, image: ProcessedImage) -> None:
+        if len(image.data) > self.max_bytes or key in self._entries:
+            return
+        self._entries[key] = image
+        self.size += len(image.data)
+        while self.size > self.max_bytes:
+            _, evicted = self._entries.popitem(last=False)
+            self.size -= len(evicted.data)
+
+
+processed_images = ProcessedImageCache(settings.CHART_IMAGE_CACHE_BYTES)
+
+
+async def prepare_image(raw: bytes) -> ProcessedImage:
+    """Processed version of ``raw``, from the cache or decoded off the event loop."""
+    return await prepare_image_file(raw, hashlib.sha256(raw).digest())
+
+
+async def prepare_image_file(source: Union[bytes, BinaryIO], key: bytes) -> ProcessedImage:
+    """Processed version of ``source`` whose raw SHA-256 digest is ``key``."""
+    image = processed_images.get(key)
+    if image is None:
+        image = await asyncio.get_running_loop().run_in_executor(None, process_image, source)
+        processed_images.put(key, image)
+    return image
+
+
+async def prepare_chart_images(payloads: Optional[List[str]]) -> List[ProcessedImage]:
+    """
+    Decode and preprocess base64 chart images, dropping duplicates by content hash.
+
+    Raises ``InvalidChartImage`` for anything that is not a decodable image.
+    """
+
+    images: List[ProcessedImage] = []
+    seen = set()
+    for payload in payloads or []:
+        image = await prepare_image(decode_image_payload(payload))
+        if image.digest not in seen:
+            seen.add(image.digest)
+            images.append(image)
+    return images
+
+
+def check_chart_images(payloads: Optional[List[str]]) -> None:
+    """
+    Validate base64 chart images without processing them, for requests whose
+    images are processed later by a background job.
+
+    Raises ``InvalidChartImage`` as ``prepare_chart_images`` would for
+    payloads that are not base64 or whose header is not a supported image.
+    """
+
+    for payload in payloads or []:
+        check_image(decode_image_payload(payload))
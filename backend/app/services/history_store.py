@@ -0,0 +1,270 @@
+import itertools
+from abc import ABC, abstractmethod
+from bisect import bisect_left
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.database import SQLiteConnectionPool
+from ..schemas.trading import AnalysisResult
+
+
+HistoryPage = Tuple[List[AnalysisResult], Optional[str]]
+
+
+def _cursor_seq(cursor: str) -> int:
+    """Sequence number encoded in ``cursor``; ValueError if it isn't one of ours."""
+    if not (cursor.isascii() and cursor.isdigit()):
+        raise ValueError(f"Invalid cursor {cursor!r}")
+    return int(cursor)
+
+
+class HistoryStore(ABC):
+    """
+    Per-user analysis history, newest first, with cursor pagination.
+
+    Each user keeps at most ``max_per_user`` entries; older ones are evicted
+    on insert. Cursors are opaque strings returned alongside each page.
+
+    Async code calls ``add_async``/``query_async``, which run stores that
+    block on I/O (``blocking``) in a worker thread, off the event loop.
+    """
+
+    blocking = False
+
+    def __init__(self, max_per_user: int):
+        self.max_per_user = max_per_user
+
+    async def add_async(self, user_id: str, analysis: AnalysisResult) -> None:
+        if self.blocking:
+            return await run_in_threadpool(self.add, user_id, analysis)
+        return self.add(user_id, analysis)
+
+    async def query_async(self, user_id: str, **filters: Any) -> HistoryPage:
+        if self.blocking:
+            return await run_in_threadpool(self.query, user_id, **filters)
+        return self.query(user_id, **filters)
+
+    @abstractmethod
+    def add(self, user_id: str, analysis: AnalysisResult) -> None:
+        """Record ``analysis`` as the user's newest entry."""
+
+    @abstractmethod
+    def query(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> HistoryPage:
+        """
+        Return up to ``limit`` entries older than ``cursor`` plus the cursor for the next page.
+
+        ``start``/``end`` may be naive (local time, like ``created_at``) or
+        timezone-aware; they are compared as POSIX timestamps. Raises
+        ValueError for a malformed ``cursor``.
+        """
+
+
+class _UserHistory:
+    def __init__(self):
+        self.items: Dict[int, AnalysisResult] = {}
+        self.order: List[int] = []
+        self.by_pair: Dict[str, List[int]] = {}
+        self.by_strategy: Dict[str, List[int]] = {}
+        self.oldest = 0
+
+
+class InMemoryHistoryStore(HistoryStore):
+    """
+    History kept in insertion order per user with pair and strategy indexes.
+
+    Entries get increasing sequence numbers, so newest-first reads walk an
+    index list backwards with no sorting; evicted sequence numbers are skipped
+    and index lists are compacted once they hold twice the cap.
+    """
+
+    def __init__(self, max_per_user: int):
+        super().__init__(max_per_user)
+        self._users: Dict[str, _UserHistory] = {}
+        self._seq = itertools.count(1)
+
+    def add(self, user_id: str, analysis: AnalysisResult) -> None:
+        history = self._users.setdefault(user_id, _UserHistory())
+        seq = next(self._seq)
+        history.items[seq] = analysis
+        history.order.append(seq)
+        history.by_pair.setdefault(analysis.pair, []).append(seq)
+        history.by_strategy.setdefault(analysis.strategy, []).append(seq)
+
+        while len(history.items) > self.max_per_user:
+            oldest = history.order[len(history.order) - len(history.items)]
+            del history.items[oldest]
+            history.oldest = oldest + 1
+
+        if len(history.order) > 2 * self.max_per_user:
+            self._compact(history)
+
+    @staticmethod
+    def _compact(history: _UserHistory) -> None:
+        def live(seqs: List[int]) -> List[int]:
+            return seqs[bisect_left(seqs, history.oldest):]
+
+        history.order = live(history.order)
+        history.by_pair = {k: live(v) for k, v in history.by_pair.items() if v[-1] >= history.oldest}
+        history.by_strategy = {k: live(v) for k, v in history.by_strategy.items() if v[-1] >= history.oldest}
+
+    def query(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> HistoryPage:
+        before = _cursor_seq(cursor) if cursor else None
+        history = self._users.get(user_id)
+        if history is None:
+            return [], None
+        start_ts = start.timestamp() if start is not None else None
+        end_ts = end.timestamp() if end is not None else None
+
+        if pair is not None and strategy is not None:
+            by_pair = history.by_pair.get(pair, [])
+            by_strategy = history.by_strategy.get(strategy, [])
+            seqs = by_pair if len(by_pair) <= len(by_strategy) else by_strategy
+        elif pair is not None:
+            seqs = history.by_pair.get(pair, [])
+        elif strategy is not None:
+            seqs = history.by_strategy.get(strategy, [])
+        else:
+            seqs = history.order
+
+        i = bisect_left(seqs, before) if before is not None else len(seqs)
+        results: List[AnalysisResult] = []
+        last_seq = None
+        while i > 0 and len(results) < limit:
+            i -= 1
+            seq = seqs[i]
+            if seq < history.oldest:
+                break
+            analysis = history.items[seq]
+            if start_ts is not None or end_ts is not None:
+                created = analysis.created_at.timestamp()
+                if start_ts is not None and created < start_ts:
+                    break
+                if end_ts is not None and created > end_ts:
+                    continue
+            if pair is not None and analysis.pair != pair:
+                continue
+            if strategy is not None and analysis.strategy != strategy:
+                continue
+            results.append(analysis)
+            last_seq = seq
+
+        has_more = len(results) == limit and i > 0 and seqs[i - 1] >= history.oldest
+        return results, str(last_seq) if has_more else None
+
+
+class SQLiteHistoryStore(HistoryStore):
+    """
+    History persisted in SQLite so it survives restarts.
+
+    Rows are keyed by an autoincrement sequence with composite indexes on
+    (user, seq), (user, pair, seq), (user, strategy, seq) and (user, created_at),
+    so every filtered newest-first page is an index range scan.
+    """
+
+    blocking = True
+
+    def __init__(self, pool: SQLiteConnectionPool, max_per_user: int):
+        super().__init__(max_per_user)
+        self._pool = pool
+        with self._pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS analysis_history (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    user_id TEXT NOT NULL,
+                    pair TEXT NOT NULL,
+                    strategy TEXT NOT NULL,
+                    created_at REAL NOT NULL,
+                    payload TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_history_user ON analysis_history (user_id, seq);
+                CREATE INDEX IF NOT EXISTS ix_history_pair ON analysis_history (user_id, pair, seq);
+                CREATE INDEX IF NOT EXISTS ix_history_strategy ON analysis_history (user_id, strategy, seq);
+                CREATE INDEX IF NOT EXISTS ix_history_created ON analysis_history (user_id, created_at);
+            """)
+
+    def add(self, user_id: str, analysis: AnalysisResult) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT INTO analysis_history (user_id, pair, strategy, created_at, payload) VALUES (?, ?, ?, ?, ?)",
+                (user_id, analysis.pair, analysis.strategy, analysis.created_at.timestamp(), analysis.model_dump_json())
+            )
+            conn.execute(
+                """
+                DELETE FROM analysis_history WHERE user_id = ? AND seq <= (
+                    SELECT seq FROM analysis_history WHERE user_id = ?
+                    ORDER BY seq DESC LIMIT 1 OFFSET ?
+                )
+                """,
+                (user_id, user_id, self.max_per_user)
+            )
+
+    def query(
+        self,
+        user_id: str,
+        limit: int = 50,
+        cursor: Optional[str] = None,
+        pair: Optional[str] = None,
+        strategy: Optional[str] = None,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> HistoryPage:
+        clauses = ["user_id = ?"]
+        params: list = [user_id]
+        if cursor:
+            clauses.append("seq < ?")
+            params.append(_cursor_seq(cursor))
+        if pair is not None:
+            clauses.append("pair = ?")
+            params.append(pair)
+        if strategy is not None:
+            clauses.append("strategy = ?")
+            params.append(strategy)
+        if start is not None:
+            clauses.append("created_at >= ?")
+            params.append(start.timestamp())
+        if end is not None:
+            clauses.append("created_at <= ?")
+            params.append(end.timestamp())
+        params.append(limit + 1)
+
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                f"SELECT seq, payload FROM analysis_history WHERE {' AND '.join(clauses)} ORDER BY seq DESC LIMIT ?",
+                params
+            ).fetchall()
+
+        page = rows[:limit]
+        results = [AnalysisResult.model_validate_json(payload) for _, payload in page]
+        next_cursor = str(page[-1][0]) if len(rows) > limit else None
+        return results, next_cursor
+
+
+def create_history_store() -> HistoryStore:
+    if settings.HISTORY_BACKEND == "sqlite":
+        pool = SQLiteConnectionPool(settings.HISTORY_DB_PATH, settings.SQLITE_POOL_SIZE)
+        return SQLiteHistoryStore(pool, settings.HISTORY_MAX_PER_USER)
+    return InMemoryHistoryStore(settings.HISTORY_MAX_PER_USER)
+
+
+history_store = create_history_store()
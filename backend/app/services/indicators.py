@@ -0,0 +1,297 @@
+import math
+from collections import deque
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..core.metrics import metrics
+from .candle_store import CandleStore
+
+
+RSI_PERIOD = 14
+MACD_FAST = 12
+MACD_SLOW = 26
+MACD_SIGNAL = 9
+BOLLINGER_PERIOD = 20
+BOLLINGER_STDDEV = 2.0
+ATR_PERIOD = 14
+EMA_PERIODS = (20, 50)
+
+# Closed candles needed before every running value is seeded; until then the
+# state is rebuilt from the arrays, since ``update`` can't seed a NaN value.
+WARMUP_BARS = max(max(EMA_PERIODS), MACD_SLOW + MACD_SIGNAL - 1, RSI_PERIOD + 1, ATR_PERIOD, BOLLINGER_PERIOD)
+
+# Smallest decay^k factor allowed inside one closed-form EMA block. Keeps the
+# 1 / decay^k rescaling well inside float64 range for short periods.
+_MIN_BLOCK_DECAY = 1e-12
+_MAX_BLOCK = 2048
+
+
+def _smooth(values: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    Exponential smoothing ``y[t] = (1 - alpha) * y[t-1] + alpha * x[t]`` from ``seed``.
+
+    Evaluated in closed form over fixed-size blocks so the recursion runs as
+    array operations instead of a Python loop per element.
+    """
+
+    n = len(values)
+    out = np.empty(n, dtype=np.float64)
+    decay = 1.0 - alpha
+    if decay <= 0.0:
+        out[:] = values
+        return out
+
+    block = int(min(_MAX_BLOCK, max(1, math.log(_MIN_BLOCK_DECAY) / math.log(decay))))
+    powers = decay ** np.arange(block + 1)
+    prev = seed
+    for start in range(0, n, block):
+        chunk = values[start:start + block]
+        m = len(chunk)
+        p = powers[:m]
+        out[start:start + m] = powers[1:m + 1] * prev + alpha * p * np.cumsum(chunk / p)
+        prev = out[start + m - 1]
+    return out
+
+
+def sma(values: np.ndarray, period: int) -> np.ndarray:
+    """Simple moving average; the first ``period - 1`` entries are NaN."""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    csum = np.cumsum(np.insert(values.astype(np.float64), 0, 0.0))
+    out[period - 1:] = (csum[period:] - csum[:-period]) / period
+    return out
+
+
+def ema(values: np.ndarray, period: int) -> np.ndarray:
+    """Exponential moving average seeded with the SMA of the first ``period`` values."""
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seed = float(np.mean(values[:period]))
+    out[period - 1] = seed
+    out[period:] = _smooth(values[period:], 2.0 / (period + 1), seed)
+    return out
+
+
+def _wilder(values: np.ndarray, period: int) -> np.ndarray:
+    out = np.full(len(values), np.nan)
+    if len(values) < period:
+        return out
+    seed = float(np.mean(values[:period]))
+    out[period - 1] = seed
+    out[period:] = _smooth(values[period:], 1.0 / period, seed)
+    return out
+
+
+def rsi(close: np.ndarray, period: int = RSI_PERIOD) -> np.ndarray:
+    """Wilder's RSI; the first ``period`` entries are NaN."""
+    out = np.full(len(close), np.nan)
+    if len(close) <= period:
+        return out
+    delta = np.diff(close)
+    avg_gain = _wilder(np.clip(delta, 0.0, None), period)
+    avg_loss = _wilder(np.clip(-delta, 0.0, None), period)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        out[1:] = np.where(avg_loss == 0.0, 100.0, 100.0 - 100.0 / (1.0 + avg_gain / avg_loss))
+    return out
+
+
+def macd(
+    close: np.ndarray,
+    fast: int = MACD_FAST,
+    slow: int = MACD_SLOW,
+    signal: int = MACD_SIGNAL
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return the MACD line, its signal line and the histogram."""
+    line = ema(close, fast) - ema(close, slow)
+    signal_line = np.full(len(close), np.nan)
+    valid = slow - 1
+    if len(close) > valid:
+        signal_line[valid:] = ema(line[valid:], signal)
+    return line, signal_line, line - signal_line
+
+
+def bollinger_bands(
+    close: np.ndarray,
+    period: int = BOLLINGER_PERIOD,
+    num_std: float = BOLLINGER_STDDEV
+) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Return upper, middle and lower bands using the population standard deviation."""
+    middle = sma(close, period)
+    std = np.full(len(close), np.nan)
+    if len(close) >= period:
+        # Rolling variance from cumulative sums of the de-meaned series keeps
+        # this O(n) without catastrophic cancellation on large prices.
+        centered = close - close.mean()
+        mean = sma(centered, period)[period - 1:]
+        sq = sma(centered * centered, period)[period - 1:]
+        std[period - 1:] = np.sqrt(np.clip(sq - mean * mean, 0.0, None))
+    return middle + num_std * std, middle, middle - num_std * std
+
+
+def true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    prev_close = np.empty(len(close))
+    if len(close):
+        prev_close[0] = close[0]
+        prev_close[1:] = close[:-1]
+    return np.maximum(high, prev_close) - np.minimum(low, prev_close)
+
+
+def atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, period: int = ATR_PERIOD) -> np.ndarray:
+    """Average true range with Wilder smoothing."""
+    return _wilder(true_range(high, low, close), period)
+
+
+def _round(value: Optional[float], decimals: int = 5) -> Optional[float]:
+    if value is None or not math.isfinite(value):
+        return None
+    return round(value, decimals)
+
+
+class IndicatorState:
+    """
+    Running indicator values for one candle series.
+
+    Built once from whole arrays with the vectorized functions above, then
+    advanced in O(1) per closed candle with ``update``.
+    """
+
+    def __init__(self):
+        self.count = 0
+        self.prev_close: Optional[float] = None
+        self.ema: Dict[int, float] = {}
+        self.macd_fast: float = math.nan
+        self.macd_slow: float = math.nan
+        self.macd_signal: float = math.nan
+        self.avg_gain: float = math.nan
+        self.avg_loss: float = math.nan
+        self.atr: float = math.nan
+        self.window: deque = deque(maxlen=BOLLINGER_PERIOD)
+
+    @classmethod
+    def from_arrays(cls, high: np.ndarray, low: np.ndarray, close: np.ndarray) -> "IndicatorState":
+        state = cls()
+        n = len(close)
+        if n == 0:
+            return state
+        state.count = n
+        state.prev_close = float(close[-1])
+        for period in EMA_PERIODS:
+            state.ema[period] = float(ema(close, period)[-1])
+        state.macd_fast = float(ema(close, MACD_FAST)[-1])
+        state.macd_slow = float(ema(close, MACD_SLOW)[-1])
+        _, signal_line, _ = macd(close)
+        state.macd_signal = float(signal_line[-1])
+        if n > RSI_PERIOD:
+            delta = np.diff(close)
+            state.avg_gain = float(_wilder(np.clip(delta, 0.0, None), RSI_PERIOD)[-1])
+            state.avg_loss = float(_wilder(np.clip(-delta, 0.0, None), RSI_PERIOD)[-1])
+        state.atr = float(atr(high, low, close)[-1])
+        state.window.extend(close[-BOLLINGER_PERIOD:].tolist())
+        return state
+
+    @classmethod
+    def from_store(cls, store: CandleStore) -> "IndicatorState":
+        return cls.from_arrays(store.high, store.low, store.close)
+
+    @staticmethod
+    def _step(prev: float, value: float, alpha: float) -> float:
+        return prev + alpha * (value - prev)
+
+    def update(self, high: float, low: float, close: float) -> None:
+        """Fold one newly closed candle into the running state."""
+        if self.prev_close is None:
+            self.prev_close = close
+            self.count = 1
+            self.window.append(close)
+            return
+
+        for period in self.ema:
+            self.ema[period] = self._step(self.ema[period], close, 2.0 / (period + 1))
+        self.macd_fast = self._step(self.macd_fast, close, 2.0 / (MACD_FAST + 1))
+        self.macd_slow = self._step(self.macd_slow, close, 2.0 / (MACD_SLOW + 1))
+        self.macd_signal = self._step(self.macd_signal, self.macd_fast - self.macd_slow, 2.0 / (MACD_SIGNAL + 1))
+
+        delta = close - self.prev_close
+        self.avg_gain = self._step(self.avg_gain, max(delta, 0.0), 1.0 / RSI_PERIOD)
+        self.avg_loss = self._step(self.avg_loss, max(-delta, 0.0), 1.0 / RSI_PERIOD)
+
+        tr = max(high, self.prev_close) - min(low, self.prev_close)
+        self.atr = self._step(self.atr, tr, 1.0 / ATR_PERIOD)
+
+        self.window.append(close)
+
+        self.prev_close = close
+        self.count += 1
+
+    @property
+    def rsi(self) -> float:
+        if math.isnan(self.avg_loss):
+            return math.nan
+        if self.avg_loss == 0.0:
+            return 100.0
+        return 100.0 - 100.0 / (1.0 + self.avg_gain / self.avg_loss)
+
+    @property
+    def macd_histogram(self) -> float:
+        return self.macd_fast - self.macd_slow - self.macd_signal
+
+    def bollinger(self) -> Tuple[float, float]:
+        """Middle band and population standard deviation of the last ``BOLLINGER_PERIOD`` closes."""
+        if len(self.window) < BOLLINGER_PERIOD:
+            return math.nan, math.nan
+        middle = math.fsum(self.window) / BOLLINGER_PERIOD
+        return middle, math.sqrt(math.fsum((x - middle) ** 2 for x in self.window) / BOLLINGER_PERIOD)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Latest indicator values in the ``indicators`` response shape."""
+        macd_line = self.macd_fast - self.macd_slow
+        middle, std = self.bollinger()
+        return {
+            "rsi": _round(self.rsi, 2),
+            "macd": {
+                "macd": _round(macd_line),
+                "signal": _round(self.macd_signal),
+                "histogram": _round(macd_line - self.macd_signal)
+            },
+            "bollinger_bands": {
+                "upper": _round(middle + BOLLINGER_STDDEV * std),
+                "middle": _round(middle),
+                "lower": _round(middle - BOLLINGER_STDDEV * std)
+            },
+            "ema": {str(period): _round(value) for period, value in self.ema.items()},
+            "sma": {str(BOLLINGER_PERIOD): _round(middle)},
+            "atr": _round(self.atr)
+        }
+
+
+_states: Dict[Tuple[str, str], IndicatorState] = {}
+
+
+def get_indicator_state(store: CandleStore) -> IndicatorState:
+    """
+    Return the indicator state for ``store``, advanced to its latest candle.
+
+    The first call computes everything over the full arrays; later calls only
+    fold in the candles appended since, one O(1) update each. A state built
+    from fewer than ``WARMUP_BARS`` candles is rebuilt whenever the series
+    grows, so slow timeframes pick up each indicator once it has enough bars.
+    """
+
+    key = (store.pair, store.timeframe)
+    state = _states.get(key)
+    n = len(store)
+    if state is None or state.count > n or (state.count < WARMUP_BARS and state.count < n):
+        with metrics.span("indicators.full"):
+            state = IndicatorState.from_store(store)
+        _states[key] = state
+        return state
+
+    if state.count < n:
+        with metrics.span("indicators.incremental"):
+            high, low, close = store.high, store.low, store.close
+            for i in range(state.count, n):
+                state.update(float(high[i]), float(low[i]), float(close[i]))
+    return state
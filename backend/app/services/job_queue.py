@@ -0,0 +1,272 @@
+import asyncio
+import itertools
+import json
+import logging
+import threading
+import uuid
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+
+from pydantic import BaseModel
+
+from ..core.config import settings
+from ..core.database import SQLiteConnectionPool
+from ..schemas.billing import PlanType
+from ..schemas.trading import AnalysisJob, JobStatus
+from .market_stream import market_stream
+
+
+logger = logging.getLogger(__name__)
+
+
+# Lower runs first; within a tier jobs run in submission order.
+PLAN_PRIORITY: Dict[PlanType, int] = {
+    PlanType.ENTERPRISE: 0,
+    PlanType.PRO: 1,
+    PlanType.BASIC: 2,
+    PlanType.FREE: 3,
+}
+
+JobHandler = Callable[[str, Dict[str, Any]], Awaitable[BaseModel]]
+
+
+class JobStore(ABC):
+    """
+    Persistent record of background jobs.
+
+    Jobs are plain dicts with ``id``, ``user_id``, ``kind``, ``priority``,
+    ``status``, ``payload`` (the request body, dropped once the job has
+    finished), ``result``, ``error`` and ``created_at``/``updated_at``.
+    """
+
+    @abstractmethod
+    def save(self, job: Dict[str, Any]) -> None:
+        """Insert or replace ``job``, keyed by its id."""
+
+    @abstractmethod
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """The job with ``job_id``, or None."""
+
+    @abstractmethod
+    def unfinished(self) -> List[Dict[str, Any]]:
+        """Queued and running jobs in priority then submission order, for recovery after a restart."""
+
+
+class InMemoryJobStore(JobStore):
+    """Jobs in process memory; the oldest are evicted beyond ``max_jobs``."""
+
+    def __init__(self, max_jobs: int):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def save(self, job: Dict[str, Any]) -> None:
+        with self._lock:
+            self._jobs[job["id"]] = job
+            while len(self._jobs) > self.max_jobs:
+                self._jobs.popitem(last=False)
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self._jobs.get(job_id)
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        jobs = [job for job in self._jobs.values() if job["status"] in (JobStatus.QUEUED, JobStatus.RUNNING)]
+        return sorted(jobs, key=lambda job: (job["priority"], job["created_at"]))
+
+
+class SQLiteJobStore(JobStore):
+    """Jobs persisted in SQLite so queued and running work survives a restart."""
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self._pool = pool
+        with self._pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS jobs (
+                    id TEXT PRIMARY KEY,
+                    user_id TEXT NOT NULL,
+                    kind TEXT NOT NULL,
+                    priority INTEGER NOT NULL,
+                    status TEXT NOT NULL,
+                    payload TEXT NOT NULL,
+                    result TEXT,
+                    error TEXT,
+                    created_at REAL NOT NULL,
+                    updated_at REAL NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS ix_jobs_status ON jobs (status, priority, created_at);
+            """)
+
+    def save(self, job: Dict[str, Any]) -> None:
+        with self._pool.connection() as conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO jobs VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    job["id"], job["user_id"], job["kind"], job["priority"], job["status"].value,
+                    json.dumps(job["payload"]),
+                    json.dumps(job["result"]) if job["result"] is not None else None,
+                    job["error"], job["created_at"].timestamp(), job["updated_at"].timestamp()
+                )
+            )
+
+    @staticmethod
+    def _to_job(row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        job = dict(row)
+        job["status"] = JobStatus(job["status"])
+        job["payload"] = json.loads(job["payload"])
+        job["result"] = json.loads(job["result"]) if job["result"] is not None else None
+        job["created_at"] = datetime.fromtimestamp(job["created_at"])
+        job["updated_at"] = datetime.fromtimestamp(job["updated_at"])
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            return self._to_job(conn.execute("SELECT * FROM jobs WHERE id = ?", (job_id,)).fetchone())
+
+    def unfinished(self) -> List[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            rows = conn.execute(
+                "SELECT * FROM jobs WHERE status IN (?, ?) ORDER BY priority, created_at",
+                (JobStatus.QUEUED.value, JobStatus.RUNNING.value)
+            ).fetchall()
+        return [self._to_job(row) for row in rows]
+
+
+def to_analysis_job(job: Dict[str, Any]) -> AnalysisJob:
+    return AnalysisJob(
+        id=job["id"],
+        kind=job["kind"],
+        status=job["status"],
+        result=job["result"],
+        error=job["error"],
+        created_at=job["created_at"],
+        updated_at=job["updated_at"]
+    )
+
+
+class JobQueue:
+    """
+    Priority queue of background jobs drained by a fixed pool of worker tasks.
+
+    Handlers are registered per job kind and receive ``(user_id, payload)``.
+    Every state change is written to the ``JobStore``; on ``start`` unfinished
+    jobs from a previous process are queued again. When a job finishes, a
+    ``{"type": "job", ...}`` message is pushed to the owner's stream clients.
+    """
+
+    def __init__(self, store: JobStore, workers: int):
+        self.store = store
+        self.workers = workers
+        self._handlers: Dict[str, JobHandler] = {}
+        self._queue: Optional[asyncio.PriorityQueue] = None
+        self._tasks: List[asyncio.Task] = []
+        self._seq = itertools.count()
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    @property
+    def started(self) -> bool:
+        return self._queue is not None
+
+    def start(self) -> None:
+        """Start the workers and re-queue jobs left unfinished by a previous run."""
+        if self.started:
+            return
+        self._queue = asyncio.PriorityQueue()
+        for job in self.store.unfinished():
+            self._queue.put_nowait((job["priority"], next(self._seq), job["id"]))
+        self._tasks = [asyncio.create_task(self._work()) for _ in range(self.workers)]
+
+    async def stop(self) -> None:
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks = []
+        self._queue = None
+
+    def submit(self, user_id: str, kind: str, payload: Dict[str, Any], plan: PlanType) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind {kind}")
+        self.start()
+
+        now = datetime.now()
+        job = {
+            "id": f"job_{uuid.uuid4().hex}",
+            "user_id": user_id,
+            "kind": kind,
+            "priority": PLAN_PRIORITY[plan],
+            "status": JobStatus.QUEUED,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now
+        }
+        self.store.save(job)
+        self._queue.put_nowait((job["priority"], next(self._seq), job["id"]))
+        return job
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return self.store.get(job_id)
+
+    def _update(self, job: Dict[str, Any], status: JobStatus, **fields: Any) -> None:
+        if status in (JobStatus.COMPLETED, JobStatus.FAILED):
+            # Request bodies can carry megabytes of images; finished jobs
+            # only need their result.
+            fields["payload"] = {}
+        job.update(fields, status=status, updated_at=datetime.now())
+        self.store.save(job)
+
+    async def _work(self) -> None:
+        while True:
+            _, _, job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                # Store or notification errors must not take the worker down with them.
+                logger.exception("Job %s failed outside its handler", job_id)
+                self._fail(job_id)
+
+    def _fail(self, job_id: str) -> None:
+        """Mark ``job_id`` failed after an internal error, unless it already finished."""
+        try:
+            job = self.store.get(job_id)
+            if job is not None and job["status"] not in (JobStatus.COMPLETED, JobStatus.FAILED):
+                self._update(job, JobStatus.FAILED, error="Internal error")
+        except Exception:
+            logger.exception("Could not mark job %s failed", job_id)
+
+    async def _run(self, job_id: str) -> None:
+        job = self.store.get(job_id)
+        if job is None or job["status"] in (JobStatus.COMPLETED, JobStatus.FAILED):
+            return
+
+        self._update(job, JobStatus.RUNNING)
+        try:
+            result = await self._handlers[job["kind"]](job["user_id"], job["payload"])
+        except asyncio.CancelledError:
+            raise
+        except Exception as exc:
+            self._update(job, JobStatus.FAILED, error=str(exc))
+        else:
+            self._update(job, JobStatus.COMPLETED, result=result.model_dump(mode="json"))
+
+        market_stream.publish_user(job["user_id"], {
+            "type": "job",
+            "job": to_analysis_job(job).model_dump(mode="json")
+        })
+
+
+def create_job_store() -> JobStore:
+    if settings.JOB_BACKEND == "sqlite":
+        return SQLiteJobStore(SQLiteConnectionPool(settings.JOB_DB_PATH, settings.SQLITE_POOL_SIZE))
+    return InMemoryJobStore(settings.JOB_MAX_STORED)
+
+
+job_queue = JobQueue(create_job_store(), settings.JOB_WORKERS)
@@ -1,123 +1,155 @@
-import random
+import time
 from datetime import datetime, timedelta
-from typing import List, Dict, Any
-from ..schemas.trading import Signal, TradingPair
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+from pydantic import TypeAdapter
+from ..core.config import settings
+from ..core.responses import EncodedPayloadCache, dumps
+from ..schemas.trading import TradingPair
+from .resampler import BASE_TIMEFRAME, get_pair_series, seconds_until_change
+from .indicators import get_indicator_state
+
+
+TRADING_PAIRS = [
+    {"symbol": "EUR/USD", "name": "Euro / US Dollar", "base_price": 1.0850},
+    {"symbol": "GBP/USD", "name": "British Pound / US Dollar", "base_price": 1.2650},
+    {"symbol": "USD/JPY", "name": "US Dollar / Japanese Yen", "base_price": 149.50},
+    {"symbol": "USD/CHF", "name": "US Dollar / Swiss Franc", "base_price": 0.8850},
+    {"symbol": "AUD/USD", "name": "Australian Dollar / US Dollar", "base_price": 0.6520},
+    {"symbol": "USD/CAD", "name": "US Dollar / Canadian Dollar", "base_price": 1.3620},
+    {"symbol": "NZD/USD", "name": "New Zealand Dollar / US Dollar", "base_price": 0.5980},
+    {"symbol": "EUR/GBP", "name": "Euro / British Pound", "base_price": 0.8580},
+    {"symbol": "EUR/JPY", "name": "Euro / Japanese Yen", "base_price": 162.25},
+    {"symbol": "GBP/JPY", "name": "British Pound / Japanese Yen", "base_price": 189.15},
+]
+
+BASE_PRICES = {p["symbol"]: p["base_price"] for p in TRADING_PAIRS}
+
+BARS_PER_DAY = 24 * 60
+
+# Newest tick per pair from the tick pipeline: pair -> (pair, bid, ask, timestamp).
+last_prices: Dict[str, Tuple[str, float, float, float]] = {}
+
+_trading_pairs_adapter = TypeAdapter(List[TradingPair])
+_payloads = EncodedPayloadCache(settings.ENCODED_PAYLOAD_CACHE_MAX_BYTES)
+
+# Mock articles are published relative to startup so their content (and ETag) stays stable.
+_NEWS_ANCHOR = datetime.now()
 
 
 def get_mock_trading_pairs() -> List[TradingPair]:
     """
     Returns mock trading pairs with current prices.
     
+    Current price is the bid/ask mid of the pair's newest tick when the tick
+    pipeline is running, otherwise the last closed 1m bar of its candle
+    series; ``change_24h`` is measured against the close a day of bars ago.
+    Live price updates are pushed over the ``/market/stream`` WebSocket.
+    
     TODO: Integrate with real forex data provider (e.g., Alpha Vantage, OANDA)
-    TODO: Implement WebSocket for real-time price updates
     """
     
-    pairs = [
-        {"symbol": "EUR/USD", "name": "Euro / US Dollar", "base_price": 1.0850},
-        {"symbol": "GBP/USD", "name": "British Pound / US Dollar", "base_price": 1.2650},
-        {"symbol": "USD/JPY", "name": "US Dollar / Japanese Yen", "base_price": 149.50},
-        {"symbol": "USD/CHF", "name": "US Dollar / Swiss Franc", "base_price": 0.8850},
-        {"symbol": "AUD/USD", "name": "Australian Dollar / US Dollar", "base_price": 0.6520},
-        {"symbol": "USD/CAD", "name": "US Dollar / Canadian Dollar", "base_price": 1.3620},
-        {"symbol": "NZD/USD", "name": "New Zealand Dollar / US Dollar", "base_price": 0.5980},
-        {"symbol": "EUR/GBP", "name": "Euro / British Pound", "base_price": 0.8580},
-        {"symbol": "EUR/JPY", "name": "Euro / Japanese Yen", "base_price": 162.25},
-        {"symbol": "GBP/JPY", "name": "British Pound / Japanese Yen", "base_price": 189.15},
-    ]
-    
-    return [
-        TradingPair(
+    pairs = []
+    for p in TRADING_PAIRS:
+        close = get_pair_series(p["symbol"], p["base_price"]).base.close
+        tick = last_prices.get(p["symbol"])
+        last = (tick[1] + tick[2]) / 2 if tick is not None else float(close[-1])
+        day_ago = float(close[-min(len(close), BARS_PER_DAY + 1)])
+        pairs.append(TradingPair(
             symbol=p["symbol"],
             name=p["name"],
-            current_price=round(p["base_price"] + random.uniform(-0.01, 0.01), 4),
-            change_24h=round(random.uniform(-2.5, 2.5), 2)
-        )
-        for p in pairs
-    ]
+            current_price=round(last, 4),
+            change_24h=round((last - day_ago) / day_ago * 100, 2)
+        ))
+    return pairs
 
 
-def get_mock_market_data(pair: str, timeframe: str = "1h") -> Dict[str, Any]:
+def trading_pairs_version() -> Tuple[Tuple[Optional[int], ...], int]:
+    """
+    Content version of the pairs list and the seconds until it next changes.
+    
+    Tick prices move continuously, so while ticks are flowing the version
+    also carries the current second: the list is re-encoded at most once a
+    second however fast ticks arrive.
+    """
+    
+    version = tuple(get_pair_series(p["symbol"], p["base_price"]).version for p in TRADING_PAIRS)
+    if last_prices:
+        return version + (int(time.time()),), 1
+    return version, seconds_until_change(BASE_TIMEFRAME)
+
+
+def get_trading_pairs_payload() -> bytes:
+    """``get_mock_trading_pairs`` as JSON bytes, re-encoded only when a pair's series advances."""
+    
+    version, _ = trading_pairs_version()
+    return _payloads.get("pairs", version, lambda: _trading_pairs_adapter.dump_json(get_mock_trading_pairs()))
+
+
+def get_mock_market_data(
+    pair: str,
+    timeframe: str = "1h",
+    limit: int = 100,
+    include_forming: bool = True
+) -> Dict[str, Any]:
     """
     Returns mock market data for a trading pair.
     
+    Candles are sliced from the pair's columnar candle series (higher
+    timeframes are resampled from 1m base bars) and returned as column lists
+    with epoch-second timestamps rather than per-candle objects. ``forming``
+    is the still-open bar (None when ``include_forming`` is false); indicators
+    cover closed bars only.
+    
     TODO: Fetch real OHLCV data from forex provider
-    TODO: Calculate real technical indicators (RSI, MACD, Bollinger Bands)
     TODO: Add volume and liquidity data
     """
     
-    base_price = 1.0850 if "EUR" in pair else random.uniform(0.5, 150)
-    
-    candles = []
-    current_time = datetime.now()
-    
-    for i in range(100):
-        timestamp = current_time - timedelta(hours=100-i)
-        open_price = base_price + random.uniform(-0.02, 0.02)
-        close_price = open_price + random.uniform(-0.01, 0.01)
-        high_price = max(open_price, close_price) + random.uniform(0, 0.005)
-        low_price = min(open_price, close_price) - random.uniform(0, 0.005)
-        
-        candles.append({
-            "timestamp": timestamp.isoformat(),
-            "open": round(open_price, 5),
-            "high": round(high_price, 5),
-            "low": round(low_price, 5),
-            "close": round(close_price, 5),
-            "volume": random.randint(100000, 1000000)
-        })
+    series = get_pair_series(pair, BASE_PRICES[pair])
+    store = series.get(timeframe)
     
     return {
         "pair": pair,
         "timeframe": timeframe,
-        "candles": candles,
-        "indicators": {
-            "rsi": round(random.uniform(30, 70), 2),
-            "macd": {
-                "macd": round(random.uniform(-0.001, 0.001), 5),
-                "signal": round(random.uniform(-0.001, 0.001), 5),
-                "histogram": round(random.uniform(-0.0005, 0.0005), 5)
-            },
-            "bollinger_bands": {
-                "upper": round(base_price + 0.02, 5),
-                "middle": round(base_price, 5),
-                "lower": round(base_price - 0.02, 5)
-            }
-        }
+        "candles": store.to_columns(limit),
+        "forming": series.forming(timeframe) if include_forming else None,
+        "indicators": get_indicator_state(store).snapshot()
     }
 
 
-def get_mock_live_signals() -> List[Signal]:
+def market_data_version(pair: str, timeframe: str, include_forming: bool = True) -> Tuple[Optional[int], int]:
     """
-    Returns mock live trading signals.
+    Content version of a market data response and the seconds until it next changes.
     
-    TODO: Generate signals from real-time analysis
-    TODO: Implement signal filtering based on user preferences
-    TODO: Add signal performance tracking
+    The forming bar moves with every base bar, so responses that include it
+    change each minute; closed candles and indicators only change when a
+    ``timeframe`` bar closes.
     """
     
-    pairs = ["EUR/USD", "GBP/USD", "USD/JPY", "AUD/USD", "EUR/GBP"]
-    directions = ["BUY", "SELL"]
-    statuses = ["active", "pending", "closed"]
-    
-    signals = []
-    for i in range(random.randint(3, 8)):
-        pair = random.choice(pairs)
-        direction = random.choice(directions)
-        entry = round(random.uniform(1.0, 1.3), 5)
-        
-        signals.append(Signal(
-            id=f"signal_{i}_{int(datetime.now().timestamp())}",
-            pair=pair,
-            direction=direction,
-            entry_price=entry,
-            stop_loss=round(entry - 0.005 if direction == "BUY" else entry + 0.005, 5),
-            take_profit=round(entry + 0.015 if direction == "BUY" else entry - 0.015, 5),
-            confidence=round(random.uniform(0.7, 0.95), 2),
-            status=random.choice(statuses),
-            created_at=datetime.now() - timedelta(hours=random.randint(1, 48))
-        ))
+    series = get_pair_series(pair, BASE_PRICES[pair])
+    if include_forming and timeframe != BASE_TIMEFRAME:
+        return series.version, seconds_until_change(BASE_TIMEFRAME)
+    return series.get(timeframe).last_timestamp, seconds_until_change(timeframe)
+
+
+def get_market_data_payload(
+    pair: str,
+    timeframe: str = "1h",
+    limit: int = 100,
+    include_forming: bool = True
+) -> bytes:
+    """
+    ``get_mock_market_data`` as JSON bytes.
+    
+    Bodies are cached per request shape and re-encoded only when
+    ``market_data_version`` changes, so repeated polls serve the same bytes.
+    """
     
-    return signals
+    version, _ = market_data_version(pair, timeframe, include_forming)
+    return _payloads.get(
+        ("market_data", pair, timeframe, limit, include_forming),
+        version,
+        lambda: dumps(get_mock_market_data(pair, timeframe, limit, include_forming))
+    )
 
 
 def get_mock_news() -> List[Dict[str, Any]]:
@@ -135,7 +167,7 @@ def get_mock_news() -> List[Dict[str, Any]]:
             "title": "Federal Reserve Signals Potential Rate Cut",
             "summary": "Fed officials hint at possible rate reduction in upcoming meetings, impacting USD strength.",
             "source": "Reuters",
-            "published_at": (datetime.now() - timedelta(hours=2)).isoformat(),
+            "published_at": (_NEWS_ANCHOR - timedelta(hours=2)).isoformat(),
             "impact": "high",
             "related_pairs": ["EUR/USD", "GBP/USD", "USD/JPY"]
         },
@@ -144,7 +176,7 @@ def get_mock_news() -> List[Dict[str, Any]]:
             "title": "ECB Maintains Current Monetary Policy",
             "summary": "European Central Bank keeps interest rates unchanged amid economic uncertainty.",
             "source": "Bloomberg",
-            "published_at": (datetime.now() - timedelta(hours=5)).isoformat(),
+            "published_at": (_NEWS_ANCHOR - timedelta(hours=5)).isoformat(),
             "impact": "medium",
             "related_pairs": ["EUR/USD", "EUR/GBP"]
         },
@@ -153,7 +185,7 @@ def get_mock_news() -> List[Dict[str, Any]]:
             "title": "Strong US Employment Data Boosts Dollar",
             "summary": "Better-than-expected jobs report strengthens USD across major pairs.",
             "source": "Financial Times",
-            "published_at": (datetime.now() - timedelta(hours=8)).isoformat(),
+            "published_at": (_NEWS_ANCHOR - timedelta(hours=8)).isoformat(),
             "impact": "high",
             "related_pairs": ["EUR/USD", "USD/JPY", "GBP/USD"]
         },
@@ -162,10 +194,24 @@ def get_mock_news() -> List[Dict[str, Any]]:
             "title": "UK Inflation Exceeds Expectations",
             "summary": "British inflation rate rises above forecasts, affecting GBP volatility.",
             "source": "The Guardian",
-            "published_at": (datetime.now() - timedelta(hours=12)).isoformat(),
+            "published_at": (_NEWS_ANCHOR - timedelta(hours=12)).isoformat(),
             "impact": "medium",
             "related_pairs": ["GBP/USD", "EUR/GBP"]
         }
     ]
     
     return news_items
+
+
+def news_version() -> Hashable:
+    """
+    Content version of the news feed.
+    
+    TODO: Use the newest article id from the news provider once integrated
+    """
+    
+    return _NEWS_ANCHOR.timestamp()
+
+
+def get_news_payload(limit: int = 10) -> bytes:
+    return _payloads.get(("news", limit), news_version(), lambda: dumps(get_mock_news()[:limit]))
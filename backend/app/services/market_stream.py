@@ -0,0 +1,199 @@
+import asyncio
+import json
+import logging
+import random
+import time
+from collections import deque
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .candle_store import TIMEFRAME_SECONDS
+from .market_service import BASE_PRICES, last_prices
+from .resampler import get_pair_series
+
+
+logger = logging.getLogger(__name__)
+
+class StreamClient:
+    """
+    Outgoing buffer for one WebSocket subscriber.
+
+    Ticks are coalesced to the latest one per pair, so a slow client only ever
+    sees the newest price. Candle events are kept in a bounded deque; when it is
+    full the oldest event is dropped and counted.
+    """
+
+    def __init__(self, max_pending: int, user_id: Optional[str] = None):
+        self.user_id = user_id
+        self.pairs: Set[str] = set()
+        self.timeframes: Set[str] = set(TIMEFRAME_SECONDS)
+        self.dropped = 0
+        self._ticks: Dict[str, str] = {}
+        self._events: deque = deque(maxlen=max_pending)
+        self._ready = asyncio.Event()
+
+    def push_tick(self, pair: str, payload: str) -> None:
+        self._ticks[pair] = payload
+        self._ready.set()
+
+    def push_event(self, payload: str) -> None:
+        if len(self._events) == self._events.maxlen:
+            self.dropped += 1
+        self._events.append(payload)
+        self._ready.set()
+
+    async def drain(self) -> List[str]:
+        """Wait for pending messages and return them, candle events first."""
+        await self._ready.wait()
+        self._ready.clear()
+        messages = list(self._events)
+        messages.extend(self._ticks.values())
+        self._events.clear()
+        self._ticks.clear()
+        return messages
+
+
+class MarketStreamHub:
+    """
+    Single in-process publisher that fans market updates out to all clients.
+
+    One background task produces ticks and candle-close events for every pair
+    that has at least one subscriber; each message is JSON-encoded once and the
+    same string is handed to every interested client.
+
+    Ticks carry the newest price from the tick pipeline when it is running
+    and fall back to a random walk from the last close otherwise.
+
+    TODO: Feed ticks from a real forex price stream instead of a random walk
+    """
+
+    def __init__(self):
+        self._clients: Set[StreamClient] = set()
+        self._prices: Dict[str, float] = {}
+        self._lengths: Dict[str, Dict[str, int]] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def client_count(self) -> int:
+        return len(self._clients)
+
+    def connect(self, user_id: Optional[str] = None) -> StreamClient:
+        client = StreamClient(settings.STREAM_CLIENT_BUFFER, user_id)
+        self._clients.add(client)
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+            self._task.add_done_callback(self._on_exit)
+        return client
+
+    @staticmethod
+    def _on_exit(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Market stream publisher stopped", exc_info=task.exception())
+
+    def disconnect(self, client: StreamClient) -> None:
+        self._clients.discard(client)
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def _subscribed_pairs(self) -> Set[str]:
+        pairs: Set[str] = set()
+        for client in self._clients:
+            pairs |= client.pairs
+        return pairs
+
+    def publish_user(self, user_id: str, message: Dict[str, Any]) -> None:
+        """Queue ``message`` for every client authenticated as ``user_id``."""
+        payload = None
+        for client in self._clients:
+            if client.user_id == user_id:
+                if payload is None:
+                    with metrics.span("serialize.stream"):
+                        payload = json.dumps(message)
+                client.push_event(payload)
+
+    def _publish_tick(self, pair: str, message: Dict[str, Any]) -> None:
+        with metrics.span("serialize.stream"):
+            payload = json.dumps(message)
+        for client in self._clients:
+            if pair in client.pairs:
+                client.push_tick(pair, payload)
+
+    def _publish_candle(self, pair: str, timeframe: str, message: Dict[str, Any]) -> None:
+        with metrics.span("serialize.stream"):
+            payload = json.dumps(message)
+        for client in self._clients:
+            if pair in client.pairs and timeframe in client.timeframes:
+                client.push_event(payload)
+
+    def _next_tick(self, pair: str, last_close: float) -> Dict[str, Any]:
+        tick = last_prices.get(pair)
+        if tick is not None:
+            _, bid, ask, timestamp = tick
+            return {
+                "type": "tick",
+                "pair": pair,
+                "bid": round(bid, 5),
+                "ask": round(ask, 5),
+                "price": round((bid + ask) / 2, 5),
+                "timestamp": timestamp
+            }
+        price = self._prices.get(pair, last_close)
+        price += random.gauss(0.0, price * 0.0001)
+        self._prices[pair] = price
+        spread = price * 0.00005
+        return {
+            "type": "tick",
+            "pair": pair,
+            "bid": round(price - spread, 5),
+            "ask": round(price + spread, 5),
+            "price": round(price, 5),
+            "timestamp": time.time()
+        }
+
+    def _closed_candles(self, pair: str) -> Iterable[Dict[str, Any]]:
+        """Candles that closed for ``pair`` since the previous publisher pass."""
+        series = get_pair_series(pair, BASE_PRICES[pair])
+        lengths = {timeframe: len(series.get(timeframe)) for timeframe in TIMEFRAME_SECONDS}
+        previous = self._lengths.get(pair, lengths)
+        self._lengths[pair] = lengths
+        for timeframe, length in lengths.items():
+            count = length - previous[timeframe]
+            if count <= 0:
+                continue
+            columns = series.get(timeframe).to_columns(count)
+            for i in range(count):
+                yield {
+                    "type": "candle",
+                    "pair": pair,
+                    "timeframe": timeframe,
+                    "candle": {field: values[i] for field, values in columns.items()}
+                }
+
+    def _publish_pass(self) -> None:
+        pairs = self._subscribed_pairs()
+        self._lengths = {pair: lengths for pair, lengths in self._lengths.items() if pair in pairs}
+        for pair in pairs:
+            for message in self._closed_candles(pair):
+                self._publish_candle(pair, message["timeframe"], message)
+            series = get_pair_series(pair, BASE_PRICES[pair])
+            self._publish_tick(pair, self._next_tick(pair, float(series.base.close[-1])))
+
+    async def _run(self) -> None:
+        while self._clients:
+            try:
+                self._publish_pass()
+            except Exception:
+                # Keep running: one bad pass must not silence every client for good.
+                logger.exception("Market stream publish failed")
+            await asyncio.sleep(settings.STREAM_TICK_INTERVAL)
+
+
+market_stream = MarketStreamHub()
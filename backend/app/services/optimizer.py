@@ -0,0 +1,295 @@
+import itertools
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing.shared_memory import SharedMemory
+from typing import Any, Dict, Hashable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..schemas.trading import StrategyEnum
+from .backtest import BacktestParams, BacktestStats, backtest_arrays, load_candles
+from .signal_engine import STRATEGIES
+
+
+# Candidate values per BacktestParams field; combinations with fast >= slow are
+# skipped, and EMA lengths a strategy never reads are not swept for it.
+DEFAULT_SPACE: Dict[str, Sequence[Any]] = {
+    "fast_ema": (5, 10, 20, 30),
+    "slow_ema": (50, 100, 200),
+    "stop_atr": (1.0, 1.5, 2.0, 2.5, 3.0),
+    "reward": (1.0, 1.5, 2.0, 3.0),
+}
+
+# Metrics where lower is better; everything else ranks highest first.
+_ASCENDING = {"max_drawdown"}
+
+
+class CandleHandle(NamedTuple):
+    """Picklable reference to candle columns held in shared memory."""
+    name: str
+    count: int
+
+
+class SharedCandles:
+    """
+    Timestamp, high, low and close columns of one series in a SharedMemory block.
+
+    Workers attach to the block by name, so each task pickles only a
+    ``CandleHandle`` and the arrays are mapped, never copied, per process.
+    The creator must ``close()`` it to free the block.
+    """
+
+    def __init__(self, timestamps: np.ndarray, high: np.ndarray, low: np.ndarray, close: np.ndarray):
+        count = len(timestamps)
+        self._shm = SharedMemory(create=True, size=max(1, 4 * count * 8))
+        self.handle = CandleHandle(self._shm.name, count)
+        columns = _columns(self._shm, count)
+        for target, source in zip(columns, (timestamps, high, low, close)):
+            target[:] = source
+
+    def close(self) -> None:
+        self._shm.close()
+        self._shm.unlink()
+
+
+def _columns(shm: SharedMemory, count: int) -> Tuple[np.ndarray, ...]:
+    timestamps = np.ndarray((count,), dtype=np.int64, buffer=shm.buf)
+    prices = np.ndarray((3, count), dtype=np.float64, buffer=shm.buf, offset=count * 8)
+    return timestamps, prices[0], prices[1], prices[2]
+
+
+# Blocks attached by this worker process, kept open for the life of the pool.
+_attached: Dict[str, Tuple[SharedMemory, Tuple[np.ndarray, ...]]] = {}
+
+
+def attach(handle: CandleHandle) -> Tuple[np.ndarray, ...]:
+    entry = _attached.get(handle.name)
+    if entry is None:
+        shm = SharedMemory(name=handle.name)
+        entry = (shm, _columns(shm, handle.count))
+        _attached[handle.name] = entry
+    return entry[1]
+
+
+class SweepTask(NamedTuple):
+    handle: CandleHandle
+    pair: str
+    strategy: StrategyEnum
+    start: int
+    end: int
+    params: Tuple[BacktestParams, ...]
+    fold: Optional[int] = None
+
+
+class SweepResult(NamedTuple):
+    pair: str
+    strategy: StrategyEnum
+    params: BacktestParams
+    stats: BacktestStats
+    fold: Optional[int] = None
+
+
+class WalkForwardResult(NamedTuple):
+    pair: str
+    strategy: StrategyEnum
+    fold: int
+    params: BacktestParams
+    in_sample: BacktestStats
+    out_of_sample: BacktestStats
+
+
+def grid(space: Dict[str, Sequence[Any]] = DEFAULT_SPACE) -> List[BacktestParams]:
+    """Every valid combination of ``space``."""
+    fields = list(space)
+    combos = (BacktestParams(**dict(zip(fields, values))) for values in itertools.product(*space.values()))
+    return [params for params in combos if params.fast_ema < params.slow_ema]
+
+
+def random_search(samples: int, space: Dict[str, Sequence[Any]] = DEFAULT_SPACE, seed: Optional[int] = None) -> List[BacktestParams]:
+    """Up to ``samples`` distinct valid combinations of ``space``, drawn uniformly."""
+    combos = grid(space)
+    return random.Random(seed).sample(combos, min(samples, len(combos)))
+
+
+def strategy_combos(strategy: StrategyEnum, combos: Sequence[BacktestParams]) -> List[BacktestParams]:
+    """
+    ``combos`` as ``strategy`` sees them: EMA lengths its rules never read are
+    reset to their defaults and the resulting duplicates dropped, so a
+    strategy is not backtested again for parameters that cannot change it.
+    """
+
+    unused = {
+        f"{name}_ema": BacktestParams._field_defaults[f"{name}_ema"]
+        for name in ("fast", "slow")
+        if name not in STRATEGIES[strategy].emas
+    }
+    if not unused:
+        return list(combos)
+    return list(dict.fromkeys(params._replace(**unused) for params in combos))
+
+
+def walk_forward_windows(count: int, folds: int, train_fraction: float = 0.75) -> List[Tuple[int, int, int]]:
+    """
+    ``(train_start, train_end, test_end)`` bar ranges for rolling walk-forward.
+
+    The in-sample window covers ``train_fraction`` of the bars and rolls
+    forward by one out-of-sample window per fold, so the test windows tile
+    the end of the series without overlapping. Raises ``ValueError`` if
+    there are no folds or too few bars for a one-bar test window per fold.
+    """
+
+    if folds < 1:
+        raise ValueError("folds must be at least 1")
+    if not 0 < train_fraction < 1:
+        raise ValueError("train_fraction must be in (0, 1)")
+    test = int(count * (1 - train_fraction) / folds)
+    if test < 1:
+        raise ValueError(f"{count} bars leave an empty test window for {folds} folds")
+    train = count - folds * test
+    return [(k * test, k * test + train, k * test + train + test) for k in range(folds)]
+
+
+def score(stats: BacktestStats, metric: str) -> float:
+    """Sort key for ``metric`` where higher always ranks first."""
+    value = getattr(stats, metric)
+    return -value if metric in _ASCENDING else value
+
+
+def _evaluate(task: SweepTask) -> List[SweepResult]:
+    """
+    Worker entry point: run every parameter set of ``task`` over its bar range.
+
+    Indicators see the whole series, so a window that starts mid-series is
+    scored on warmed-up signals rather than on its own warm-up bars.
+    """
+
+    timestamps, high, low, close = attach(task.handle)
+    window = slice(task.start, task.end)
+    cache: Dict[Hashable, Any] = {}
+    results = []
+    for params in task.params:
+        _, stats = backtest_arrays(timestamps, high, low, close, task.strategy, params, cache=cache, window=window)
+        results.append(SweepResult(task.pair, task.strategy, params, stats, task.fold))
+    return results
+
+
+def _chunks(items: Sequence[BacktestParams], size: int) -> Iterable[Tuple[BacktestParams, ...]]:
+    for start in range(0, len(items), size):
+        yield tuple(items[start:start + size])
+
+
+class SweepRunner:
+    """
+    Parameter sweeps and walk-forward optimization over a process pool.
+
+    Each pair's candles are loaded once into shared memory. Work is split into
+    tasks of ``chunk_size`` parameter sets for one pair, strategy and bar
+    range. Tasks only carry a handle to the shared block and are independent,
+    so throughput scales with the number of workers. Within a task, indicator
+    arrays that do not depend on the parameters are computed once.
+    """
+
+    def __init__(
+        self,
+        timeframe: str = "1h",
+        years: float = 1.0,
+        workers: Optional[int] = None,
+        chunk_size: int = settings.SWEEP_CHUNK_SIZE
+    ):
+        self.timeframe = timeframe
+        self.years = years
+        self.workers = workers or settings.SWEEP_WORKERS or os.cpu_count() or 1
+        self.chunk_size = chunk_size
+
+    def _run(self, tasks: List[SweepTask]) -> List[SweepResult]:
+        results: List[SweepResult] = []
+        with ProcessPoolExecutor(max_workers=self.workers) as pool:
+            for future in as_completed([pool.submit(_evaluate, task) for task in tasks]):
+                results.extend(future.result())
+        return results
+
+    def _load(self, pairs: Iterable[str]) -> Dict[str, SharedCandles]:
+        shared: Dict[str, SharedCandles] = {}
+        try:
+            for pair in pairs:
+                timestamps, _, high, low, close, _ = load_candles(pair, self.timeframe, self.years)
+                shared[pair] = SharedCandles(timestamps, high, low, close)
+        except BaseException:
+            for candles in shared.values():
+                candles.close()
+            raise
+        return shared
+
+    def sweep(
+        self,
+        pairs: Iterable[str],
+        strategies: Iterable[StrategyEnum],
+        combos: Sequence[BacktestParams],
+        metric: str = "sharpe_ratio"
+    ) -> List[SweepResult]:
+        """Backtest every combination over the full history; results ranked by ``metric``."""
+        per_strategy = {strategy: strategy_combos(strategy, combos) for strategy in strategies}
+        shared = self._load(pairs)
+        try:
+            tasks = [
+                SweepTask(candles.handle, pair, strategy, 0, candles.handle.count, chunk)
+                for pair, candles in shared.items()
+                for strategy, strategy_params in per_strategy.items()
+                for chunk in _chunks(strategy_params, self.chunk_size)
+            ]
+            results = self._run(tasks)
+        finally:
+            for candles in shared.values():
+                candles.close()
+        return sorted(results, key=lambda result: score(result.stats, metric), reverse=True)
+
+    def walk_forward(
+        self,
+        pairs: Iterable[str],
+        strategies: Iterable[StrategyEnum],
+        combos: Sequence[BacktestParams],
+        folds: int = 4,
+        train_fraction: float = 0.75,
+        metric: str = "sharpe_ratio"
+    ) -> List[WalkForwardResult]:
+        """
+        Pick the best combination in-sample per fold and score it out-of-sample.
+
+        Results are ranked by the out-of-sample ``metric``, which is the one
+        that says whether the tuning generalizes.
+        """
+
+        per_strategy = {strategy: strategy_combos(strategy, combos) for strategy in strategies}
+        shared = self._load(pairs)
+        try:
+            windows = {pair: walk_forward_windows(candles.handle.count, folds, train_fraction) for pair, candles in shared.items()}
+            in_sample = self._run([
+                SweepTask(candles.handle, pair, strategy, start, train_end, chunk, fold)
+                for pair, candles in shared.items()
+                for strategy, strategy_params in per_strategy.items()
+                for fold, (start, train_end, _) in enumerate(windows[pair])
+                for chunk in _chunks(strategy_params, self.chunk_size)
+            ])
+
+            best: Dict[Tuple[str, StrategyEnum, int], SweepResult] = {}
+            for result in in_sample:
+                key = (result.pair, result.strategy, result.fold)
+                if key not in best or score(result.stats, metric) > score(best[key].stats, metric):
+                    best[key] = result
+
+            out_of_sample = self._run([
+                SweepTask(shared[pair].handle, pair, strategy, windows[pair][fold][1], windows[pair][fold][2], (result.params,), fold)
+                for (pair, strategy, fold), result in best.items()
+            ])
+        finally:
+            for candles in shared.values():
+                candles.close()
+
+        results = [
+            WalkForwardResult(result.pair, result.strategy, result.fold, result.params,
+                              best[(result.pair, result.strategy, result.fold)].stats, result.stats)
+            for result in out_of_sample
+        ]
+        return sorted(results, key=lambda result: score(result.out_of_sample, metric), reverse=True)
@@ -0,0 +1,231 @@
+import threading
+import time
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from typing import Dict, NamedTuple, Optional, Tuple
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.database import SQLiteConnectionPool
+from ..schemas.billing import PlanType
+from .user_repository import user_repository
+
+
+class Limit(NamedTuple):
+    burst: int
+    per_minute: float
+    monthly: Optional[int]
+
+
+class Decision(NamedTuple):
+    allowed: bool
+    retry_after: float = 0.0
+    reason: str = ""
+
+
+# Per plan and metered action: a token bucket (``burst`` tokens refilled at
+# ``per_minute``) for short-term rate, plus a calendar-month quota.
+PLAN_LIMITS: Dict[PlanType, Dict[str, Limit]] = {
+    PlanType.FREE: {
+        "analysis": Limit(burst=3, per_minute=2, monthly=100),
+        "signals": Limit(burst=10, per_minute=30, monthly=None),
+    },
+    PlanType.BASIC: {
+        "analysis": Limit(burst=5, per_minute=10, monthly=1000),
+        "signals": Limit(burst=20, per_minute=60, monthly=None),
+    },
+    PlanType.PRO: {
+        "analysis": Limit(burst=20, per_minute=30, monthly=10000),
+        "signals": Limit(burst=60, per_minute=120, monthly=None),
+    },
+    PlanType.ENTERPRISE: {
+        "analysis": Limit(burst=60, per_minute=120, monthly=None),
+        "signals": Limit(burst=120, per_minute=300, monthly=None),
+    },
+}
+
+# Seconds after which any plan's bucket has refilled to its burst; an idle
+# bucket older than this is indistinguishable from a new one.
+_BUCKET_REFILL_SECONDS = max(
+    limit.burst * 60 / limit.per_minute for limits in PLAN_LIMITS.values() for limit in limits.values()
+)
+
+
+async def user_plan(user_id: str) -> PlanType:
+    """Plan of ``user_id`` from the user record; unknown users and tiers fall back to free."""
+    user = await user_repository.get_by_id_async(user_id)
+    try:
+        return PlanType(user["subscription_tier"]) if user else PlanType.FREE
+    except ValueError:
+        return PlanType.FREE
+
+
+def usage_period(now: float) -> Tuple[str, float]:
+    """Calendar-month (UTC) usage period containing ``now`` and the epoch time it ends."""
+    current = datetime.fromtimestamp(now, tz=timezone.utc)
+    if current.month == 12:
+        end = datetime(current.year + 1, 1, 1, tzinfo=timezone.utc)
+    else:
+        end = datetime(current.year, current.month + 1, 1, tzinfo=timezone.utc)
+    return current.strftime("%Y-%m"), end.timestamp()
+
+
+def _take(limit: Limit, tokens: float, updated: float, used: int, now: float, period_end: float) -> Tuple[Decision, float]:
+    """Apply one request to bucket/quota state; returns the decision and the new token count."""
+    tokens = min(float(limit.burst), tokens + (now - updated) * limit.per_minute / 60)
+    if limit.monthly is not None and used >= limit.monthly:
+        return Decision(False, period_end - now, "monthly quota exceeded"), tokens
+    if tokens < 1:
+        return Decision(False, (1 - tokens) * 60 / limit.per_minute, "rate limit exceeded"), tokens
+    return Decision(True), tokens - 1
+
+
+class RateLimiter(ABC):
+    """
+    Per-user token buckets and monthly usage counters for metered actions.
+
+    ``acquire`` either admits a request (taking a token and counting it
+    toward the month) or rejects it with the seconds until it would succeed.
+    The ``*_async`` variants run implementations that block on I/O
+    (``blocking``) in a worker thread, off the event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def acquire(self, user_id: str, plan: PlanType, action: str, now: Optional[float] = None) -> Decision:
+        """Admit or reject one ``action`` by ``user_id`` under ``plan``'s limits."""
+
+    @abstractmethod
+    def usage(self, user_id: str, action: str, now: Optional[float] = None) -> int:
+        """Admitted ``action`` requests by ``user_id`` in the current month."""
+
+    async def acquire_async(self, user_id: str, plan: PlanType, action: str) -> Decision:
+        if self.blocking:
+            return await run_in_threadpool(self.acquire, user_id, plan, action)
+        return self.acquire(user_id, plan, action)
+
+    async def usage_async(self, user_id: str, action: str) -> int:
+        if self.blocking:
+            return await run_in_threadpool(self.usage, user_id, action)
+        return self.usage(user_id, action)
+
+
+class InMemoryRateLimiter(RateLimiter):
+    """Limiter state in process memory; limits are per worker."""
+
+    prune_interval = 60.0
+
+    def __init__(self):
+        self._buckets: Dict[Tuple[str, str], Tuple[float, float]] = {}
+        self._usage: Dict[Tuple[str, str, str], int] = {}
+        self._lock = threading.Lock()
+        self._pruned = 0.0
+
+    def _prune(self, now: float, period: str) -> None:
+        """Drop counters of past months and buckets idle long enough to be full again."""
+        self._pruned = now
+        self._usage = {key: count for key, count in self._usage.items() if key[2] == period}
+        self._buckets = {
+            key: bucket for key, bucket in self._buckets.items()
+            if now - bucket[1] < _BUCKET_REFILL_SECONDS
+        }
+
+    def acquire(self, user_id: str, plan: PlanType, action: str, now: Optional[float] = None) -> Decision:
+        limit = PLAN_LIMITS[plan][action]
+        now = time.time() if now is None else now
+        period, period_end = usage_period(now)
+        usage_key = (user_id, action, period)
+        with self._lock:
+            if now - self._pruned >= self.prune_interval:
+                self._prune(now, period)
+            tokens, updated = self._buckets.get((user_id, action), (float(limit.burst), now))
+            decision, tokens = _take(limit, tokens, updated, self._usage.get(usage_key, 0), now, period_end)
+            self._buckets[(user_id, action)] = (tokens, now)
+            if decision.allowed:
+                self._usage[usage_key] = self._usage.get(usage_key, 0) + 1
+        return decision
+
+    def usage(self, user_id: str, action: str, now: Optional[float] = None) -> int:
+        period, _ = usage_period(time.time() if now is None else now)
+        return self._usage.get((user_id, action, period), 0)
+
+
+class SQLiteRateLimiter(RateLimiter):
+    """
+    Limiter state shared through SQLite, so limits hold across workers.
+
+    Each ``acquire`` is one ``BEGIN IMMEDIATE`` transaction: the read, the
+    decision and the write are serialized against every other process.
+    """
+
+    blocking = True
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self._pool = pool
+        with self._pool.connection() as conn:
+            conn.executescript("""
+                CREATE TABLE IF NOT EXISTS rate_buckets (
+                    user_id TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    tokens REAL NOT NULL,
+                    updated REAL NOT NULL,
+                    PRIMARY KEY (user_id, action)
+                );
+                CREATE TABLE IF NOT EXISTS usage_counters (
+                    user_id TEXT NOT NULL,
+                    action TEXT NOT NULL,
+                    period TEXT NOT NULL,
+                    count INTEGER NOT NULL,
+                    PRIMARY KEY (user_id, action, period)
+                );
+            """)
+
+    def acquire(self, user_id: str, plan: PlanType, action: str, now: Optional[float] = None) -> Decision:
+        limit = PLAN_LIMITS[plan][action]
+        now = time.time() if now is None else now
+        period, period_end = usage_period(now)
+        with self._pool.connection() as conn:
+            conn.execute("BEGIN IMMEDIATE")
+            bucket = conn.execute(
+                "SELECT tokens, updated FROM rate_buckets WHERE user_id = ? AND action = ?",
+                (user_id, action)
+            ).fetchone()
+            used = conn.execute(
+                "SELECT count FROM usage_counters WHERE user_id = ? AND action = ? AND period = ?",
+                (user_id, action, period)
+            ).fetchone()
+            tokens, updated = (bucket["tokens"], bucket["updated"]) if bucket else (float(limit.burst), now)
+            decision, tokens = _take(limit, tokens, updated, used["count"] if used else 0, now, period_end)
+            conn.execute(
+                "INSERT OR REPLACE INTO rate_buckets (user_id, action, tokens, updated) VALUES (?, ?, ?, ?)",
+                (user_id, action, tokens, now)
+            )
+            if decision.allowed:
+                conn.execute(
+                    """
+                    INSERT INTO usage_counters (user_id, action, period, count) VALUES (?, ?, ?, 1)
+                    ON CONFLICT (user_id, action, period) DO UPDATE SET count = count + 1
+                    """,
+                    (user_id, action, period)
+                )
+        return decision
+
+    def usage(self, user_id: str, action: str, now: Optional[float] = None) -> int:
+        period, _ = usage_period(time.time() if now is None else now)
+        with self._pool.connection() as conn:
+            row = conn.execute(
+                "SELECT count FROM usage_counters WHERE user_id = ? AND action = ? AND period = ?",
+                (user_id, action, period)
+            ).fetchone()
+        return row["count"] if row else 0
+
+
+def create_rate_limiter() -> RateLimiter:
+    if settings.RATE_LIMIT_BACKEND == "sqlite":
+        return SQLiteRateLimiter(SQLiteConnectionPool(settings.RATE_LIMIT_DB_PATH, settings.SQLITE_POOL_SIZE))
+    return InMemoryRateLimiter()
+
+
+rate_limiter = create_rate_limiter()
@@ -0,0 +1,272 @@
+import time
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from .candle_archive import candle_archive
+from .candle_store import CANDLE_FIELDS, CandleStore, TIMEFRAME_SECONDS, simulate_candles
+from .indicators import WARMUP_BARS
+
+
+BASE_TIMEFRAME = "1m"
+BASE_INTERVAL = TIMEFRAME_SECONDS[BASE_TIMEFRAME]
+
+# Epoch day 0 is a Thursday; shift weekly buckets so they open on Monday 00:00 UTC.
+TIMEFRAME_OFFSETS: Dict[str, int] = {"1w": 4 * 24 * 60 * 60}
+
+
+def bucket_start(timestamps: np.ndarray, timeframe: str) -> np.ndarray:
+    """Open time of the ``timeframe`` bucket containing each timestamp."""
+    interval = TIMEFRAME_SECONDS[timeframe]
+    offset = TIMEFRAME_OFFSETS.get(timeframe, 0)
+    return (timestamps - offset) // interval * interval + offset
+
+
+def resample(
+    timestamps: np.ndarray,
+    open_: np.ndarray,
+    high: np.ndarray,
+    low: np.ndarray,
+    close: np.ndarray,
+    volume: np.ndarray,
+    timeframe: str
+) -> Tuple[np.ndarray, ...]:
+    """
+    Aggregate sorted lower-timeframe bars into ``timeframe`` bars.
+
+    Group boundaries are found with one ``np.diff`` over the bucket ids and
+    OHLCV is reduced per group with ``ufunc.reduceat``, so there is no Python
+    loop over bars.
+    """
+
+    if len(timestamps) == 0:
+        empty_f = np.empty(0, dtype=np.float64)
+        return np.empty(0, dtype=np.int64), empty_f, empty_f, empty_f, empty_f, np.empty(0, dtype=np.int64)
+
+    buckets = bucket_start(timestamps, timeframe)
+    starts = np.concatenate(([0], np.flatnonzero(np.diff(buckets)) + 1))
+    ends = np.append(starts[1:], len(timestamps)) - 1
+    return (
+        buckets[starts],
+        open_[starts],
+        np.maximum.reduceat(high, starts),
+        np.minimum.reduceat(low, starts),
+        close[ends],
+        np.add.reduceat(volume, starts),
+    )
+
+
+class _Resampled:
+    """Closed higher-timeframe bars plus the bar still forming from recent base bars."""
+
+    def __init__(self, pair: str, timeframe: str):
+        self.timeframe = timeframe
+        self.interval = TIMEFRAME_SECONDS[timeframe]
+        self.store = CandleStore(pair, timeframe)
+        self.consumed = 0
+        self.forming: Optional[Dict[str, Any]] = None
+
+    def advance(self, base: CandleStore) -> int:
+        """
+        Fold base bars appended since the last call; return how many bars closed.
+
+        Only ``base[consumed:]`` is scanned and merged into the running forming
+        bar, so each base bar is aggregated exactly once per timeframe.
+        """
+
+        n = len(base)
+        start = self.consumed
+        if start >= n:
+            return 0
+
+        ts, open_, high, low, close, volume = resample(
+            base.timestamps[start:],
+            base.open[start:],
+            base.high[start:],
+            base.low[start:],
+            base.close[start:],
+            base.volume[start:],
+            self.timeframe
+        )
+        self.consumed = n
+        closed = 0
+
+        forming = self.forming
+        if forming is not None:
+            if ts[0] == forming["timestamp"]:
+                open_[0] = forming["open"]
+                high[0] = max(high[0], forming["high"])
+                low[0] = min(low[0], forming["low"])
+                volume[0] += forming["volume"]
+            else:
+                self.store.append(
+                    forming["timestamp"], forming["open"], forming["high"],
+                    forming["low"], forming["close"], forming["volume"]
+                )
+                closed += 1
+
+        complete = len(ts) - 1
+        if int(ts[-1]) + self.interval <= int(base.timestamps[-1]) + BASE_INTERVAL:
+            complete += 1
+        if complete:
+            self.store.extend(ts[:complete], open_[:complete], high[:complete], low[:complete], close[:complete], volume[:complete])
+            closed += complete
+
+        if complete < len(ts):
+            self.forming = {
+                "timestamp": int(ts[-1]),
+                "open": float(open_[-1]),
+                "high": float(high[-1]),
+                "low": float(low[-1]),
+                "close": float(close[-1]),
+                "volume": int(volume[-1]),
+            }
+        else:
+            self.forming = None
+        return closed
+
+
+class PairSeries:
+    """
+    1m base candles for one pair with every higher timeframe derived from them.
+
+    Only the base bars are stored in full; each higher timeframe keeps its
+    closed bars in a small CandleStore that is advanced incrementally as base
+    bars close. ``live`` series get their base bars from the tick pipeline
+    and are not rolled forward with simulated bars.
+    """
+
+    def __init__(self, pair: str, capacity: int = 1024):
+        self.pair = pair
+        self.live = False
+        self.base = CandleStore(pair, BASE_TIMEFRAME, capacity=capacity)
+        self._derived: Dict[str, _Resampled] = {
+            timeframe: _Resampled(pair, timeframe)
+            for timeframe in TIMEFRAME_SECONDS
+            if timeframe != BASE_TIMEFRAME
+        }
+
+    def _advance(self, before: int) -> Dict[str, int]:
+        closed = {BASE_TIMEFRAME: len(self.base) - before}
+        for timeframe, derived in self._derived.items():
+            closed[timeframe] = derived.advance(self.base)
+        return closed
+
+    def extend(self, *columns: np.ndarray) -> Dict[str, int]:
+        """Append closed base bars and return the number of newly closed bars per timeframe."""
+        before = len(self.base)
+        self.base.extend(*columns)
+        return self._advance(before)
+
+    def backfill(self, timeframe: str, *columns: np.ndarray) -> None:
+        """
+        Closed ``timeframe`` bars from before the first base bar.
+
+        Gives slow timeframes enough history to warm up their indicators
+        without holding months of 1m bars; call before any base bars are added.
+        """
+        self._derived[timeframe].store.extend(*columns)
+
+    def append(self, timestamp: int, open_: float, high: float, low: float, close: float, volume: int) -> Dict[str, int]:
+        before = len(self.base)
+        self.base.append(timestamp, open_, high, low, close, volume)
+        return self._advance(before)
+
+    @property
+    def version(self) -> Optional[int]:
+        """Open time of the last base bar; every derived store and forming bar changes with it."""
+        return self.base.last_timestamp
+
+    def get(self, timeframe: str) -> CandleStore:
+        if timeframe == BASE_TIMEFRAME:
+            return self.base
+        return self._derived[timeframe].store
+
+    def forming(self, timeframe: str) -> Optional[Dict[str, Any]]:
+        """The in-progress bar for ``timeframe``, or None for the base timeframe."""
+        if timeframe == BASE_TIMEFRAME:
+            return None
+        return self._derived[timeframe].forming
+
+
+_series: Dict[str, PairSeries] = {}
+_rng = np.random.default_rng()
+
+
+def _backfill(series: PairSeries, start: int, end: int, first_open: float) -> None:
+    """
+    Backfill timeframes that base bars from ``start`` to ``end`` leave short of ``WARMUP_BARS``.
+
+    Archived bars of the timeframe are used where present; simulated ones
+    are scaled to end at ``first_open`` so the series joins the base bars.
+    """
+
+    for timeframe, interval in TIMEFRAME_SECONDS.items():
+        needed = WARMUP_BARS - (end - start) // interval
+        if timeframe == BASE_TIMEFRAME or needed <= 0:
+            continue
+        history_end = int(bucket_start(np.array([start]), timeframe)[0])
+        history_start = history_end - needed * interval
+        archived = candle_archive.series(series.pair, timeframe).range(history_start, history_end)
+        if len(archived["timestamp"]):
+            series.backfill(timeframe, *(archived[field] for field in CANDLE_FIELDS))
+            continue
+        timestamps, open_, high, low, close, volume = simulate_candles(first_open, history_start, interval, needed, _rng)
+        scale = first_open / close[-1]
+        series.backfill(timeframe, timestamps, open_ * scale, high * scale, low * scale, close * scale, volume)
+
+
+def get_pair_series(pair: str, base_price: float) -> PairSeries:
+    """
+    Return the candle series for ``pair``, creating it on first use.
+
+    A new series is seeded with ``settings.BASE_HISTORY_DAYS`` of 1m bars,
+    taken from the candle archive where it has them and simulated otherwise.
+    Timeframes that the base history can't give ``WARMUP_BARS`` closed bars
+    are backfilled the same way at their own interval. On later calls the
+    base is rolled forward to the last closed minute with simulated bars,
+    which also closes any higher-timeframe bars that finished meanwhile,
+    unless the series is ``live`` and the tick pipeline closes its bars.
+    """
+
+    last_closed = int(time.time()) // BASE_INTERVAL * BASE_INTERVAL - BASE_INTERVAL
+    series = _series.get(pair)
+
+    if series is None:
+        count = max(1, settings.BASE_HISTORY_DAYS * 24 * 60 * 60 // BASE_INTERVAL)
+        series = PairSeries(pair, capacity=count * 2)
+        start = last_closed - (count - 1) * BASE_INTERVAL
+        archived = candle_archive.series(pair, BASE_TIMEFRAME).range(start, last_closed + BASE_INTERVAL)
+        if len(archived["timestamp"]):
+            base = tuple(archived[field] for field in CANDLE_FIELDS)
+        else:
+            base = simulate_candles(base_price, start, BASE_INTERVAL, count, _rng)
+        _backfill(series, int(base[0][0]), int(base[0][-1]) + BASE_INTERVAL, float(base[1][0]))
+        series.extend(*base)
+        _series[pair] = series
+
+    last = series.base.last_timestamp
+    if not series.live and last is not None and last_closed > last:
+        count = (last_closed - last) // BASE_INTERVAL
+        series.extend(*simulate_candles(float(series.base.close[-1]), last + BASE_INTERVAL, BASE_INTERVAL, count, _rng))
+
+    return series
+
+
+def seconds_until_change(timeframe: str, now: Optional[float] = None) -> int:
+    """
+    Seconds until the closed candles of ``timeframe`` next change.
+
+    A bar becomes visible once its last base bar closes, i.e. at the
+    timeframe boundary, so this is the time left in the current bucket.
+    """
+
+    now = time.time() if now is None else now
+    start = int(bucket_start(np.array([int(now)]), timeframe)[0])
+    return max(1, start + TIMEFRAME_SECONDS[timeframe] - int(now))
+
+
+def get_candle_store(pair: str, timeframe: str, base_price: float) -> CandleStore:
+    """Closed candles for ``pair``/``timeframe``, resampled from the pair's 1m base."""
+    return get_pair_series(pair, base_price).get(timeframe)
@@ -0,0 +1,331 @@
+import asyncio
+import heapq
+import logging
+import math
+from collections import deque
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple, Union
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from ..schemas.trading import Signal, StrategyEnum
+from .candle_store import CandleStore, TIMEFRAME_SECONDS
+from .indicators import BOLLINGER_STDDEV, IndicatorState, get_indicator_state
+from .market_service import BASE_PRICES
+from .resampler import get_pair_series
+
+
+logger = logging.getLogger(__name__)
+
+ACTIVE = "active"
+CLOSED = "closed"
+
+# Rules are written once over indicator values that may be scalars (the last
+# closed bar, as the signal engine sees it) or whole arrays (every bar, as the
+# backtest sees them); NaN inputs never fire either way.
+Values = Union[float, np.ndarray]
+
+
+class RuleInputs(NamedTuple):
+    close: Values
+    fast: Values
+    slow: Values
+    macd_line: Values
+    macd_histogram: Values
+    rsi: Values
+    atr: Values
+    upper: Optional[Values] = None
+    lower: Optional[Values] = None
+
+
+# A rule returns where it buys and where it sells; its strength function
+# returns the buy and sell strengths that set a fired signal's confidence.
+Rule = Callable[[RuleInputs], Tuple[Values, Values]]
+Strength = Callable[[RuleInputs], Tuple[Values, Values]]
+
+
+class Strategy(NamedTuple):
+    rule: Rule
+    strength: Strength
+    stop_atr: float
+    reward: float
+    bands: bool = False
+    # Moving averages of RuleInputs (``fast``, ``slow``) the rule and strength read.
+    emas: Tuple[str, ...] = ("fast", "slow")
+
+
+def _confidence(strength: float) -> float:
+    """Map a non-negative signal strength onto 0.6-0.95."""
+    return round(0.6 + 0.35 * min(1.0, max(0.0, strength)), 2)
+
+
+def _trend_following(x: RuleInputs) -> Tuple[Values, Values]:
+    buy = (x.fast > x.slow) & (x.macd_histogram > 0) & (x.rsi > 50) & (x.rsi < 70)
+    sell = (x.fast < x.slow) & (x.macd_histogram < 0) & (x.rsi > 30) & (x.rsi < 50)
+    return buy, sell
+
+
+def _trend_following_strength(x: RuleInputs) -> Tuple[Values, Values]:
+    return (x.fast - x.slow) / x.atr, (x.slow - x.fast) / x.atr
+
+
+def _breakout(x: RuleInputs) -> Tuple[Values, Values]:
+    return x.close > x.upper, x.close < x.lower
+
+
+def _breakout_strength(x: RuleInputs) -> Tuple[Values, Values]:
+    return (x.close - x.upper) / x.atr * 2, (x.lower - x.close) / x.atr * 2
+
+
+def _scalping(x: RuleInputs) -> Tuple[Values, Values]:
+    return x.rsi < 30, x.rsi > 70
+
+
+def _scalping_strength(x: RuleInputs) -> Tuple[Values, Values]:
+    return (30 - x.rsi) / 20, (x.rsi - 70) / 20
+
+
+def _swing(x: RuleInputs) -> Tuple[Values, Values]:
+    buy = (x.close > x.slow) & (x.macd_histogram > 0) & (x.rsi < 45)
+    sell = (x.close < x.slow) & (x.macd_histogram < 0) & (x.rsi > 55)
+    return buy, sell
+
+
+def _swing_strength(x: RuleInputs) -> Tuple[Values, Values]:
+    return (45 - x.rsi) / 15, (x.rsi - 55) / 15
+
+
+def _position(x: RuleInputs) -> Tuple[Values, Values]:
+    buy = (x.close > x.fast) & (x.fast > x.slow) & (x.macd_line > 0)
+    sell = (x.close < x.fast) & (x.fast < x.slow) & (x.macd_line < 0)
+    return buy, sell
+
+
+def _position_strength(x: RuleInputs) -> Tuple[Values, Values]:
+    return (x.fast - x.slow) / x.atr / 2, (x.slow - x.fast) / x.atr / 2
+
+
+# Stops are ``stop_atr`` ATRs from entry and targets ``reward`` times the stop.
+STRATEGIES: Dict[StrategyEnum, Strategy] = {
+    StrategyEnum.TREND_FOLLOWING: Strategy(_trend_following, _trend_following_strength, stop_atr=2.0, reward=2.0),
+    StrategyEnum.BREAKOUT: Strategy(_breakout, _breakout_strength, stop_atr=1.5, reward=2.0, bands=True, emas=()),
+    StrategyEnum.SCALPING: Strategy(_scalping, _scalping_strength, stop_atr=1.0, reward=1.5, emas=()),
+    StrategyEnum.SWING: Strategy(_swing, _swing_strength, stop_atr=2.0, reward=2.5, emas=("slow",)),
+    StrategyEnum.POSITION: Strategy(_position, _position_strength, stop_atr=3.0, reward=3.0),
+}
+
+
+def last_bar_inputs(state: IndicatorState, close: float, atr: float) -> RuleInputs:
+    """Rule inputs for the last closed bar of a series from its indicator state."""
+    middle, std = state.bollinger()
+    return RuleInputs(
+        close=close,
+        fast=state.ema[20],
+        slow=state.ema[50],
+        macd_line=state.macd_fast - state.macd_slow,
+        macd_histogram=state.macd_histogram,
+        rsi=state.rsi,
+        atr=atr,
+        upper=middle + BOLLINGER_STDDEV * std,
+        lower=middle - BOLLINGER_STDDEV * std
+    )
+
+
+def evaluate(spec: Strategy, inputs: RuleInputs) -> Optional[Tuple[str, float]]:
+    """Direction and confidence if ``spec`` fires on the scalar ``inputs``, else None."""
+    buy, sell = spec.rule(inputs)
+    if buy:
+        return "BUY", _confidence(float(spec.strength(inputs)[0]))
+    if sell:
+        return "SELL", _confidence(float(spec.strength(inputs)[1]))
+    return None
+
+
+Slot = Tuple[str, str, StrategyEnum]
+
+
+class SignalStore:
+    """
+    Signals indexed by (pair, status) and by the (pair, timeframe, strategy)
+    slot that produced them.
+
+    Each slot has at most one active signal. Closed signals are kept up to
+    ``max_closed``, oldest evicted first, so reads never scan history.
+    """
+
+    def __init__(self, max_closed: int):
+        self.max_closed = max_closed
+        self._active: Dict[Slot, Signal] = {}
+        self._index: Dict[Tuple[str, str], Dict[str, Signal]] = {}
+        self._closed: deque = deque()
+
+    def __len__(self) -> int:
+        return sum(len(signals) for signals in self._index.values())
+
+    def active(self, slot: Slot) -> Optional[Signal]:
+        return self._active.get(slot)
+
+    def _bucket(self, pair: str, status: str) -> Dict[str, Signal]:
+        return self._index.setdefault((pair, status), {})
+
+    def open(self, slot: Slot, signal: Signal) -> None:
+        self.close(slot, signal.created_at)
+        self._active[slot] = signal
+        self._bucket(signal.pair, ACTIVE)[signal.id] = signal
+
+    def close(self, slot: Slot, at: datetime) -> None:
+        signal = self._active.pop(slot, None)
+        if signal is None:
+            return
+        del self._bucket(signal.pair, ACTIVE)[signal.id]
+        signal.status = CLOSED
+        signal.closed_at = at
+        self._bucket(signal.pair, CLOSED)[signal.id] = signal
+        self._closed.append(signal)
+        while len(self._closed) > self.max_closed:
+            evicted = self._closed.popleft()
+            self._bucket(evicted.pair, CLOSED).pop(evicted.id, None)
+
+    def query(self, pair: Optional[str] = None, status: Optional[str] = None, limit: int = 50) -> List[Signal]:
+        """Newest ``limit`` signals, optionally for one pair and/or status."""
+        buckets: Iterable[Dict[str, Signal]] = (
+            signals for (bucket_pair, bucket_status), signals in self._index.items()
+            if (pair is None or bucket_pair == pair) and (status is None or bucket_status == status)
+        )
+        return heapq.nlargest(
+            limit,
+            (signal for signals in buckets for signal in signals.values()),
+            key=lambda signal: signal.created_at
+        )
+
+
+class SignalEngine:
+    """
+    Evaluates every strategy against every pair/timeframe when its candle closes.
+
+    A background task rolls each pair's series forward every
+    ``SIGNAL_ENGINE_INTERVAL`` seconds; only timeframes whose closed-candle
+    count changed are evaluated, against their incrementally updated
+    ``IndicatorState``. Active signals are first checked against the new
+    bars' high/low for a stop or target hit, then a fresh rule firing opens a
+    new signal (replacing an active one in the opposite direction).
+    """
+
+    def __init__(self, store: SignalStore, interval: float):
+        self.store = store
+        self.interval = interval
+        self._counts: Dict[Tuple[str, str], int] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    def start(self) -> None:
+        """Evaluate the latest closed candles now, then keep up in the background."""
+        if self.started:
+            return
+        self.refresh()
+        self._task = asyncio.create_task(self._run())
+        self._task.add_done_callback(self._on_exit)
+
+    @staticmethod
+    def _on_exit(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Signal engine stopped", exc_info=task.exception())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def refresh(self) -> int:
+        """Roll every pair forward and evaluate the timeframes that closed; returns how many were evaluated."""
+        evaluated = 0
+        for pair, base_price in BASE_PRICES.items():
+            series = get_pair_series(pair, base_price)
+            for timeframe in TIMEFRAME_SECONDS:
+                store = series.get(timeframe)
+                count = len(store)
+                seen = self._counts.get((pair, timeframe))
+                if count == 0 or count == seen:
+                    continue
+                self._counts[(pair, timeframe)] = count
+                self.on_close(store, count - seen if seen is not None and seen < count else 1)
+                evaluated += 1
+        return evaluated
+
+    def on_close(self, store: CandleStore, closed: int) -> None:
+        """Evaluate all strategies for ``store`` after its last ``closed`` candles closed."""
+        with metrics.span("signals.evaluate"):
+            state = get_indicator_state(store)
+            close = float(store.close[-1])
+            high = float(store.high[-closed:].max())
+            low = float(store.low[-closed:].min())
+            closed_at = datetime.fromtimestamp(int(store.timestamps[-1]) + TIMEFRAME_SECONDS[store.timeframe])
+            atr = state.atr
+            inputs = last_bar_inputs(state, close, atr)
+            for strategy, spec in STRATEGIES.items():
+                slot = (store.pair, store.timeframe, strategy)
+                active = self.store.active(slot)
+                if active is not None and _hit(active, high, low):
+                    self.store.close(slot, closed_at)
+                    active = None
+                if not math.isfinite(atr) or atr <= 0:
+                    continue
+                fired = evaluate(spec, inputs)
+                if fired is None or (active is not None and active.direction == fired[0]):
+                    continue
+                self.store.open(slot, _make_signal(store, strategy, spec, fired, close, atr, closed_at))
+
+    async def _run(self) -> None:
+        while True:
+            await asyncio.sleep(self.interval)
+            try:
+                self.refresh()
+            except Exception:
+                # Keep running: one bad refresh must not freeze signals for good.
+                logger.exception("Signal engine refresh failed")
+
+
+def _hit(signal: Signal, high: float, low: float) -> bool:
+    if signal.direction == "BUY":
+        return low <= signal.stop_loss or high >= signal.take_profit
+    return high >= signal.stop_loss or low <= signal.take_profit
+
+
+def _make_signal(
+    store: CandleStore,
+    strategy: StrategyEnum,
+    spec: Strategy,
+    fired: Tuple[str, float],
+    close: float,
+    atr: float,
+    created_at: datetime
+) -> Signal:
+    direction, confidence = fired
+    sign = 1.0 if direction == "BUY" else -1.0
+    stop = spec.stop_atr * atr
+    return Signal(
+        id=f"signal_{store.pair.replace('/', '')}_{store.timeframe}_{strategy.name.lower()}_{int(store.timestamps[-1])}",
+        pair=store.pair,
+        direction=direction,
+        entry_price=round(close, 5),
+        stop_loss=round(close - sign * stop, 5),
+        take_profit=round(close + sign * stop * spec.reward, 5),
+        confidence=confidence,
+        status=ACTIVE,
+        created_at=created_at,
+        timeframe=store.timeframe,
+        strategy=strategy.value
+    )
+
+
+signal_store = SignalStore(settings.SIGNAL_MAX_CLOSED)
+signal_engine = SignalEngine(signal_store, settings.SIGNAL_ENGINE_INTERVAL)
@@ -0,0 +1,470 @@
+import asyncio
+import logging
+import time
+from abc import ABC, abstractmethod
+from typing import AsyncIterator, Callable, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+import numpy as np
+
+from ..core.config import settings
+from ..core.metrics import metrics
+from .candle_archive import CandleArchive, candle_archive
+from .candle_import import canonical_pair, normalize_timestamps, read_csv
+from .market_service import BASE_PRICES, last_prices
+from .resampler import BASE_INTERVAL, BASE_TIMEFRAME, get_pair_series
+
+
+logger = logging.getLogger(__name__)
+
+# (pair, bid, ask, epoch seconds); plain tuples keep the per-tick cost down.
+Tick = Tuple[str, float, float, float]
+
+
+class Bar(NamedTuple):
+    pair: str
+    timestamp: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: int
+
+
+BarConsumer = Callable[[List[Bar]], None]
+
+
+class TickSource(ABC):
+    """
+    Produces batches of ticks for a ``TickPipeline``.
+
+    ``live`` sources stamp ticks with the current time, so the pipeline
+    measures lag against the wall clock and closes bars of quiet pairs on
+    it; replayed history only advances on its own timestamps.
+    """
+
+    live = False
+
+    @abstractmethod
+    def batches(self) -> AsyncIterator[List[Tick]]:
+        ...
+
+
+class SimulatedTickSource(TickSource):
+    """
+    Random-walk bid/ask ticks for every pair at ``rate`` ticks per second.
+
+    Every ``interval`` seconds one batch is generated with numpy, spread
+    evenly over the pairs. Each tick is stamped up to ``jitter`` seconds in
+    the past, so batches arrive slightly out of order as they do from a
+    real feed.
+
+    TODO: Replace with a real forex price stream (e.g. OANDA, Alpha Vantage)
+    """
+
+    live = True
+
+    def __init__(self, prices: Dict[str, float], rate: float, interval: float = 0.05, jitter: float = 0.5, seed: Optional[int] = None):
+        self.pairs = list(prices)
+        self.prices = np.array([prices[pair] for pair in self.pairs], dtype=np.float64)
+        self.rate = rate
+        self.interval = interval
+        self.jitter = jitter
+        self._rng = np.random.default_rng(seed)
+
+    def generate(self, count: int, now: float) -> List[Tick]:
+        rng = self._rng
+        index = np.arange(count) % len(self.pairs)
+        steps = rng.standard_normal(count) * 0.0001
+        # Each pair's ticks walk on from its previous price.
+        walk = np.empty(count)
+        for i in range(len(self.pairs)):
+            mine = index == i
+            path = self.prices[i] * np.cumprod(1.0 + steps[mine])
+            walk[mine] = path
+            if len(path):
+                self.prices[i] = path[-1]
+        spread = walk * 0.00005
+        stamps = now - rng.random(count) * self.jitter
+        pairs = [self.pairs[i] for i in index.tolist()]
+        return list(zip(pairs, (walk - spread).tolist(), (walk + spread).tolist(), stamps.tolist()))
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        loop = asyncio.get_running_loop()
+        due = loop.time()
+        carry = 0.0
+        while True:
+            due += self.interval
+            await asyncio.sleep(max(0.0, due - loop.time()))
+            carry += self.rate * self.interval
+            count = int(carry)
+            carry -= count
+            if count:
+                yield self.generate(count, time.time())
+
+
+class ReplayTickSource(TickSource):
+    """
+    Ticks read from a CSV file with timestamp, bid, ask and (unless ``pair``
+    is given) pair columns.
+
+    The file is parsed ``chunk_bytes`` at a time with the candle importer's
+    reader and handed on in batches of ``batch_size``. With ``speed`` > 0
+    batches are paced so event time runs ``speed`` times faster than wall
+    time; 0 replays as fast as the pipeline keeps up. Rows for unknown
+    pairs are skipped and counted in ``invalid``.
+    """
+
+    def __init__(
+        self,
+        path: str,
+        speed: float = 0.0,
+        batch_size: int = settings.TICK_BATCH_SIZE,
+        pair: Optional[str] = None,
+        chunk_bytes: int = 4 * 1024 * 1024,
+        delimiter: str = ","
+    ):
+        self.path = path
+        self.speed = speed
+        self.batch_size = batch_size
+        self.pair = pair
+        self.chunk_bytes = chunk_bytes
+        self.delimiter = delimiter
+        self.invalid = 0
+
+    def _ticks(self, chunk: Dict[str, np.ndarray]) -> List[Tick]:
+        stamps = normalize_timestamps(chunk["timestamp"], time_of_day=chunk.get("time"), fractional=True)
+        bid, ask = chunk["bid"], chunk["ask"]
+        if self.pair is not None:
+            return list(zip([self.pair] * len(stamps), bid.tolist(), ask.tolist(), stamps.tolist()))
+
+        symbols, inverse = np.unique(chunk["pair"], return_inverse=True)
+        pairs = [canonical_pair(str(symbol)) for symbol in symbols]
+        known = np.array([pair is not None for pair in pairs])[inverse]
+        self.invalid += int(len(known) - known.sum())
+        names = [pairs[i] for i in inverse[known].tolist()]
+        return list(zip(names, bid[known].tolist(), ask[known].tolist(), stamps[known].tolist()))
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        loop = asyncio.get_running_loop()
+        origin: Optional[Tuple[float, float]] = None
+        for chunk, invalid in read_csv(self.path, self.chunk_bytes, delimiter=self.delimiter):
+            self.invalid += invalid
+            ticks = self._ticks(chunk)
+            for start in range(0, len(ticks), self.batch_size):
+                batch = ticks[start:start + self.batch_size]
+                if self.speed > 0:
+                    if origin is None:
+                        origin = (loop.time(), batch[0][3])
+                    due = origin[0] + (batch[-1][3] - origin[1]) / self.speed
+                    await asyncio.sleep(max(0.0, due - loop.time()))
+                else:
+                    await asyncio.sleep(0)
+                yield batch
+
+
+class _PairState:
+    __slots__ = ("bars", "watermark", "horizon", "next_close")
+
+    def __init__(self):
+        self.bars: Dict[float, list] = {}
+        self.watermark = float("-inf")
+        self.horizon = float("-inf")
+        self.next_close = float("-inf")
+
+
+class BarAggregator:
+    """
+    Folds ticks into ``interval``-second OHLCV bars keyed by event time.
+
+    A pair's watermark is the newest tick timestamp it has seen. A bar stays
+    open until the watermark (or, for live sources, the wall clock passed to
+    ``advance``) is ``lateness`` seconds past its end, so ticks arriving out
+    of order within that window still land in the right bar, with open and
+    close taken from the earliest and latest timestamps rather than arrival
+    order. Ticks for a bar that has already closed are dropped and counted
+    in ``late``. Prices are bid/ask mids and volume is the tick count.
+
+    Closing is checked against a cached per-pair deadline, so the common
+    case per tick is a dict lookup and a few comparisons.
+    """
+
+    def __init__(self, lateness: float, interval: int = BASE_INTERVAL, prices: Optional[Dict[str, Tick]] = None):
+        self.lateness = lateness
+        self.interval = interval
+        self.prices = prices if prices is not None else {}
+        self.ticks = 0
+        self.late = 0
+        self.closed = 0
+        self._states: Dict[str, _PairState] = {}
+        self._ready: List[Bar] = []
+
+    def _state(self, pair: str, ts: float) -> _PairState:
+        state = self._states[pair] = _PairState()
+        state.next_close = ts - ts % self.interval + self.interval + self.lateness
+        return state
+
+    def add(self, ticks: Iterable[Tick]) -> None:
+        """Aggregate a batch; the newest tick per pair also goes into ``prices``."""
+        interval = float(self.interval)
+        states = self._states
+        prices = self.prices
+        count = late = 0
+        for tick in ticks:
+            pair, bid, ask, ts = tick
+            count += 1
+            state = states.get(pair)
+            if state is None:
+                state = self._state(pair, ts)
+            start = ts - ts % interval
+            if start < state.horizon:
+                late += 1
+                continue
+            price = (bid + ask) * 0.5
+            bar = state.bars.get(start)
+            if bar is None:
+                state.bars[start] = [price, price, price, price, 1, ts, ts]
+            else:
+                if price > bar[1]:
+                    bar[1] = price
+                elif price < bar[2]:
+                    bar[2] = price
+                if ts < bar[5]:
+                    bar[5] = ts
+                    bar[0] = price
+                if ts >= bar[6]:
+                    bar[6] = ts
+                    bar[3] = price
+                bar[4] += 1
+            if ts > state.watermark:
+                state.watermark = ts
+                prices[pair] = tick
+                if ts >= state.next_close:
+                    self._close(pair, state, ts)
+        self.ticks += count
+        self.late += late
+
+    def advance(self, now: float) -> None:
+        """Close bars of every pair as if its watermark had reached ``now``."""
+        for pair, state in self._states.items():
+            if now >= state.next_close:
+                self._close(pair, state, now)
+
+    def flush(self) -> None:
+        """Close every open bar, e.g. when a replay ends."""
+        for pair, state in self._states.items():
+            self._close(pair, state, float("inf"))
+
+    def _close(self, pair: str, state: _PairState, clock: float) -> None:
+        interval = self.interval
+        limit = clock - self.lateness
+        horizon = limit - limit % interval if limit != float("inf") else limit
+        bars = state.bars
+        for start in sorted(start for start in bars if start < horizon):
+            o, h, l, c, v, _, _ = bars.pop(start)
+            self._ready.append(Bar(pair, int(start), o, h, l, c, v))
+            self.closed += 1
+        state.horizon = max(state.horizon, horizon)
+        state.next_close = state.horizon + interval + self.lateness
+
+    def drain(self) -> List[Bar]:
+        """Bars closed since the previous call, oldest first per pair."""
+        ready, self._ready = self._ready, []
+        return ready
+
+
+class TickStats(NamedTuple):
+    ticks: int
+    late: int
+    bars: int
+    batches: int
+    ticks_per_second: float
+
+
+class TickPipeline:
+    """
+    Ingests ticks from a ``TickSource`` into a last-price table and 1m bars.
+
+    One asyncio task pulls batches from the source and feeds them to a
+    ``BarAggregator`` that writes the newest tick per pair into
+    ``market_service.last_prices`` (read by ``/trading/pairs`` and the
+    market stream). Bars that close are handed, in one list per batch, to
+    every consumer registered with ``subscribe``.
+
+    Lag is reported through ``metrics``: ``ticks.lag`` is how far behind the
+    wall clock the oldest tick of each live batch was when processed,
+    ``bars.publish_lag`` how long after its end a bar reached consumers
+    (including the lateness window) and ``ticks.batch`` the processing time
+    per batch.
+    """
+
+    def __init__(self, source_factory: Callable[[], TickSource], lateness: float, prices: Optional[Dict[str, Tick]] = None):
+        self.source_factory = source_factory
+        self.aggregator = BarAggregator(lateness, prices=prices)
+        self.batches = 0
+        self._consumers: List[BarConsumer] = []
+        self._task: Optional[asyncio.Task] = None
+        self._started_at: Optional[float] = None
+
+    @property
+    def started(self) -> bool:
+        return self._task is not None
+
+    @property
+    def stats(self) -> TickStats:
+        aggregator = self.aggregator
+        elapsed = time.perf_counter() - self._started_at if self._started_at is not None else 0.0
+        return TickStats(
+            aggregator.ticks,
+            aggregator.late,
+            aggregator.closed,
+            self.batches,
+            aggregator.ticks / elapsed if elapsed > 0 else 0.0
+        )
+
+    def subscribe(self, consumer: BarConsumer) -> None:
+        self._consumers.append(consumer)
+
+    def unsubscribe(self, consumer: BarConsumer) -> None:
+        if consumer in self._consumers:
+            self._consumers.remove(consumer)
+
+    def start(self) -> None:
+        if self.started:
+            return
+        self._task = asyncio.create_task(self.run(self.source_factory()))
+        self._task.add_done_callback(self._on_exit)
+
+    @staticmethod
+    def _on_exit(task: asyncio.Task) -> None:
+        if not task.cancelled() and task.exception() is not None:
+            logger.error("Tick pipeline stopped", exc_info=task.exception())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    def process(self, batch: List[Tick], live: bool) -> None:
+        with metrics.span("ticks.batch"):
+            self.aggregator.add(batch)
+            if live:
+                now = time.time()
+                self.aggregator.advance(now)
+                if metrics.enabled:
+                    metrics.observe_span("ticks.lag", max(0.0, now - min(tick[3] for tick in batch[:64])))
+        self.batches += 1
+        self._publish(live)
+
+    def _publish(self, live: bool) -> None:
+        bars = self.aggregator.drain()
+        if not bars:
+            return
+        if live and metrics.enabled:
+            now = time.time()
+            interval = self.aggregator.interval
+            for bar in bars:
+                metrics.observe_span("bars.publish_lag", now - bar.timestamp - interval)
+        for consumer in self._consumers:
+            try:
+                consumer(bars)
+            except Exception:
+                # One failing consumer must not starve the others of bars.
+                logger.exception("Bar consumer %r failed", consumer)
+
+    async def run(self, source: TickSource) -> TickStats:
+        """
+        Consume ``source`` until it ends or the task is cancelled.
+
+        When the source ends, bars still open are closed and published;
+        on cancellation they are not, since they may be incomplete. A batch
+        that fails is logged and skipped so the feed keeps flowing.
+        """
+
+        self._started_at = time.perf_counter()
+        async for batch in source.batches():
+            if not batch:
+                continue
+            try:
+                self.process(batch, source.live)
+            except Exception:
+                logger.exception("Tick batch failed")
+        self.aggregator.flush()
+        self._publish(False)
+        return self.stats
+
+
+def archive_consumer(archive: CandleArchive) -> BarConsumer:
+    """Consumer that appends closed bars to ``archive`` as 1m candles."""
+
+    def consume(bars: List[Bar]) -> None:
+        by_pair: Dict[str, List[Bar]] = {}
+        for bar in bars:
+            by_pair.setdefault(bar.pair, []).append(bar)
+        for pair, rows in by_pair.items():
+            columns = list(zip(*rows))
+            archive.series(pair, BASE_TIMEFRAME).append(
+                np.array(columns[1], dtype=np.int64),
+                *(np.array(values, dtype=np.float64) for values in columns[2:6]),
+                np.array(columns[6], dtype=np.int64)
+            )
+
+    return consume
+
+
+def series_consumer() -> BarConsumer:
+    """
+    Consumer that appends closed bars to each pair's 1m candle series.
+
+    Bars at or before the series' last bar are dropped (e.g. replayed
+    history), so the series only moves forward.
+    """
+
+    def consume(bars: List[Bar]) -> None:
+        by_pair: Dict[str, List[Bar]] = {}
+        for bar in bars:
+            by_pair.setdefault(bar.pair, []).append(bar)
+        for pair, rows in by_pair.items():
+            series = get_pair_series(pair, BASE_PRICES[pair])
+            last = series.base.last_timestamp
+            rows = [bar for bar in rows if last is None or bar.timestamp > last]
+            if not rows:
+                continue
+            columns = list(zip(*rows))
+            series.extend(
+                np.array(columns[1], dtype=np.int64),
+                *(np.array(values, dtype=np.float64) for values in columns[2:6]),
+                np.array(columns[6], dtype=np.int64)
+            )
+
+    return consume
+
+
+def create_tick_source() -> TickSource:
+    """The ``TICK_SOURCE`` configured in settings."""
+    if settings.TICK_SOURCE == "replay":
+        return ReplayTickSource(settings.TICK_REPLAY_PATH, settings.TICK_REPLAY_SPEED)
+    if settings.TICK_SOURCE == "simulator":
+        # Start from the candle series and take over closing its 1m bars, so
+        # tick prices and candles are one random walk.
+        prices = {}
+        for pair, base in BASE_PRICES.items():
+            series = get_pair_series(pair, base)
+            series.live = True
+            prices[pair] = float(series.base.close[-1])
+        return SimulatedTickSource(prices, settings.TICK_SIMULATOR_RATE)
+    raise ValueError(f"Unknown tick source {settings.TICK_SOURCE}")
+
+
+def create_tick_pipeline() -> TickPipeline:
+    pipeline = TickPipeline(create_tick_source, settings.TICK_LATENESS_SECONDS, prices=last_prices)
+    pipeline.subscribe(series_consumer())
+    if settings.TICK_ARCHIVE_BARS:
+        pipeline.subscribe(archive_consumer(candle_archive))
+    return pipeline
+
+
+tick_pipeline = create_tick_pipeline()
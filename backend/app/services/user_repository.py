@@ -0,0 +1,187 @@
+import itertools
+import sqlite3
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from starlette.concurrency import run_in_threadpool
+
+from ..core.config import settings
+from ..core.database import SQLiteConnectionPool
+
+
+UPDATABLE_FIELDS = ("full_name", "phone", "country", "subscription_tier")
+
+
+class EmailAlreadyRegistered(Exception):
+    pass
+
+
+class UserRepository(ABC):
+    """
+    User records indexed by both id and email.
+
+    Records are plain dicts with ``id``, ``email``, ``full_name``,
+    ``hashed_password``, ``created_at``, ``subscription_tier`` and the optional
+    ``phone``/``country`` profile fields.
+
+    Async code uses the ``*_async`` methods, which run repositories that
+    block on I/O (``blocking``) in a worker thread, off the event loop.
+    """
+
+    blocking = False
+
+    @abstractmethod
+    def create(self, email: str, hashed_password: str, full_name: Optional[str] = None) -> Dict[str, Any]:
+        """Insert a user with a newly allocated id; raises ``EmailAlreadyRegistered``."""
+
+    @abstractmethod
+    def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        """The user with ``user_id``, or None."""
+
+    @abstractmethod
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        """The user registered with ``email``, or None."""
+
+    @abstractmethod
+    def update(self, user_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        """Set the given profile fields and return the updated user, or None if missing."""
+
+    async def _call(self, method, *args: Any, **kwargs: Any) -> Any:
+        if self.blocking:
+            return await run_in_threadpool(method, *args, **kwargs)
+        return method(*args, **kwargs)
+
+    async def create_async(self, email: str, hashed_password: str, full_name: Optional[str] = None) -> Dict[str, Any]:
+        return await self._call(self.create, email, hashed_password, full_name)
+
+    async def get_by_id_async(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return await self._call(self.get_by_id, user_id)
+
+    async def get_by_email_async(self, email: str) -> Optional[Dict[str, Any]]:
+        return await self._call(self.get_by_email, email)
+
+    async def update_async(self, user_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        return await self._call(self.update, user_id, **fields)
+
+
+class InMemoryUserRepository(UserRepository):
+    def __init__(self):
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        self._by_email: Dict[str, Dict[str, Any]] = {}
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+
+    def create(self, email: str, hashed_password: str, full_name: Optional[str] = None) -> Dict[str, Any]:
+        with self._lock:
+            if email in self._by_email:
+                raise EmailAlreadyRegistered(email)
+            user = {
+                "id": f"user_{next(self._ids)}",
+                "email": email,
+                "full_name": full_name,
+                "hashed_password": hashed_password,
+                "created_at": datetime.now(),
+                "subscription_tier": "free"
+            }
+            self._by_id[user["id"]] = user
+            self._by_email[email] = user
+        return user
+
+    def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        return self._by_id.get(user_id)
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        return self._by_email.get(email)
+
+    def update(self, user_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        user = self._by_id.get(user_id)
+        if user is None:
+            return None
+        user.update({k: v for k, v in fields.items() if k in UPDATABLE_FIELDS})
+        return user
+
+
+class SQLiteUserRepository(UserRepository):
+    """
+    Users persisted in SQLite through a connection pool.
+
+    Ids come from the INTEGER PRIMARY KEY, so allocation is atomic across
+    concurrent signups and workers; email has a UNIQUE index.
+    """
+
+    blocking = True
+
+    def __init__(self, pool: SQLiteConnectionPool):
+        self._pool = pool
+        with self._pool.connection() as conn:
+            conn.execute("""
+                CREATE TABLE IF NOT EXISTS users (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    email TEXT NOT NULL UNIQUE,
+                    full_name TEXT,
+                    hashed_password TEXT NOT NULL,
+                    phone TEXT,
+                    country TEXT,
+                    subscription_tier TEXT NOT NULL DEFAULT 'free',
+                    created_at REAL NOT NULL
+                )
+            """)
+
+    @staticmethod
+    def _to_user(row) -> Optional[Dict[str, Any]]:
+        if row is None:
+            return None
+        user = dict(row)
+        user["id"] = f"user_{user['id']}"
+        user["created_at"] = datetime.fromtimestamp(user["created_at"])
+        return user
+
+    @staticmethod
+    def _row_id(user_id: str) -> Optional[int]:
+        prefix, _, number = user_id.partition("_")
+        return int(number) if prefix == "user" and number.isdigit() else None
+
+    def create(self, email: str, hashed_password: str, full_name: Optional[str] = None) -> Dict[str, Any]:
+        try:
+            with self._pool.connection() as conn:
+                cursor = conn.execute(
+                    "INSERT INTO users (email, full_name, hashed_password, created_at) VALUES (?, ?, ?, ?)",
+                    (email, full_name, hashed_password, datetime.now().timestamp())
+                )
+                row = conn.execute("SELECT * FROM users WHERE id = ?", (cursor.lastrowid,)).fetchone()
+        except sqlite3.IntegrityError:
+            raise EmailAlreadyRegistered(email)
+        return self._to_user(row)
+
+    def get_by_id(self, user_id: str) -> Optional[Dict[str, Any]]:
+        row_id = self._row_id(user_id)
+        if row_id is None:
+            return None
+        with self._pool.connection() as conn:
+            return self._to_user(conn.execute("SELECT * FROM users WHERE id = ?", (row_id,)).fetchone())
+
+    def get_by_email(self, email: str) -> Optional[Dict[str, Any]]:
+        with self._pool.connection() as conn:
+            return self._to_user(conn.execute("SELECT * FROM users WHERE email = ?", (email,)).fetchone())
+
+    def update(self, user_id: str, **fields: Any) -> Optional[Dict[str, Any]]:
+        row_id = self._row_id(user_id)
+        if row_id is None:
+            return None
+        changes = {k: v for k, v in fields.items() if k in UPDATABLE_FIELDS}
+        with self._pool.connection() as conn:
+            if changes:
+                assignments = ", ".join(f"{column} = ?" for column in changes)
+                conn.execute(f"UPDATE users SET {assignments} WHERE id = ?", (*changes.values(), row_id))
+            return self._to_user(conn.execute("SELECT * FROM users WHERE id = ?", (row_id,)).fetchone())
+
+
+def create_user_repository() -> UserRepository:
+    if settings.USER_BACKEND == "sqlite":
+        return SQLiteUserRepository(SQLiteConnectionPool(settings.USER_DB_PATH, settings.SQLITE_POOL_SIZE))
+    return InMemoryUserRepository()
+
+
+user_repository = create_user_repository()
@@ -0,0 +1,56 @@
+"""
+Indicator engine benchmark.
+
+Times the full vectorized recompute over N candles per pair and the O(1)
+incremental update for a single new candle.
+
+Usage (from backend/):
+    python -m benchmarks.bench_indicators --candles 10000 --pairs 10
+"""
+import argparse
+import time
+
+import numpy as np
+
+from app.services import indicators
+from app.services.candle_store import simulate_candles
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--candles", type=int, default=10000)
+    parser.add_argument("--pairs", type=int, default=10)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(42)
+    series = [simulate_candles(1.1, 0, 60, args.candles, rng) for _ in range(args.pairs)]
+
+    start = time.perf_counter()
+    for _ in range(args.repeat):
+        for _, _, high, low, close, _ in series:
+            indicators.rsi(close)
+            indicators.macd(close)
+            indicators.bollinger_bands(close)
+            indicators.atr(high, low, close)
+            for period in indicators.EMA_PERIODS:
+                indicators.ema(close, period)
+            indicators.sma(close, indicators.BOLLINGER_PERIOD)
+    full_ms = (time.perf_counter() - start) / args.repeat * 1000
+
+    states = [indicators.IndicatorState.from_arrays(h, l, c) for _, _, h, l, c, _ in series]
+    updates = 10000
+    start = time.perf_counter()
+    for i in range(updates):
+        state = states[i % len(states)]
+        state.update(1.101, 1.099, 1.1)
+        state.snapshot()
+    update_us = (time.perf_counter() - start) / updates * 1e6
+
+    print(f"full recompute: {args.pairs} pairs x {args.candles} candles in {full_ms:.2f} ms "
+          f"({full_ms / args.pairs:.2f} ms/pair)")
+    print(f"incremental update + snapshot: {update_us:.1f} us/candle")
+
+
+if __name__ == "__main__":
+    main()
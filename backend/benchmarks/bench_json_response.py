@@ -0,0 +1,70 @@
+"""
+JSON response path benchmark for the 10k-candle case.
+
+Encodes one market data payload (10k candles of the pair's 1m series plus
+indicators) three ways and reports responses per second:
+
+- stdlib: ``jsonable_encoder`` + ``json.dumps``, FastAPI's default path
+- orjson: ``ORJSONResponse`` encoding of the same dict
+- cached: ``get_market_data_payload`` hit on the pre-encoded payload cache
+
+Usage (from backend/):
+    python -m benchmarks.bench_json_response --candles 10000 --iterations 200
+"""
+import argparse
+import json
+import time
+
+from fastapi.encoders import jsonable_encoder
+
+from app.core.responses import EncodedPayloadCache, dumps
+from app.services.market_service import BASE_PRICES
+from app.services.resampler import get_pair_series
+from app.services.indicators import get_indicator_state
+
+
+def _per_second(fn, iterations):
+    start = time.perf_counter()
+    for _ in range(iterations):
+        fn()
+    return iterations / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--pair", default="EUR/USD")
+    parser.add_argument("--candles", type=int, default=10000)
+    parser.add_argument("--iterations", type=int, default=200)
+    args = parser.parse_args()
+
+    series = get_pair_series(args.pair, BASE_PRICES[args.pair])
+    store = series.get("1m")
+
+    def build():
+        return {
+            "pair": args.pair,
+            "timeframe": "1m",
+            "candles": store.to_columns(args.candles),
+            "forming": series.forming("1m"),
+            "indicators": get_indicator_state(store).snapshot()
+        }
+
+    payload = build()
+    size = len(dumps(payload))
+    cache = EncodedPayloadCache(max_bytes=size)
+    cached = lambda: cache.get(args.pair, series.version, lambda: dumps(build()))
+
+    rates = {
+        "stdlib (build + jsonable_encoder + json.dumps)": _per_second(
+            lambda: json.dumps(jsonable_encoder(build())).encode("utf-8"), args.iterations),
+        "orjson (build + ORJSONResponse encode)": _per_second(lambda: dumps(build()), args.iterations),
+        "cached (pre-encoded bytes)": _per_second(cached, args.iterations),
+    }
+
+    print(f"{len(payload['candles']['close'])} candles, {size / 1024:.0f} KiB body")
+    for name, rate in rates.items():
+        print(f"{name:48s} {rate:10.0f} responses/s")
+
+
+if __name__ == "__main__":
+    main()
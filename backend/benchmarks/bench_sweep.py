@@ -0,0 +1,64 @@
+"""
+Parameter sweep / walk-forward benchmark.
+
+Runs the full grid (``optimizer.DEFAULT_SPACE``, less the EMA lengths each
+strategy ignores) for every pair and strategy on a process pool, once per worker count, and reports backtests per second
+and the speedup over one worker. Prints the top results by ``--metric``;
+``--folds`` switches to walk-forward optimization.
+
+Usage (from backend/):
+    python -m benchmarks.bench_sweep --timeframe 1h --years 1 --workers 1 2 4 8
+    python -m benchmarks.bench_sweep --folds 4 --random 50 --workers 8
+"""
+import argparse
+import os
+import time
+
+from app.schemas.trading import StrategyEnum
+from app.services.market_service import BASE_PRICES
+from app.services.optimizer import SweepRunner, grid, random_search, strategy_combos
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--timeframe", default="1h")
+    parser.add_argument("--years", type=float, default=1.0)
+    parser.add_argument("--pairs", type=int, default=len(BASE_PRICES))
+    parser.add_argument("--random", type=int, default=0, help="sample this many combinations instead of the full grid")
+    parser.add_argument("--folds", type=int, default=0, help="walk-forward folds; 0 runs a plain sweep")
+    parser.add_argument("--metric", default="sharpe_ratio")
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, os.cpu_count() or 1])
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    pairs = list(BASE_PRICES)[:args.pairs]
+    strategies = list(StrategyEnum)
+    combos = random_search(args.random, seed=42) if args.random else grid()
+    strategy_count = sum(len(strategy_combos(strategy, combos)) for strategy in strategies)
+    backtests = len(pairs) * strategy_count * max(1, args.folds)
+    print(f"{len(pairs)} pairs x {len(strategies)} strategies ({strategy_count} strategy combos)"
+          f"{f' x {args.folds} folds' if args.folds else ''} = {backtests} backtests "
+          f"({args.years}y of {args.timeframe})")
+
+    baseline = None
+    for workers in args.workers:
+        runner = SweepRunner(args.timeframe, args.years, workers=workers)
+        start = time.perf_counter()
+        if args.folds:
+            results = runner.walk_forward(pairs, strategies, combos, folds=args.folds, metric=args.metric)
+        else:
+            results = runner.sweep(pairs, strategies, combos, metric=args.metric)
+        elapsed = time.perf_counter() - start
+        baseline = baseline or elapsed
+        print(f"{workers:3d} workers  {elapsed:8.2f} s  {backtests / elapsed:10.0f} backtests/s  speedup {baseline / elapsed:5.2f}x")
+
+    print(f"\ntop {args.top} by {args.metric}{' (out of sample)' if args.folds else ''}:")
+    for result in results[:args.top]:
+        stats = result.out_of_sample if args.folds else result.stats
+        fold = f" fold {result.fold}" if args.folds else ""
+        print(f"  {result.pair:8s} {result.strategy.value:17s}{fold} {tuple(result.params)}  "
+              f"{args.metric}={getattr(stats, args.metric):.3f} trades={stats.total_trades}")
+
+
+if __name__ == "__main__":
+    main()
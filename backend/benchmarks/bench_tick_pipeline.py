@@ -0,0 +1,88 @@
+"""
+Tick pipeline benchmark.
+
+Aggregation: pushes pre-generated ticks for the 10 pairs (out of order
+within the lateness window, covering many 1m bars) through
+``TickPipeline.process`` and reports ticks/s on one core.
+
+Live: runs the simulator source at ``--rate`` ticks/s on the event loop for
+``--seconds``, so tick generation, aggregation and bar publishing share the
+core, and reports the throughput achieved and the tick lag behind the wall
+clock.
+
+Usage (from backend/):
+    python -m benchmarks.bench_tick_pipeline --ticks 2000000 --rate 60000 --seconds 10
+"""
+import argparse
+import asyncio
+import time
+
+from app.core.metrics import metrics
+from app.services.market_service import BASE_PRICES
+from app.services.tick_pipeline import SimulatedTickSource, TickPipeline
+
+
+def quantile(name: str, q: float) -> float:
+    """Upper bucket bound below which ``q`` of the ``name`` span observations fall."""
+    histogram = metrics._spans.get(name)
+    if histogram is None or not histogram.count:
+        return 0.0
+    seen = 0
+    for bound, count in zip(histogram.buckets + (float("inf"),), histogram.counts):
+        seen += count
+        if seen >= q * histogram.count:
+            return bound
+    return float("inf")
+
+
+def bench_aggregation(ticks: int, batch_size: int, lateness: float) -> None:
+    source = SimulatedTickSource(BASE_PRICES, rate=0, jitter=lateness, seed=1)
+    # 0.25s of event time per batch: bars close regularly and ticks overlap bucket ends.
+    batches = [source.generate(batch_size, 1_700_000_000 + i * 0.25) for i in range(ticks // batch_size)]
+    pipeline = TickPipeline(lambda: source, lateness)
+    bars = []
+    pipeline.subscribe(bars.extend)
+
+    start = time.perf_counter()
+    for batch in batches:
+        pipeline.process(batch, live=False)
+    elapsed = time.perf_counter() - start
+
+    stats = pipeline.stats
+    print(f"aggregation: {stats.ticks:,} ticks in {elapsed:.2f}s = {stats.ticks / elapsed:,.0f} ticks/s "
+          f"({elapsed / stats.ticks * 1e6:.2f} us/tick), {len(bars)} bars, {stats.late} late")
+
+
+async def bench_live(rate: float, seconds: float, lateness: float) -> None:
+    metrics.reset()
+    source = SimulatedTickSource(BASE_PRICES, rate=rate, seed=2)
+    pipeline = TickPipeline(lambda: source, lateness)
+    pipeline.start()
+    await asyncio.sleep(seconds)
+    await pipeline.stop()
+
+    stats = pipeline.stats
+    lag = metrics._spans["ticks.lag"]
+    print(f"live: target {rate:,.0f} ticks/s, achieved {stats.ticks_per_second:,.0f} ticks/s over {seconds:.0f}s "
+          f"({stats.batches} batches, {stats.bars} bars published)")
+    print(f"tick lag (incl. {source.jitter}s source jitter): mean {lag.sum / lag.count * 1000:.1f} ms, "
+          f"p50 <= {quantile('ticks.lag', 0.5) * 1000:.0f} ms, p99 <= {quantile('ticks.lag', 0.99) * 1000:.0f} ms")
+    batch = metrics._spans["ticks.batch"]
+    print(f"batch processing: mean {batch.sum / batch.count * 1000:.2f} ms, p99 <= {quantile('ticks.batch', 0.99) * 1000:.1f} ms")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--ticks", type=int, default=2_000_000)
+    parser.add_argument("--batch-size", type=int, default=1024)
+    parser.add_argument("--rate", type=float, default=60_000)
+    parser.add_argument("--seconds", type=float, default=10)
+    parser.add_argument("--lateness", type=float, default=2.0)
+    args = parser.parse_args()
+
+    bench_aggregation(args.ticks, args.batch_size, args.lateness)
+    asyncio.run(bench_live(args.rate, args.seconds, args.lateness))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+"""
+Login storm load test.
+
+Measures /trading/pairs latency on its own, then again while a burst of
+concurrent logins is running, against the app in-process (same event loop).
+With password hashing on the worker pool the p99 should stay roughly flat.
+
+Usage (from backend/):
+    python -m benchmarks.load_login_storm --logins 200 --probes 200
+"""
+import argparse
+import asyncio
+import time
+
+import httpx
+
+from app.main import app
+
+
+def _percentile(samples, pct):
+    ordered = sorted(samples)
+    return ordered[min(len(ordered) - 1, int(len(ordered) * pct / 100))] * 1000
+
+
+async def _probe(client, count, interval=0.005):
+    latencies = []
+    for _ in range(count):
+        start = time.perf_counter()
+        await client.get("/trading/pairs")
+        latencies.append(time.perf_counter() - start)
+        await asyncio.sleep(interval)
+    return latencies
+
+
+async def _login(client, email, password):
+    await client.post("/auth/login", json={"email": email, "password": password})
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--logins", type=int, default=200)
+    parser.add_argument("--probes", type=int, default=200)
+    args = parser.parse_args()
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+        email, password = "storm@example.com", "storm-password"
+        await client.post("/auth/signup", json={"email": email, "password": password})
+
+        idle = await _probe(client, args.probes)
+
+        start = time.perf_counter()
+        storm = asyncio.gather(*(_login(client, email, password) for _ in range(args.logins)))
+        during = await _probe(client, args.probes)
+        await storm
+        elapsed = time.perf_counter() - start
+
+    print(f"/trading/pairs idle:        p50 {_percentile(idle, 50):7.2f} ms  p99 {_percentile(idle, 99):7.2f} ms")
+    print(f"/trading/pairs login storm: p50 {_percentile(during, 50):7.2f} ms  p99 {_percentile(during, 99):7.2f} ms")
+    print(f"{args.logins} logins completed in {elapsed:.2f} s")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
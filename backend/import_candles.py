@@ -0,0 +1,79 @@
+"""
+Bulk import of historical bars or ticks into the candle archive.
+
+Streams CSV or Parquet broker exports in fixed-size chunks, so memory stays
+bounded whatever the file size. Columns are matched by header name
+(timestamp or date + time, open/high/low/close[/volume] or bid/ask, and an
+optional pair/symbol column); headerless files need ``--columns``. Pairs
+must be TradingPairEnum pairs; rows for other symbols are rejected and
+counted. Ticks are aggregated into ``--timeframe`` bars, and rows that
+overlap data already in the archive are skipped. The archive only grows
+forward in time: bars older than its first bar are reported, not written.
+
+Usage (from backend/):
+    python import_candles.py exports/EURUSD_M1.csv --pair EUR/USD
+    python import_candles.py ticks.parquet --timeframe 1m --tz-offset 120
+    python import_candles.py raw.csv --pair GBP/USD --columns date,time,open,high,low,close,volume
+"""
+import argparse
+import sys
+
+from app.core.config import settings
+from app.services.candle_archive import CandleArchive
+from app.services.candle_import import CandleImportError, CandleImporter, ImportStats, canonical_pair, import_file
+from app.services.candle_store import TIMEFRAME_SECONDS
+
+
+def _report(stats: ImportStats, end: str = "\r") -> None:
+    sys.stderr.write(
+        f"{stats.rows_read:>12,} rows  {stats.bars_written:>11,} bars written  "
+        f"{stats.rows_per_second:>10,.0f} rows/s{end}"
+    )
+    sys.stderr.flush()
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="CSV or Parquet files")
+    parser.add_argument("--pair", help="pair for files without a pair column, e.g. EUR/USD")
+    parser.add_argument("--timeframe", default="1m", choices=list(TIMEFRAME_SECONDS))
+    parser.add_argument("--columns", help="comma-separated column names for headerless CSV")
+    parser.add_argument("--delimiter", default=",")
+    parser.add_argument("--tz-offset", type=int, default=0, help="UTC offset of the input timestamps, in minutes")
+    parser.add_argument("--chunk-mb", type=int, default=4, help="input read per chunk; peak memory is roughly 16x this")
+    parser.add_argument("--archive-dir", default=settings.ARCHIVE_DIR)
+    args = parser.parse_args()
+
+    pair = None
+    if args.pair is not None:
+        pair = canonical_pair(args.pair)
+        if pair is None:
+            parser.error(f"unknown pair {args.pair}")
+
+    archive = CandleArchive(args.archive_dir, settings.ARCHIVE_INDEX_STRIDE)
+    importer = CandleImporter(archive, args.timeframe, pair, args.tz_offset)
+    columns = args.columns.split(",") if args.columns else None
+    try:
+        for path in args.paths:
+            import_file(importer, path, args.chunk_mb * 1024 * 1024, columns, args.delimiter, progress=_report)
+        stats = importer.finish()
+    except (CandleImportError, OSError) as exc:
+        sys.stderr.write(f"\nimport failed: {exc}\n")
+        return 1
+
+    _report(stats, end="\n")
+    print(
+        f"{stats.rows_read:,} rows in {stats.elapsed:.1f} s ({stats.rows_per_second:,.0f} rows/s): "
+        f"{stats.bars_written:,} {args.timeframe} bars written, {stats.bars_skipped:,} already archived, "
+        f"{stats.rows_duplicate:,} duplicate and {stats.rows_invalid:,} invalid rows"
+    )
+    if stats.bars_before_archive:
+        sys.stderr.write(
+            f"warning: {stats.bars_before_archive:,} bars predate the archive and were not written; "
+            f"the archive is append-only, so import history oldest first or into an empty --archive-dir\n"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
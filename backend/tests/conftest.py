@@ -0,0 +1,17 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.services import ai_providers  # noqa: E402
+
+
+@pytest.fixture
+def providers():
+    """Registered providers are restored after the test."""
+    saved = dict(ai_providers._providers)
+    yield ai_providers
+    ai_providers._providers.clear()
+    ai_providers._providers.update(saved)
@@ -0,0 +1,161 @@
+import asyncio
+import logging
+import time
+from typing import Any, Dict, List, Optional
+
+import pytest
+
+from app.schemas.trading import AIModelResult
+from app.services.ai_providers import AIProvider, parse_model_reply
+from app.services.ai_service import generate_mock_analysis, replay_analysis, stream_analysis
+
+
+class StubProvider(AIProvider):
+    """Answers with a fixed recommendation after ``delay`` seconds, or raises ``error``."""
+
+    def __init__(
+        self,
+        model: str,
+        recommendation: str = "BUY",
+        delay: float = 0.0,
+        error: Optional[Exception] = None,
+        timeout: Optional[float] = None
+    ):
+        super().__init__(model, timeout)
+        self.recommendation = recommendation
+        self.delay = delay
+        self.error = error
+        self.contexts: List[Dict[str, Any]] = []
+
+    async def analyze(self, context: Dict[str, Any]) -> AIModelResult:
+        self.contexts.append(context)
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.error is not None:
+            raise self.error
+        return AIModelResult(model=self.model, recommendation=self.recommendation, confidence=0.8, reasoning="stub")
+
+
+def analyze(models: List[str]):
+    return asyncio.run(generate_mock_analysis("EUR/USD", "1h", "trend_following", models))
+
+
+def test_provider_must_implement_analyze():
+    with pytest.raises(TypeError):
+        AIProvider("incomplete")
+
+
+def test_single_model_reaches_provider(providers):
+    stub = StubProvider("stub-a", recommendation="SELL")
+    providers.register_provider(stub)
+
+    result = analyze(["stub-a"])
+
+    assert len(stub.contexts) == 1
+    assert stub.contexts[0]["pair"] == "EUR/USD"
+    assert [m.model for m in result.multi_model.models] == ["stub-a"]
+    assert result.multi_model.consensus == "SELL"
+
+
+def test_no_models_skips_providers(providers):
+    stub = StubProvider("stub-a")
+    providers.register_provider(stub)
+
+    result = analyze([])
+
+    assert stub.contexts == []
+    assert result.multi_model is None
+
+
+def test_consensus_over_models_that_answered(providers):
+    for model, recommendation in (("stub-a", "BUY"), ("stub-b", "BUY"), ("stub-c", "SELL")):
+        providers.register_provider(StubProvider(model, recommendation=recommendation))
+
+    consensus = analyze(["stub-a", "stub-b", "stub-c"]).multi_model
+
+    assert consensus.consensus == "BUY"
+    assert consensus.avg_confidence == 0.8
+    assert [m.model for m in consensus.models] == ["stub-a", "stub-b", "stub-c"]
+
+
+def test_models_run_concurrently_under_their_own_timeouts(providers):
+    providers.register_provider(StubProvider("fast", delay=0.2))
+    providers.register_provider(StubProvider("also-fast", delay=0.2))
+    providers.register_provider(StubProvider("slow", delay=5.0, timeout=0.3))
+
+    start = time.perf_counter()
+    consensus = analyze(["fast", "also-fast", "slow"]).multi_model
+    elapsed = time.perf_counter() - start
+
+    assert elapsed < 1.0
+    assert [m.model for m in consensus.models] == ["fast", "also-fast"]
+    assert consensus.timed_out == ["slow"]
+
+
+def test_waiting_for_a_slot_counts_against_the_timeout(providers):
+    saturated = StubProvider("saturated", timeout=0.3)
+    saturated.slots = asyncio.Semaphore(0)
+    providers.register_provider(saturated)
+    providers.register_provider(StubProvider("ok"))
+
+    start = time.perf_counter()
+    consensus = analyze(["ok", "saturated"]).multi_model
+
+    assert time.perf_counter() - start < 1.0
+    assert consensus.timed_out == ["saturated"]
+    assert saturated.contexts == []
+
+
+def test_failing_model_is_reported_and_logged(providers, caplog):
+    providers.register_provider(StubProvider("ok"))
+    providers.register_provider(StubProvider("broken", error=RuntimeError("upstream 500")))
+
+    with caplog.at_level(logging.ERROR, logger="app.services.ai_service"):
+        consensus = analyze(["ok", "broken"]).multi_model
+
+    assert consensus.failed == ["broken"]
+    assert [m.model for m in consensus.models] == ["ok"]
+    assert "broken" in caplog.text and "upstream 500" in caplog.text
+
+
+def test_no_model_answering_is_unavailable(providers):
+    providers.register_provider(StubProvider("broken", error=ValueError("bad reply")))
+
+    consensus = analyze(["broken"]).multi_model
+
+    assert consensus.consensus == "UNAVAILABLE"
+    assert consensus.models == []
+
+
+def test_stream_yields_models_in_completion_order(providers):
+    providers.register_provider(StubProvider("slow", delay=0.2))
+    providers.register_provider(StubProvider("fast", delay=0.0))
+
+    async def collect():
+        return [(event, payload) async for event, payload in stream_analysis("EUR/USD", "1h", "swing", ["slow", "fast"])]
+
+    events = asyncio.run(collect())
+
+    assert [event for event, _ in events] == ["indicators", "model", "model", "consensus", "risk", "result"]
+    assert [payload.model for event, payload in events if event == "model"] == ["fast", "slow"]
+
+
+def test_replay_yields_the_stream_events_of_a_result(providers):
+    providers.register_provider(StubProvider("stub-a"))
+    result = analyze(["stub-a"])
+
+    async def collect():
+        return [(event, payload) async for event, payload in replay_analysis(result)]
+
+    events = asyncio.run(collect())
+
+    assert [event for event, _ in events] == ["indicators", "model", "consensus", "risk", "result"]
+    assert events[-1][1] is result
+
+
+def test_parse_model_reply_clamps_and_defaults():
+    result = parse_model_reply("m", 'Sure! {"recommendation": "strong buy", "confidence": 1.7, "reasoning": "x"}')
+
+    assert result.recommendation == "HOLD"
+    assert result.confidence == 1.0
+    assert result.reasoning == "x"
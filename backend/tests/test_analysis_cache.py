@@ -0,0 +1,42 @@
+import asyncio
+import time
+from datetime import datetime, timezone
+
+from app.schemas.trading import AnalysisRequest
+from app.services.ai_service import generate_mock_analysis
+from app.services.analysis_cache import AnalysisCache, analysis_cache_key
+
+
+def test_weekly_key_follows_the_monday_candle():
+    request = AnalysisRequest(pair="EUR/USD", timeframe="1w", strategy="swing")
+    sunday = datetime(2024, 1, 7, 23, 59, tzinfo=timezone.utc).timestamp()
+    monday = datetime(2024, 1, 8, 0, 1, tzinfo=timezone.utc).timestamp()
+
+    sunday_key, sunday_expiry = analysis_cache_key(request, sunday)
+    monday_key, _ = analysis_cache_key(request, monday)
+
+    assert sunday_key != monday_key
+    assert sunday_expiry == datetime(2024, 1, 8, tzinfo=timezone.utc).timestamp()
+    assert monday_key[-1] == datetime(2024, 1, 8, tzinfo=timezone.utc).timestamp()
+
+
+def test_lookup_shares_an_in_flight_computation():
+    cache = AnalysisCache(max_bytes=1 << 20)
+    calls = []
+
+    async def compute():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return await generate_mock_analysis("EUR/USD", "1h", "swing")
+
+    async def run():
+        computing = asyncio.ensure_future(cache.get_or_compute("k", time.time() + 60, compute))
+        await asyncio.sleep(0)
+        shared = await cache.lookup("k")
+        return shared, await computing, await cache.lookup("k"), await cache.lookup("other")
+
+    shared, computed, cached, missing = asyncio.run(run())
+
+    assert calls == [1]
+    assert shared is computed is cached
+    assert missing is None
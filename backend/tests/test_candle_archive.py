@@ -0,0 +1,27 @@
+import numpy as np
+
+from app.services.candle_archive import CandleArchive
+
+
+def bars(start: int, count: int):
+    timestamps = np.arange(start, start + 60 * count, 60)
+    prices = timestamps.astype(np.float64)
+    return timestamps, prices, prices, prices, prices, np.ones(count, dtype=np.int64)
+
+
+def test_appends_from_another_writer_are_seen_and_kept(tmp_path):
+    # Two archives over one directory stand in for the server and the import CLI.
+    server = CandleArchive(str(tmp_path), 16).series("EUR/USD", "1m")
+    importer = CandleArchive(str(tmp_path), 16).series("EUR/USD", "1m")
+
+    assert server.append(*bars(0, 100)) == 100
+    assert importer.append(*bars(6000, 50)) == 50
+    assert len(server) == 150
+    assert server.last_timestamp == 6000 + 60 * 49
+
+    assert server.append(*bars(6000, 60)) == 10
+    reopened = CandleArchive(str(tmp_path), 16).series("EUR/USD", "1m")
+    timestamps = reopened.range()["timestamp"]
+    assert len(timestamps) == 160
+    assert np.all(np.diff(timestamps) == 60)
+    assert np.array_equal(reopened.range()["close"], timestamps.astype(np.float64))
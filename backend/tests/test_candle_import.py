@@ -0,0 +1,38 @@
+import numpy as np
+
+from app.services.candle_archive import CandleArchive
+from app.services.candle_import import CandleImporter
+
+
+def test_sub_second_ticks_aggregate_into_one_bar(tmp_path):
+    importer = CandleImporter(CandleArchive(str(tmp_path), 16), "1m", "EUR/USD")
+    timestamps = 1_700_000_040 + np.arange(600) * 0.1
+    bid = 1.1 + np.arange(600) * 1e-5
+    ask = bid + 2e-5
+    for start in range(0, 600, 150):
+        rows = slice(start, start + 150)
+        importer.feed({"timestamp": timestamps[rows], "bid": bid[rows], "ask": ask[rows]})
+    # Re-fed rows are exact repeats and must not add volume.
+    importer.feed({"timestamp": timestamps[-3:], "bid": bid[-3:], "ask": ask[-3:]})
+    stats = importer.finish()
+
+    bars = importer.archive.series("EUR/USD", "1m").range()
+    assert stats.rows_duplicate == 3
+    assert list(bars["timestamp"]) == [1_700_000_040]
+    assert list(bars["volume"]) == [600]
+    assert bars["open"][0] == (bid[0] + ask[0]) / 2
+    assert bars["high"][0] == bars["close"][0] == (bid[-1] + ask[-1]) / 2
+
+
+def test_bars_older_than_the_archive_are_counted_separately(tmp_path):
+    archive = CandleArchive(str(tmp_path), 16)
+    ones = np.ones(2)
+    archive.series("EUR/USD", "1m").append(np.array([1_700_000_040, 1_700_000_100]), ones, ones, ones, ones, ones)
+
+    importer = CandleImporter(archive, "1m", "EUR/USD")
+    timestamps = np.array([1_699_000_000, 1_699_000_060, 1_700_000_040, 1_700_000_160], dtype=np.float64)
+    prices = np.ones(4)
+    importer.feed({"timestamp": timestamps, "open": prices, "high": prices, "low": prices, "close": prices})
+    stats = importer.finish()
+
+    assert (stats.bars_written, stats.bars_skipped, stats.bars_before_archive) == (1, 1, 2)
@@ -0,0 +1,21 @@
+import pytest
+
+from app.core import compression
+from app.core.compression import negotiate_encoding
+
+
+def test_negotiation_prefers_highest_q_then_br():
+    assert negotiate_encoding("gzip;q=0.5, br;q=0.9") == ("br" if compression.brotli else "gzip")
+    assert negotiate_encoding("gzip, br") == ("br" if compression.brotli else "gzip")
+    assert negotiate_encoding("identity") is None
+    assert negotiate_encoding("gzip;q=0") is None
+
+
+@pytest.mark.parametrize("headers, expected", [
+    ([], [(b"vary", b"Accept-Encoding")]),
+    ([(b"Vary", b"Origin")], [(b"vary", b"Origin, Accept-Encoding")]),
+    ([(b"vary", b"accept-encoding")], [(b"vary", b"accept-encoding")]),
+    ([(b"etag", b'"x"'), (b"vary", b"*")], [(b"etag", b'"x"'), (b"vary", b"*")]),
+])
+def test_with_vary_merges_accept_encoding(headers, expected):
+    assert compression._with_vary(headers) == expected
@@ -0,0 +1,83 @@
+import asyncio
+import threading
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.database import SQLiteConnectionPool
+from app.schemas.trading import AnalysisResult
+from app.services.history_store import InMemoryHistoryStore, SQLiteHistoryStore
+
+
+def make_analysis(i: int, created_at: datetime) -> AnalysisResult:
+    return AnalysisResult(
+        id=f"analysis_{i}",
+        pair="EUR/USD",
+        timeframe="1h",
+        strategy="swing",
+        recommendation="HOLD",
+        confidence=0.7,
+        entry_price=1.1,
+        key_levels={"support": [], "resistance": []},
+        analysis_summary="",
+        scenarios=[],
+        created_at=created_at
+    )
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteHistoryStore(SQLiteConnectionPool(str(tmp_path / "history.db"), 2), max_per_user=100)
+    return InMemoryHistoryStore(max_per_user=100)
+
+
+def test_timezone_aware_range_matches_naive_entries(store):
+    now = datetime.now()
+    for i in range(5):
+        store.add("u", make_analysis(i, now - timedelta(hours=4 - i)))
+
+    start = (now - timedelta(hours=2, minutes=30)).astimezone(timezone.utc)
+    results, _ = store.query("u", start=start)
+
+    assert [a.id for a in results] == ["analysis_4", "analysis_3", "analysis_2"]
+
+
+def test_cursor_pages_and_rejects_garbage(store):
+    now = datetime.now()
+    for i in range(5):
+        store.add("u", make_analysis(i, now))
+
+    first, cursor = store.query("u", limit=3)
+    second, last = store.query("u", limit=3, cursor=cursor)
+
+    assert [a.id for a in first + second] == [f"analysis_{i}" for i in range(4, -1, -1)]
+    assert last is None
+    for bad in ("abc", "-1", "²"):
+        with pytest.raises(ValueError):
+            store.query("u", cursor=bad)
+
+
+def test_async_methods_run_blocking_stores_off_the_event_loop(store):
+    add_threads = []
+
+    def record(original):
+        def wrapped(*args, **kwargs):
+            add_threads.append(threading.get_ident())
+            return original(*args, **kwargs)
+        return wrapped
+
+    store.add = record(store.add)
+
+    async def run():
+        main = threading.get_ident()
+        await store.add_async("u", make_analysis(0, datetime.now()))
+        with pytest.raises(ValueError):
+            await store.query_async("u", cursor="abc")
+        results, _ = await store.query_async("u", limit=5)
+        return main, results
+
+    main, results = asyncio.run(run())
+
+    assert [a.id for a in results] == ["analysis_0"]
+    assert (add_threads[0] != main) == store.blocking
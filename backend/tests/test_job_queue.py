@@ -0,0 +1,69 @@
+import asyncio
+
+import pytest
+from pydantic import BaseModel
+
+from app.core.database import SQLiteConnectionPool
+from app.schemas.billing import PlanType
+from app.schemas.trading import JobStatus
+from app.services.job_queue import InMemoryJobStore, JobQueue, SQLiteJobStore
+
+
+class Echo(BaseModel):
+    value: int
+
+
+@pytest.fixture(params=["memory", "sqlite"])
+def store(request, tmp_path):
+    if request.param == "sqlite":
+        return SQLiteJobStore(SQLiteConnectionPool(str(tmp_path / "jobs.db"), 2))
+    return InMemoryJobStore(max_jobs=100)
+
+
+def run_jobs(queue: JobQueue, payloads):
+    async def run():
+        jobs = [queue.submit("u", "echo", payload, PlanType.FREE) for payload in payloads]
+        for _ in range(100):
+            if all(queue.get(job["id"])["status"] in (JobStatus.COMPLETED, JobStatus.FAILED) for job in jobs):
+                break
+            await asyncio.sleep(0.01)
+        await queue.stop()
+        return [queue.get(job["id"]) for job in jobs]
+
+    return asyncio.run(run())
+
+
+def test_finished_jobs_drop_their_payload(store):
+    async def echo(user_id, payload):
+        if payload["value"] < 0:
+            raise ValueError("negative")
+        return Echo(value=payload["value"])
+
+    queue = JobQueue(store, workers=1)
+    queue.register("echo", echo)
+
+    done, failed = run_jobs(queue, [{"value": 1, "images": ["x" * 1000]}, {"value": -1}])
+
+    assert (done["status"], done["result"], done["payload"]) == (JobStatus.COMPLETED, {"value": 1}, {})
+    assert (failed["status"], failed["error"], failed["payload"]) == (JobStatus.FAILED, "negative", {})
+
+
+def test_store_errors_outside_the_handler_fail_the_job(store, caplog):
+    async def echo(user_id, payload):
+        return Echo(value=payload["value"])
+
+    save = store.save
+
+    def flaky_save(job):
+        if job["status"] == JobStatus.RUNNING:
+            raise RuntimeError("disk full")
+        save(job)
+
+    store.save = flaky_save
+    queue = JobQueue(store, workers=1)
+    queue.register("echo", echo)
+
+    job, = run_jobs(queue, [{"value": 1}])
+
+    assert job["status"] == JobStatus.FAILED
+    assert "failed outside its handler" in caplog.text
@@ -0,0 +1,58 @@
+import numpy as np
+import pytest
+
+from app.schemas.trading import StrategyEnum
+from app.services.backtest import BacktestParams, backtest_arrays
+from app.services.candle_store import simulate_candles
+from app.services.optimizer import grid, strategy_combos, walk_forward_windows
+
+
+def test_walk_forward_windows_tile_the_end_of_the_series():
+    windows = walk_forward_windows(1000, 4, 0.75)
+    assert windows[-1][2] == 1000
+    for (_, train_end, test_end), (_, next_train_end, _) in zip(windows, windows[1:]):
+        assert test_end == next_train_end
+        assert test_end > train_end
+
+
+@pytest.mark.parametrize("count, folds", [(1000, 0), (1000, -1), (3, 4)])
+def test_walk_forward_windows_reject_empty_folds(count, folds):
+    with pytest.raises(ValueError):
+        walk_forward_windows(count, folds)
+
+
+def test_window_is_scored_on_warmed_up_signals():
+    rng = np.random.default_rng(7)
+    timestamps, _, high, low, close, _ = simulate_candles(1.1, 1_700_000_000, 3600, 2000, rng)
+    params = BacktestParams()
+    window = slice(1500, 2000)
+
+    trades, _ = backtest_arrays(timestamps, high, low, close, StrategyEnum.TREND_FOLLOWING, params, window=window)
+    sliced, _ = backtest_arrays(
+        timestamps[window], high[window], low[window], close[window], StrategyEnum.TREND_FOLLOWING, params
+    )
+
+    # Signals from the full series can fire from the first bar of the window;
+    # the sliced run is still warming up its slow EMA there.
+    assert len(trades.pnl)
+    assert trades.entry_index[0] < params.slow_ema <= sliced.entry_index[0]
+
+
+def test_strategies_only_sweep_the_ema_lengths_they_read():
+    rng = np.random.default_rng(3)
+    timestamps, _, high, low, close, _ = simulate_candles(1.1, 1_700_000_000, 3600, 1500, rng)
+    combos = grid()
+
+    for strategy in StrategyEnum:
+        reduced = strategy_combos(strategy, combos)
+        signatures = {(params.stop_atr, params.reward) for params in combos}
+        assert len(set(reduced)) == len(reduced) >= len(signatures)
+        # Every dropped combination backtests the same as the one it collapsed into.
+        for params in combos[::7]:
+            kept = strategy_combos(strategy, [params])[0]
+            assert kept in reduced
+            trades, _ = backtest_arrays(timestamps, high, low, close, strategy, params)
+            same, _ = backtest_arrays(timestamps, high, low, close, strategy, kept)
+            assert np.array_equal(trades.pnl, same.pnl)
+
+    assert len(strategy_combos(StrategyEnum.SCALPING, combos)) == len(signatures)
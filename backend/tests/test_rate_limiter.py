@@ -0,0 +1,42 @@
+import asyncio
+import threading
+from datetime import datetime, timezone
+
+from app.core.database import SQLiteConnectionPool
+from app.schemas.billing import PlanType
+from app.services.rate_limiter import InMemoryRateLimiter, SQLiteRateLimiter
+
+
+def test_in_memory_limiter_drops_past_months_and_idle_buckets():
+    limiter = InMemoryRateLimiter()
+    january = datetime(2026, 1, 31, 12, tzinfo=timezone.utc).timestamp()
+    for user in ("a", "b"):
+        assert limiter.acquire(user, PlanType.FREE, "analysis", now=january).allowed
+
+    february = datetime(2026, 2, 1, 12, tzinfo=timezone.utc).timestamp()
+    assert limiter.acquire("a", PlanType.FREE, "analysis", now=february).allowed
+
+    assert list(limiter._usage) == [("a", "analysis", "2026-02")]
+    assert list(limiter._buckets) == [("a", "analysis")]
+    assert limiter.usage("a", "analysis", now=february) == 1
+
+
+def test_sqlite_limiter_acquires_off_the_event_loop(tmp_path):
+    limiter = SQLiteRateLimiter(SQLiteConnectionPool(str(tmp_path / "limits.db"), 2))
+    threads = []
+    acquire = limiter.acquire
+
+    def record(*args, **kwargs):
+        threads.append(threading.get_ident())
+        return acquire(*args, **kwargs)
+
+    limiter.acquire = record
+
+    async def run():
+        decision = await limiter.acquire_async("u", PlanType.FREE, "analysis")
+        return threading.get_ident(), decision, await limiter.usage_async("u", "analysis")
+
+    main, decision, used = asyncio.run(run())
+
+    assert decision.allowed and used == 1
+    assert threads and threads[0] != main
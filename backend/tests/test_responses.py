@@ -0,0 +1,27 @@
+from app.core.responses import EncodedPayloadCache
+
+
+def test_payload_cache_is_capped_by_bytes():
+    cache = EncodedPayloadCache(max_bytes=100)
+    for key in "abc":
+        cache.get(key, 1, lambda: b"x" * 40)
+
+    assert len(cache) == 2
+    assert cache.size == 80
+
+    # "b" is now the most recently used, so adding "d" evicts "c".
+    assert cache.get("b", 1, lambda: b"unused") == b"x" * 40
+    cache.get("d", 1, lambda: b"y" * 40)
+    assert cache.size == 80
+    assert cache.get("b", 1, lambda: b"unused") == b"x" * 40
+    assert cache.get("c", 1, lambda: b"re-encoded") == b"re-encoded"
+
+
+def test_payload_cache_replaces_stale_versions_and_skips_oversized_bodies():
+    cache = EncodedPayloadCache(max_bytes=100)
+    cache.get("a", 1, lambda: b"x" * 60)
+    assert cache.get("a", 2, lambda: b"z" * 30) == b"z" * 30
+    assert cache.size == 30
+
+    assert cache.get("big", 1, lambda: b"b" * 101) == b"b" * 101
+    assert len(cache) == 1 and cache.size == 30
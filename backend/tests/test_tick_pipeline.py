@@ -0,0 +1,59 @@
+import asyncio
+from typing import AsyncIterator, List
+
+import pytest
+
+from app.services.market_service import BASE_PRICES
+from app.services.resampler import get_pair_series
+from app.services.tick_pipeline import Bar, Tick, TickPipeline, TickSource, series_consumer
+
+
+class ListSource(TickSource):
+    def __init__(self, batches: List[List[Tick]]):
+        self._batches = batches
+
+    async def batches(self) -> AsyncIterator[List[Tick]]:
+        for batch in self._batches:
+            yield batch
+
+
+def test_tick_source_is_abstract():
+    with pytest.raises(TypeError):
+        TickSource()
+
+
+def test_series_consumer_appends_only_newer_bars():
+    series = get_pair_series("EUR/USD", BASE_PRICES["EUR/USD"])
+    last = series.base.last_timestamp
+    close = float(series.base.close[-1])
+    consume = series_consumer()
+
+    consume([
+        Bar("EUR/USD", last, close, close, close, close, 5),
+        Bar("EUR/USD", last + 60, close, close + 0.001, close, close + 0.001, 7),
+    ])
+
+    assert series.base.last_timestamp == last + 60
+    assert float(series.base.close[-1]) == pytest.approx(close + 0.001)
+    assert int(series.base.volume[-1]) == 7
+
+
+def test_failing_batch_and_consumer_do_not_stop_the_pipeline():
+    published: List[Bar] = []
+
+    def broken(bars: List[Bar]) -> None:
+        raise RuntimeError("consumer failed")
+
+    pipeline = TickPipeline(lambda: None, lateness=0.0)
+    pipeline.subscribe(broken)
+    pipeline.subscribe(published.extend)
+    source = ListSource([
+        [("EUR/USD", 1.1, 1.1002, 1_700_000_040.5)],
+        [("EUR/USD", "bad", 1.1002, 1_700_000_041.0)],
+        [("EUR/USD", 1.1001, 1.1003, 1_700_000_100.5)],
+    ])
+
+    stats = asyncio.run(pipeline.run(source))
+
+    assert stats.batches == 2
+    assert [bar.timestamp for bar in published] == [1_700_000_040, 1_700_000_100]